@@ -5,6 +5,7 @@ import numpy as np
 import os
 from datetime import datetime
 import tempfile
+from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import modules
@@ -21,6 +22,24 @@ from modules.font_analyzer import FontAnalyzer
 from modules.responsiveness_checker import ResponsivenessChecker
 from modules.browser_compatibility import BrowserCompatibility
 from modules.report_generator import ReportGenerator
+from modules.template_sampler import TemplateSampler
+from modules.page_fetcher import PageFetcher
+from modules.page_fingerprint import TemplateResultCache
+from modules.component_cache import ComponentCache
+from modules.content_index import ContentDuplicateIndex
+from modules.metadata_index import MetadataDuplicateIndex
+from modules.link_graph import LinkGraph
+from modules.link_cache import LinkStatusCache
+from modules.circuit_breaker import HostCircuitBreaker
+from modules.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from modules.latency_sampler import LatencySampler
+from modules.resource_loader import SubresourceLoader
+from modules.image_probe import ImageProbe
+from modules.stylesheet_store import StylesheetStore
+from modules.script_index import ScriptStore
+from modules.browser_renderer import BrowserRenderer
+from modules.build_directory import BuildDirectory
+from modules.build_diff import BuildScanCache, diff_builds
 
 application = Flask(__name__)
 app.config.from_object(Config)
@@ -34,16 +53,45 @@ class WebsiteTester:
     def __init__(self):
         self.test_case_manager = TestCaseManager()
         self.url_processor = URLProcessor()
-        self.link_checker = LinkChecker(self.test_case_manager)
-        self.performance_analyzer = PerformanceAnalyzer(self.test_case_manager)
-        self.accessibility_tester = AccessibilityTester(self.test_case_manager)
-        self.seo_analyzer = SEOAnalyzer(self.test_case_manager)
-        self.button_tester = ButtonTester(self.test_case_manager)
-        self.spelling_checker = SpellingChecker(self.test_case_manager)
-        self.font_analyzer = FontAnalyzer(self.test_case_manager)
-        self.responsiveness_checker = ResponsivenessChecker(self.test_case_manager)
-        self.browser_compatibility = BrowserCompatibility(self.test_case_manager)
+        self.circuit_breaker = HostCircuitBreaker()
+        self.browser_renderer = BrowserRenderer()
+        self.page_fetcher = PageFetcher(circuit_breaker=self.circuit_breaker, renderer=self.browser_renderer)
+        self.component_cache = ComponentCache()
+        self.content_index = ContentDuplicateIndex()
+        self.metadata_index = MetadataDuplicateIndex()
+        self.link_graph = LinkGraph()
+        self.link_cache = LinkStatusCache()
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter()
+        self.build_directory = BuildDirectory()
+        self.build_scan_cache = BuildScanCache()
+        self.link_checker = LinkChecker(self.test_case_manager, self.link_graph, self.link_cache,
+                                        self.circuit_breaker, self.concurrency_limiter, self.build_directory)
+        self.latency_sampler = LatencySampler(circuit_breaker=self.circuit_breaker)
+        self.script_store = ScriptStore(self.circuit_breaker)
+        self.stylesheet_store = StylesheetStore(self.circuit_breaker)
+        self.image_probe = ImageProbe(self.concurrency_limiter, self.circuit_breaker)
+        self.resource_loader = SubresourceLoader(self.concurrency_limiter, self.circuit_breaker,
+                                                 stylesheet_store=self.stylesheet_store,
+                                                 script_store=self.script_store,
+                                                 image_probe=self.image_probe)
+        self.performance_analyzer = PerformanceAnalyzer(self.test_case_manager, self.page_fetcher,
+                                                        self.latency_sampler, self.resource_loader,
+                                                        self.image_probe, self.script_store)
+        self.accessibility_tester = AccessibilityTester(self.test_case_manager, self.page_fetcher,
+                                                        self.component_cache, self.stylesheet_store)
+        self.seo_analyzer = SEOAnalyzer(self.test_case_manager, self.page_fetcher, self.content_index,
+                                        self.metadata_index)
+        self.button_tester = ButtonTester(self.test_case_manager, self.page_fetcher, self.component_cache,
+                                          self.script_store)
+        self.spelling_checker = SpellingChecker(self.test_case_manager, self.page_fetcher)
+        self.font_analyzer = FontAnalyzer(self.test_case_manager, self.page_fetcher, self.stylesheet_store)
+        self.responsiveness_checker = ResponsivenessChecker(self.test_case_manager, self.page_fetcher,
+                                                            self.stylesheet_store)
+        self.browser_compatibility = BrowserCompatibility(self.test_case_manager, self.page_fetcher,
+                                                          self.stylesheet_store, self.script_store)
         self.report_generator = ReportGenerator()
+        self.template_sampler = TemplateSampler()
+        self.template_cache = TemplateResultCache()
         
         # Data storage
         self.extracted_links = []
@@ -59,6 +107,11 @@ class WebsiteTester:
     
     def clear_all(self):
         """Clear all data"""
+        self.clear_results()
+        self.link_graph.clear()
+    
+    def clear_results(self):
+        """Clear the results and per-run stores of the previous test run; the crawled link graph stays"""
         self.extracted_links = []
         self.current_results = []
         self.button_test_results = []
@@ -70,14 +123,51 @@ class WebsiteTester:
         self.performance_results = []
         self.accessibility_results = []
         self.test_case_manager.clear_test_cases()
+        self.template_sampler.clear()
+        self.template_cache.clear()
+        self.component_cache.clear()
+        self.content_index.clear()
+        self.metadata_index.clear()
+        self.page_fetcher.clear()
+        self.circuit_breaker.clear()
+        self.concurrency_limiter.clear()
+        self.latency_sampler.clear()
+        self.resource_loader.clear()
+        self.image_probe.clear()
+        self.stylesheet_store.clear()
+        self.script_store.clear()
+        self.browser_renderer.clear()
     
-    def extract_links(self, website_url, max_links=500):
-        """Extract links from website"""
+    def extract_links(self, website_url, max_links=500, build_directory=None, previous_build=None):
+        """Extract links from website, or from a local build directory served as website_url.
+        
+        With previous_build (a directory or a git commit of build_directory)
+        only pages affected by the changes since that build are extracted.
+        """
         try:
+            self.link_graph.clear()
+            # Offline mode stays on for the test run; a later crawl switches back to HTTP
+            self.build_directory.configure(build_directory, website_url)
+            if self.build_directory.enabled and previous_build:
+                changes, previous_state, state = diff_builds(previous_build, self.build_directory.root)
+                self.extracted_links = self.build_directory.scan_changes(
+                    changes, self.build_scan_cache, previous_state, state, self.link_graph, max_links)
+                statistics = self.build_directory.get_statistics()
+                return True, (f"{statistics['added_files']} added, {statistics['modified_files']} modified and "
+                              f"{statistics['removed_files']} removed files affect {statistics['affected_pages']} "
+                              f"pages; extracted {len(self.extracted_links)} unique links in {statistics['scan_seconds']}s")
+            
+            if self.build_directory.enabled:
+                self.extracted_links = self.build_directory.scan(self.link_graph, max_links)
+                statistics = self.build_directory.get_statistics()
+                return True, (f"Extracted {len(self.extracted_links)} unique links from {statistics['html_files']} "
+                              f"HTML files in {statistics['scan_seconds']}s")
+            
             self.extracted_links = self.url_processor.scrape_all_links(
                 website_url, 
                 max_depth=2, 
-                max_links=max_links
+                max_links=max_links,
+                link_graph=self.link_graph
             )
             return True, f"Extracted {len(self.extracted_links)} unique links"
         except Exception as e:
@@ -86,7 +176,7 @@ class WebsiteTester:
     def run_tests(self, urls, test_options):
         """Run selected tests on URLs"""
         # Clear previous results
-        self.clear_all()
+        self.clear_results()
         
         # Remove duplicates
         self.extracted_links = self.url_processor.remove_duplicate_urls(urls)
@@ -94,12 +184,45 @@ class WebsiteTester:
         if not self.extracted_links:
             return False, "No valid URLs to test"
         
+        # Tested pages that no crawled page links to show up as orphans;
+        # assets and URLs of other sites are not pages of the graph
+        if self.link_graph.root_ids:
+            site_hosts = {urlparse(self.link_graph.urls[root_id]).netloc for root_id in self.link_graph.root_ids}
+            for url in self.extracted_links:
+                if self.build_directory.enabled:
+                    is_page = self.build_directory.is_page(url)
+                else:
+                    is_page = urlparse(url).netloc in site_hosts and URLProcessor.is_page_url(url)
+                if is_page:
+                    self.link_graph.add_page(url)
+        
+        # Sampling mode analyzes K representatives per URL template
+        self.template_sampler.configure(
+            enabled=test_options.get('template_sampling', False),
+            samples_per_template=test_options.get('samples_per_template')
+        )
+        
+        # Latency sampling measures each page several times for percentiles
+        self.latency_sampler.configure(
+            enabled=test_options.get('latency_sampling', False),
+            samples=test_options.get('latency_samples')
+        )
+        
+        # Rendering mode analyzes the DOM a headless browser built (needs playwright);
+        # the browser would load the live site, so offline runs analyze the build's HTML
+        render_pages = test_options.get('render_pages', False)
+        self.browser_renderer.configure(enabled=render_pages and not self.build_directory.enabled)
+        
         results = {}
         
         # Run tests based on options
         if test_options.get('link_check', True):
             results['link_results'] = self.run_link_tests()
         
+        # Render the analyzed pages on every browser of the pool before the analyzers run
+        if self.browser_renderer.enabled:
+            self.page_fetcher.prefetch(self.get_analysis_urls(), self.browser_renderer.workers)
+        
         if test_options.get('performance_check', False):
             results['performance_results'] = self.run_performance_tests()
         
@@ -115,33 +238,75 @@ class WebsiteTester:
         if test_options.get('spell_check', False):
             results['spelling_results'] = self.run_spelling_tests()
         
+        if test_options.get('font_check', False):
+            results['font_results'] = self.run_font_tests()
+        
+        if test_options.get('responsive_check', False):
+            results['responsiveness_results'] = self.run_responsiveness_tests()
+        
+        if test_options.get('browser_check', False):
+            results['browser_compatibility_results'] = self.run_browser_compatibility_tests()
+        
         # Add more tests as needed...
         
+        if render_pages and self.build_directory.enabled:
+            return True, "Tests completed successfully; pages were not rendered in a headless browser in offline mode"
         return True, "Tests completed successfully"
     
     def run_link_tests(self):
         """Run link status tests"""
-        results = []
-        test_cases = []
+        self.link_cache.purge_expired()
         
-        for url in self.extracted_links[:50]:  # Limit to 50 URLs for demo
-            result_display, result_structured, test_case = self.link_checker.check_status(url)
-            results.append(result_structured)
-            if test_case:
-                test_cases.append(test_case)
+        # Checked in parallel; the limiter adapts concurrency per origin
+        if self.build_directory.enabled:
+            # Offline checks are file lookups, so every link is checked
+            results, test_cases = self.link_checker.test_links(self.extracted_links)
+        else:
+            results, test_cases = self.link_checker.test_links(self.extracted_links[:50])  # Limit to 50 URLs for demo
         
         self.current_results = results
         return results
     
-    def run_performance_tests(self):
-        """Run performance tests on successful URLs"""
-        results = []
+    def get_analysis_urls(self):
+        """Get successful URLs to analyze, sampled per template when enabled"""
         successful_urls = [r['url'] for r in self.current_results 
                           if r.get('status_category') == 'Success' and r.get('status_code') == 200]
         
-        for url in successful_urls[:3]:  # Limit to 3 URLs
+        # Incremental offline runs analyze every page the change affects, and only those
+        if self.build_directory.changed_pages is not None:
+            changed_pages = set(self.build_directory.changed_pages)
+            return [url for url in successful_urls if url in changed_pages]
+        
+        if self.template_sampler.enabled:
+            if not self.template_sampler.clusters:
+                self.template_sampler.select_representatives(successful_urls)
+            return list(self.template_sampler.url_templates)
+        
+        return successful_urls[:3]  # Limit to 3 URLs
+    
+    def analyze_with_template_reuse(self, analyzer, analyze, url):
+        """Run a template-level analyzer, reusing results of a structurally identical page"""
+        try:
+            fingerprint = self.page_fetcher.get_fingerprint(url)
+        except Exception:
+            # Let the analyzer report the fetch error itself
+            return analyze(url)
+        
+        cached = self.template_cache.get_results(analyzer, fingerprint)
+        if cached:
+            return self.template_cache.reuse_results(cached, url, self.test_case_manager)
+        
+        test_cases = analyze(url)
+        self.template_cache.store_results(analyzer, fingerprint, url, test_cases)
+        return test_cases
+    
+    def run_performance_tests(self):
+        """Run performance tests on successful URLs"""
+        results = []
+        for url in self.get_analysis_urls():
             test_cases = self.performance_analyzer.analyze_performance(url)
             results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
         
         self.performance_results = results
         return results
@@ -149,12 +314,11 @@ class WebsiteTester:
     def run_accessibility_tests(self):
         """Run accessibility tests on successful URLs"""
         results = []
-        successful_urls = [r['url'] for r in self.current_results 
-                          if r.get('status_category') == 'Success' and r.get('status_code') == 200]
-        
-        for url in successful_urls[:3]:  # Limit to 3 URLs
-            test_cases = self.accessibility_tester.analyze_accessibility(url)
+        for url in self.get_analysis_urls():
+            test_cases = self.analyze_with_template_reuse(
+                'accessibility', self.accessibility_tester.analyze_accessibility, url)
             results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
         
         self.accessibility_results = results
         return results
@@ -162,25 +326,23 @@ class WebsiteTester:
     def run_seo_tests(self):
         """Run SEO tests on successful URLs"""
         results = []
-        successful_urls = [r['url'] for r in self.current_results 
-                          if r.get('status_category') == 'Success' and r.get('status_code') == 200]
-        
-        for url in successful_urls[:3]:  # Limit to 3 URLs
+        for url in self.get_analysis_urls():
             test_cases = self.seo_analyzer.analyze_seo(url)
             results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
         
+        results.extend(self.seo_analyzer.analyze_duplicate_metadata())
+        results.extend(self.seo_analyzer.analyze_duplicate_content())
         self.seo_results = results
         return results
     
     def run_button_tests(self):
         """Run button tests on successful URLs"""
         results = []
-        successful_urls = [r['url'] for r in self.current_results 
-                          if r.get('status_category') == 'Success' and r.get('status_code') == 200]
-        
-        for url in successful_urls[:3]:  # Limit to 3 URLs
+        for url in self.get_analysis_urls():
             test_cases = self.button_tester.test_buttons_on_page(url)
             results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
         
         self.button_test_results = results
         return results
@@ -188,16 +350,49 @@ class WebsiteTester:
     def run_spelling_tests(self):
         """Run spelling tests on successful URLs"""
         results = []
-        successful_urls = [r['url'] for r in self.current_results 
-                          if r.get('status_category') == 'Success' and r.get('status_code') == 200]
-        
-        for url in successful_urls[:3]:  # Limit to 3 URLs
+        for url in self.get_analysis_urls():
             test_cases = self.spelling_checker.check_spelling_on_page(url)
             results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
         
         self.spelling_results = results
         return results
     
+    def run_font_tests(self):
+        """Run font analysis on successful URLs"""
+        results = []
+        for url in self.get_analysis_urls():
+            test_cases = self.analyze_with_template_reuse('fonts', self.font_analyzer.analyze_fonts, url)
+            results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
+        
+        self.font_results = results
+        return results
+    
+    def run_responsiveness_tests(self):
+        """Run responsiveness tests on successful URLs"""
+        results = []
+        for url in self.get_analysis_urls():
+            test_cases = self.analyze_with_template_reuse(
+                'responsiveness', self.responsiveness_checker.check_responsiveness, url)
+            results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
+        
+        self.responsiveness_results = results
+        return results
+    
+    def run_browser_compatibility_tests(self):
+        """Run browser compatibility tests on successful URLs"""
+        results = []
+        for url in self.get_analysis_urls():
+            test_cases = self.analyze_with_template_reuse(
+                'browser_compatibility', self.browser_compatibility.check_compatibility, url)
+            results.extend(test_cases)
+            self.template_sampler.record_results(url, test_cases)
+        
+        self.browser_compatibility_results = results
+        return results
+    
     def get_summary(self):
         """Get test summary"""
         stats = self.test_case_manager.get_statistics()
@@ -209,13 +404,41 @@ class WebsiteTester:
             'failed_test_cases': stats['failed'],
             'pass_rate': stats['pass_rate'],
             'link_results': len(self.current_results),
+            'cached_link_results': sum(1 for result in self.current_results if result.get('cached')),
+            'unreachable_hosts': len(self.circuit_breaker.get_statistics()),
             'performance_results': len(self.performance_results),
             'accessibility_results': len(self.accessibility_results),
             'seo_results': len(self.seo_results),
             'button_results': len(self.button_test_results),
-            'spelling_results': len(self.spelling_results)
+            'spelling_results': len(self.spelling_results),
+            'font_results': len(self.font_results),
+            'responsiveness_results': len(self.responsiveness_results),
+            'browser_compatibility_results': len(self.browser_compatibility_results),
+            'reused_template_analyses': self.template_cache.get_statistics()['reused_analyses']
         }
         
+        if self.link_graph.urls:
+            link_graph_summary = self.link_graph.get_summary()
+            summary['max_click_depth'] = link_graph_summary['max_click_depth']
+            summary['orphan_pages'] = link_graph_summary['orphan_pages']
+        
+        if self.template_sampler.enabled:
+            sampling_summary = self.template_sampler.get_sampling_summary()
+            summary['url_templates'] = sampling_summary['total_templates']
+            summary['sampled_urls'] = sampling_summary['sampled_urls']
+            summary['estimated_issue_pages'] = sampling_summary['estimated_issue_pages']
+        
+        if self.latency_sampler.enabled:
+            summary['latency_sampled_urls'] = len(self.latency_sampler.results)
+        
+        if self.browser_renderer.enabled:
+            summary['rendered_pages'] = len(self.browser_renderer.results)
+        
+        if self.build_directory.enabled:
+            summary['build_directory_html_files'] = self.build_directory.get_statistics().get('html_files', 0)
+            if self.build_directory.changed_pages is not None:
+                summary['build_affected_pages'] = len(self.build_directory.changed_pages)
+        
         return summary
     
     def export_report(self, format='json'):
@@ -232,6 +455,22 @@ class WebsiteTester:
             'font_results': self.font_results,
             'responsiveness_results': self.responsiveness_results,
             'browser_compatibility_results': self.browser_compatibility_results,
+            'sampling_summary': self.template_sampler.get_sampling_summary(),
+            'template_reuse': self.template_cache.get_statistics(),
+            'site_wide_components': self.component_cache.get_components_summary(),
+            'duplicate_content': self.content_index.get_duplicate_clusters(),
+            'duplicate_metadata': self.metadata_index.get_duplicates(),
+            'unreachable_hosts': self.circuit_breaker.get_statistics(),
+            'origin_concurrency': self.concurrency_limiter.get_statistics(),
+            'latency_samples': self.latency_sampler.get_results(),
+            'resource_waterfall': self.resource_loader.get_waterfalls(),
+            'image_probes': self.image_probe.get_results(),
+            'script_bundles': self.script_store.get_bundles(),
+            'rendered_pages': self.browser_renderer.get_results(),
+            'link_graph': {
+                'summary': self.link_graph.get_summary(),
+                'pages': self.link_graph.get_metrics()
+            },
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
@@ -251,11 +490,13 @@ def extract_links():
     data = request.json
     website_url = data.get('website_url', '').strip()
     max_links = int(data.get('max_links', 500))
+    build_directory = data.get('build_directory', '').strip()
+    previous_build = data.get('previous_build', '').strip()
     
     if not website_url:
         return jsonify({'success': False, 'message': 'Please enter a website URL'})
     
-    success, message = tester.extract_links(website_url, max_links)
+    success, message = tester.extract_links(website_url, max_links, build_directory or None, previous_build or None)
     
     if success:
         # Store in session
@@ -317,6 +558,22 @@ def export_report():
             'font_results': tester.font_results,
             'responsiveness_results': tester.responsiveness_results,
             'browser_compatibility_results': tester.browser_compatibility_results,
+            'sampling_summary': tester.template_sampler.get_sampling_summary(),
+            'template_reuse': tester.template_cache.get_statistics(),
+            'site_wide_components': tester.component_cache.get_components_summary(),
+            'duplicate_content': tester.content_index.get_duplicate_clusters(),
+            'duplicate_metadata': tester.metadata_index.get_duplicates(),
+            'unreachable_hosts': tester.circuit_breaker.get_statistics(),
+            'origin_concurrency': tester.concurrency_limiter.get_statistics(),
+            'latency_samples': tester.latency_sampler.get_results(),
+            'resource_waterfall': tester.resource_loader.get_waterfalls(),
+            'image_probes': tester.image_probe.get_results(),
+            'script_bundles': tester.script_store.get_bundles(),
+            'rendered_pages': tester.browser_renderer.get_results(),
+            'link_graph': {
+                'summary': tester.link_graph.get_summary(),
+                'pages': tester.link_graph.get_metrics()
+            },
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
@@ -1,4 +1,5 @@
 # config.py - Configuration and constants
+import os
 
 # Test Case Columns
 TEST_CASE_COLUMNS = [
@@ -21,6 +22,120 @@ PERFORMANCE_THRESHOLDS = {
     'dom_elements': 1500,  # DOM elements
     'tti': 3500,        # Time to Interactive in ms
     'fcp': 2000,        # First Contentful Paint in ms
+    'lcp': 2500,        # Largest Contentful Paint in ms
+    'ttfb': 800,        # Time to first byte (server time) in ms
+    'connection_setup': 500,  # DNS + TCP connect + TLS handshake in ms
+    'page_weight': 2048,        # HTML plus all sub-resources in KB
+    'render_blocking_size': 200,  # Render-blocking CSS/JS in KB
+    'compression_savings': 10,  # Bytes br/gzip would save on uncompressed text, in KB
+    'image_size': 200,  # Per image in KB
+    'script_size': 500,  # External JavaScript per page in KB
+}
+
+# Persistent link-status cache shared across runs
+LINK_CACHE_PATH = os.environ.get('LINK_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'link_status_cache.db'))
+
+# Links found in each page of an offline build, kept for incremental runs
+BUILD_SCAN_CACHE_PATH = os.environ.get('BUILD_SCAN_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build_scan_cache.db'))
+
+# Seconds a cached link status stays valid, per status category
+LINK_CACHE_TTL = {
+    'Success': 7 * 24 * 3600,   # 7 days
+    'Redirect': 24 * 3600,      # 1 day
+    'Client Error': 6 * 3600,   # 6 hours
+    'Server Error': 15 * 60,    # 15 minutes
+    'Error': 5 * 60,            # 5 minutes (timeouts, DNS and connection errors)
+}
+
+# Per-host circuit breaker: consecutive connect failures or timeouts before
+# a host is skipped, and seconds before a single probe request is allowed
+CIRCUIT_BREAKER_SETTINGS = {
+    'failure_threshold': 3,
+    'cooldown_seconds': 30,
+}
+
+# Adaptive (AIMD) request concurrency per origin: starting, minimum and maximum
+# parallel requests, completed requests per latency window, multiplicative
+# back-off factor, and how far p95 latency may rise over its baseline
+ADAPTIVE_CONCURRENCY_SETTINGS = {
+    'initial_limit': 4,
+    'min_limit': 1,
+    'max_limit': 32,
+    'window': 10,
+    'decrease_factor': 0.5,
+    'latency_tolerance': 1.5,
+}
+
+# Maximum body bytes read per response, by content-type class; 0 reads
+# headers only. Larger bodies are truncated and flagged.
+FETCH_BODY_LIMITS = {
+    'html': 5 * 1024 * 1024,     # 5MB
+    'css': 2 * 1024 * 1024,      # 2MB
+    'script': 5 * 1024 * 1024,   # 5MB
+    'text': 1024 * 1024,         # 1MB (JSON, XML, plain text)
+    'image': 0,
+    'other': 0,                  # archives, media, binaries
+}
+FETCH_CHUNK_SIZE = 64 * 1024
+# Headers-only fetches still read bodies up to this size (short responses,
+# errors and redirects) so the connection goes back to the pool
+FETCH_DRAIN_BYTES = 64 * 1024
+
+# Sub-resource waterfall: resources loaded per page, bytes read per resource
+# (images are not downloaded, the image probe reads their headers) and
+# request timeout in seconds
+SUBRESOURCE_SETTINGS = {
+    'max_resources': 200,
+    'max_resource_bytes': 10 * 1024 * 1024,  # 10MB
+    'timeout': 10,
+}
+
+# Image header probes: bytes read per ranged GET, ranged GETs per image (JPEG
+# frame headers can follow large EXIF data), images per page, request timeout,
+# and how many times larger than its display size an image may be (2x allows
+# high-density screens)
+IMAGE_PROBE_SETTINGS = {
+    'probe_bytes': 16 * 1024,
+    'max_reads': 3,
+    'max_images': 100,
+    'timeout': 10,
+    'oversize_factor': 2.0,
+}
+
+# Latency sampling mode: requests per URL, seconds between them, percentiles
+# reported, the percentile each threshold is judged on, and the IQR multiple
+# beyond which a sample counts as an outlier
+LATENCY_SAMPLING_SETTINGS = {
+    'samples': 5,
+    'interval_seconds': 0.5,
+    'percentiles': [50, 90, 99],
+    'threshold_percentiles': {
+        'load_time': 90,
+        'ttfb': 90,
+    },
+    'outlier_iqr_factor': 1.5,
+}
+
+# Headless browser rendering (optional, needs playwright and its chromium):
+# long-lived browsers per worker, pages rendered before a browser is
+# recycled, navigation timeout, the long-task-free window after load that
+# marks Time to Interactive and the longest wait for it
+RENDERING_SETTINGS = {
+    'workers': 2,
+    'pages_per_worker': 50,
+    'navigation_timeout_ms': 30000,
+    'quiet_window_ms': 2000,
+    'max_interactive_wait_ms': 10000,
+    'viewport': {'width': 1280, 'height': 800},
+    'cold_cache': True,
+}
+
+# Offline mode over a local build directory: file extensions scanned as pages,
+# scan processes (None uses every core) and files handed to a process at once
+BUILD_DIRECTORY_SETTINGS = {
+    'html_extensions': ['.html', '.htm'],
+    'scan_workers': None,
+    'scan_chunksize': 64,
 }
 
 # Accessibility Standards
@@ -31,6 +146,17 @@ ACCESSIBILITY_STANDARDS = {
     'SECTION508': 'Section 508'
 }
 
+# WCAG 2.x AA contrast: minimum ratios for normal and large text, the sizes
+# in px at which text counts as large (regular and bold), and the viewport
+# width media queries are evaluated at when resolving styles
+CONTRAST_SETTINGS = {
+    'normal_text_ratio': 4.5,
+    'large_text_ratio': 3.0,
+    'large_text_px': 24,
+    'large_bold_text_px': 18.66,
+    'viewport_width': 1280,
+}
+
 # Flask Configuration
 class Config:
     SECRET_KEY = 'your-secret-key-here'
@@ -15,7 +15,6 @@ from openpyxl import Workbook
 import os
 import textblob  # For spell checking
 from textblob import TextBlob
-import cssutils  # For CSS parsing
 import subprocess
 import webbrowser
 from collections import Counter
@@ -25,12 +24,15 @@ import io
 import psutil
 import sys
 import warnings
+from modules.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from modules.link_checker import classify_link_result
+from modules.stylesheet_store import StylesheetStore
+from modules.font_analyzer import FontAnalyzer
 warnings.filterwarnings('ignore')
 
 # Install required packages if not available
 required_packages = [
     ('textblob', 'textblob'),
-    ('cssutils', 'cssutils'),
     ('pandas', 'pandas'),
     ('openpyxl', 'openpyxl'),
     ('psutil', 'psutil'),
@@ -131,6 +133,13 @@ class WebsiteLinkChecker:
         # Initialize test case counter
         self.test_case_counter = 1
         
+        # Parallel requests per origin adapt to latency, 429/503 responses and timeouts
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter()
+        
+        # Each distinct stylesheet is fetched and parsed once per session
+        self.stylesheet_store = StylesheetStore()
+        self.font_analyzer = FontAnalyzer(self, stylesheet_store=self.stylesheet_store)
+        
         self.setup_ui()
 
     def check_status(self, url):
@@ -854,15 +863,13 @@ class WebsiteLinkChecker:
             duplicates_skipped = len(self.extracted_links) - len(urls_to_test)
             self.root.after(0, self.update_results, f"⚠️ Skipping {duplicates_skipped} duplicate URLs for testing\n")
         
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            future_to_url = {executor.submit(self.check_status, url): url for url in urls_to_test}
-            
-            for future in as_completed(future_to_url):
-                result_display, result_structured, test_case = future.result()
-                self.current_results.append(result_structured)
-                if test_case:
-                    self.test_cases.append(test_case)
-                self.root.after(0, self.update_results, result_display)
+        for url, future in self.concurrency_limiter.map_as_completed(self.check_status, urls_to_test,
+                                                                     classify_link_result):
+            result_display, result_structured, test_case = future.result()
+            self.current_results.append(result_structured)
+            if test_case:
+                self.test_cases.append(test_case)
+            self.root.after(0, self.update_results, result_display)
 
     def remove_duplicates(self):
         """Manually remove duplicate URLs from the current list."""
@@ -896,16 +903,13 @@ class WebsiteLinkChecker:
             self.root.after(0, self.update_buttons_results, "No working pages found for button testing.\n")
             return
         
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_url = {executor.submit(self.test_buttons_on_page, url): url for url in working_urls}
-            
-            for future in as_completed(future_to_url):
-                button_results = future.result()
-                if button_results:
-                    self.button_test_results.extend(button_results)
-                    for result in button_results:
-                        self.test_cases.append(result['test_case'])
-                        self.root.after(0, self.update_buttons_results, result['display_text'])
+        for url, future in self.concurrency_limiter.map_as_completed(self.test_buttons_on_page, working_urls):
+            button_results = future.result()
+            if button_results:
+                self.button_test_results.extend(button_results)
+                for result in button_results:
+                    self.test_cases.append(result['test_case'])
+                    self.root.after(0, self.update_buttons_results, result['display_text'])
 
     def test_buttons_on_page(self, url):
         """Test buttons on a specific page."""
@@ -1046,6 +1050,10 @@ class WebsiteLinkChecker:
                 self.root.after(0, self.update_font_results, 
                                f"❌ Error analyzing fonts on {url}: {str(e)[:100]}\n")
     
+    def analyze_fonts_on_page(self, url):
+        """Analyze fonts of a page using the shared stylesheet store."""
+        return self.font_analyzer.analyze_fonts(url)
+    
     def test_responsiveness(self):
         """Check responsiveness of working pages."""
         if not self.current_results:
@@ -4892,7 +4900,6 @@ if __name__ == "__main__":
     # Install required packages
     required_packages = [
         ('textblob', 'textblob'),
-        ('cssutils', 'cssutils'),
         ('pandas', 'pandas'),
         ('openpyxl', 'openpyxl'),
         ('psutil', 'psutil')
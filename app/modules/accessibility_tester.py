@@ -2,21 +2,26 @@
 from bs4 import BeautifulSoup
 import re
 from modules.constants import VALID_ARIA_ROLES
+from modules.page_fetcher import fetch_page
+from modules.stylesheet_store import get_page_css
+from modules.color_contrast import analyze_text_contrast
+from modules.reference_index import ReferenceIndex
 
 class AccessibilityTester:
     """Test website accessibility"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None, component_cache=None, stylesheet_store=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
+        self.component_cache = component_cache
+        self.stylesheet_store = stylesheet_store
     
     def analyze_accessibility(self, url):
         """Perform comprehensive accessibility analysis"""
         test_cases = []
         
         try:
-            import requests
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher)
             
             # 1. Semantic HTML Analysis
             semantic_test_cases = self.analyze_semantic_html(soup, url)
@@ -34,9 +39,11 @@ class AccessibilityTester:
             contrast_test_cases = self.analyze_color_contrast(soup, url)
             test_cases.extend(contrast_test_cases)
             
-            # 5. Form Accessibility
-            form_test_cases = self.analyze_form_accessibility(soup, url)
+            # 5. Form Accessibility and ID references (one ID/label index per page)
+            references = ReferenceIndex(soup)
+            form_test_cases = self.analyze_form_accessibility(soup, url, references)
             test_cases.extend(form_test_cases)
+            test_cases.extend(self.analyze_id_references(soup, url, references))
             
             # 6. Media Accessibility
             media_test_cases = self.analyze_media_accessibility(soup, url)
@@ -159,9 +166,30 @@ class AccessibilityTester:
     def analyze_aria_attributes(self, soup, url):
         """Analyze ARIA (Accessible Rich Internet Applications) attributes."""
         test_cases = []
+        excluded_ids = set()
         
-        # Find elements with ARIA attributes
-        aria_elements = soup.find_all(attrs={"aria-": True})
+        # Shared chrome (header, nav, footer) is analyzed once per run
+        if self.component_cache:
+            test_cases, excluded_ids = self.component_cache.analyze_components(
+                soup, url, 'aria',
+                lambda component, label: self._analyze_aria_elements(self._find_aria_elements(component), label)
+            )
+        
+        aria_elements = [elem for elem in self._find_aria_elements(soup) if id(elem) not in excluded_ids]
+        test_cases.extend(self._analyze_aria_elements(aria_elements, url))
+        return test_cases
+    
+    def _find_aria_elements(self, root):
+        """Find elements with ARIA attributes or roles, including root itself"""
+        has_aria = lambda tag: 'role' in tag.attrs or any(attr.startswith('aria-') for attr in tag.attrs)
+        aria_elements = root.find_all(has_aria)
+        if has_aria(root):
+            aria_elements.insert(0, root)
+        return aria_elements
+    
+    def _analyze_aria_elements(self, aria_elements, url):
+        """Analyze a list of elements with ARIA attributes."""
+        test_cases = []
         
         if aria_elements:
             test_cases.append(self._create_accessibility_test_case(
@@ -189,7 +217,7 @@ class AccessibilityTester:
                     description="Check for invalid ARIA roles",
                     test_steps="1. Find all role attributes\n2. Validate against ARIA specification\n3. Identify invalid roles",
                     expected_result="ARIA roles should be valid according to specification",
-                    actual_result=f"Invalid roles found: {', '.join(set(invalid_roles)[:5])}",
+                    actual_result=f"Invalid roles found: {', '.join(sorted(set(invalid_roles))[:5])}",
                     status="Fail",
                     severity="Medium",
                     resolutions="Use only valid ARIA roles from WAI-ARIA specification"
@@ -200,9 +228,23 @@ class AccessibilityTester:
     def analyze_keyboard_accessibility(self, soup, url):
         """Analyze keyboard navigation accessibility."""
         test_cases = []
+        excluded_ids = set()
+        interactive_tags = ['a', 'button', 'input', 'select', 'textarea']
+        
+        # Shared chrome (header, nav, footer) is analyzed once per run
+        if self.component_cache:
+            test_cases, excluded_ids = self.component_cache.analyze_components(
+                soup, url, 'keyboard',
+                lambda component, label: self._analyze_keyboard_elements(component.find_all(interactive_tags), label)
+            )
         
-        # Find interactive elements
-        interactive_elements = soup.find_all(['a', 'button', 'input', 'select', 'textarea'])
+        interactive_elements = [elem for elem in soup.find_all(interactive_tags) if id(elem) not in excluded_ids]
+        test_cases.extend(self._analyze_keyboard_elements(interactive_elements, url))
+        return test_cases
+    
+    def _analyze_keyboard_elements(self, interactive_elements, url):
+        """Analyze keyboard accessibility of a list of interactive elements."""
+        test_cases = []
         
         # Test 1: Focusable elements
         focusable_elements = []
@@ -234,6 +276,28 @@ class AccessibilityTester:
         """Analyze color contrast for accessibility."""
         test_cases = []
         
+        # WCAG 1.4.3: contrast of every visible text node against its resolved backdrop
+        contrast = analyze_text_contrast(soup, get_page_css(soup, url, self.stylesheet_store))
+        if contrast['checked']:
+            failures = contrast['failures']
+            undetermined = (f"; {contrast['undetermined']} over background images or unresolved colors not checked"
+                            if contrast['undetermined'] else "")
+            examples = "; ".join(f"'{failure['text'][:30]}' {failure['ratio']}:1 ({failure['foreground']} on "
+                                 f"{failure['background']}, needs {failure['required']}:1)" for failure in failures[:5])
+            test_cases.append(self._create_accessibility_test_case(
+                url=url,
+                module="Color Contrast",
+                description="Check text contrast ratios against WCAG 2.1 AA",
+                test_steps="1. Resolve text and background colors from stylesheets and style attributes\n2. Compute contrast ratio of each text node\n3. Compare with 4.5:1 (3:1 for large text)",
+                expected_result="Text should have a contrast ratio of at least 4.5:1 (3:1 for large text)",
+                actual_result=(f"{len(failures)} of {contrast['checked']} text elements below the required ratio: {examples}"
+                               if failures else f"All {contrast['checked']} text elements pass (lowest {contrast['min_ratio']}:1)")
+                              + undetermined,
+                status="Fail" if failures else "Pass",
+                severity="High" if failures else "Low",
+                resolutions="Darken text or lighten backgrounds until each pair reaches the required ratio" if failures else ""
+            ))
+        
         # Check for color-dependent information
         color_dependent_text = []
         for elem in soup.find_all(['span', 'div', 'p', 'a']):
@@ -259,9 +323,10 @@ class AccessibilityTester:
         
         return test_cases
     
-    def analyze_form_accessibility(self, soup, url):
+    def analyze_form_accessibility(self, soup, url, references=None):
         """Analyze form accessibility."""
         test_cases = []
+        references = references or ReferenceIndex(soup)
         forms = soup.find_all('form')
         
         if not forms:
@@ -283,30 +348,8 @@ class AccessibilityTester:
             
             labeled_inputs = 0
             for inp in inputs:
-                # Check for label association
-                input_id = inp.get('id')
-                input_name = inp.get('name')
-                aria_label = inp.get('aria-label')
-                aria_labelledby = inp.get('aria-labelledby')
-                
-                has_label = False
-                
-                if input_id:
-                    # Check for label with for attribute
-                    label = soup.find('label', attrs={'for': input_id})
-                    if label and label.get_text(strip=True):
-                        has_label = True
-                
-                if not has_label and (aria_label or aria_labelledby):
-                    has_label = True
-                
-                if not has_label and input_name:
-                    # Check for wrapping label
-                    parent = inp.parent
-                    if parent.name == 'label':
-                        has_label = True
-                
-                if has_label:
+                # aria-labelledby, aria-label, label[for] or wrapping label, resolved from the page index
+                if references.accessible_label(inp):
                     labeled_inputs += 1
             
             label_percentage = (labeled_inputs / len(inputs)) * 100 if inputs else 0
@@ -326,6 +369,31 @@ class AccessibilityTester:
         
         return test_cases
     
+    def analyze_id_references(self, soup, url, references=None):
+        """Check that ID references (aria-labelledby, label for, ...) point to existing elements."""
+        test_cases = []
+        references = references or ReferenceIndex(soup)
+        
+        if not references.references:
+            return test_cases
+        
+        broken = references.broken_references()
+        examples = ", ".join(f"<{element.name} {attribute}=\"{target}\">" for element, attribute, target in broken[:5])
+        test_cases.append(self._create_accessibility_test_case(
+            url=url,
+            module="ID References",
+            description="Check that ID references point to elements on the page",
+            test_steps="1. Index element IDs\n2. Resolve aria-labelledby, aria-describedby, label for and other ID references\n3. Report references to missing IDs",
+            expected_result="Every referenced ID should exist on the page",
+            actual_result=(f"{len(broken)} references to missing IDs: {examples}" if broken
+                           else f"All {len(references.references)} ID references resolve"),
+            status="Fail" if broken else "Pass",
+            severity="Medium" if broken else "Low",
+            resolutions="Fix or remove references to IDs that do not exist so labels and descriptions reach assistive technology" if broken else ""
+        ))
+        
+        return test_cases
+    
     def analyze_media_accessibility(self, soup, url):
         """Analyze media (images, videos, audio) accessibility."""
         test_cases = []
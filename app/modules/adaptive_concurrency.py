@@ -0,0 +1,182 @@
+# modules/adaptive_concurrency.py - AIMD concurrency limits per origin
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import numpy as np
+from config import ADAPTIVE_CONCURRENCY_SETTINGS
+
+# Responses that mean the origin is shedding load
+OVERLOAD_STATUS_CODES = {429, 503}
+
+def _origin(url):
+    """Scheme and host of a URL"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+class _Slot:
+    """Outcome of one request made under the limiter"""
+    
+    def __init__(self):
+        self.status_code = None
+        self.overloaded = False
+        self.ignore = False
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease request concurrency per origin.
+    
+    Every origin starts at initial_limit parallel requests. After each window
+    of completed requests the limit grows by one while the window's p95
+    latency stays within latency_tolerance of the origin's baseline, and it is
+    multiplied by decrease_factor on 429/503 responses, timeouts or a p95
+    rise above the baseline.
+    """
+    
+    def __init__(self, initial_limit=None, min_limit=None, max_limit=None, window=None,
+                 decrease_factor=None, latency_tolerance=None):
+        settings = ADAPTIVE_CONCURRENCY_SETTINGS
+        self.initial_limit = initial_limit or settings['initial_limit']
+        self.min_limit = min_limit or settings['min_limit']
+        self.max_limit = max_limit or settings['max_limit']
+        self.window = window or settings['window']
+        self.decrease_factor = decrease_factor or settings['decrease_factor']
+        self.latency_tolerance = latency_tolerance or settings['latency_tolerance']
+        self.condition = threading.Condition()
+        self.origins = {}
+    
+    def clear(self):
+        """Forget the learned limits of all origins"""
+        with self.condition:
+            self.origins = {}
+    
+    def _get_origin(self, origin):
+        """Get the limiter state of an origin"""
+        state = self.origins.get(origin)
+        if state is None:
+            state = {
+                'limit': float(min(self.initial_limit, self.max_limit)),
+                'in_flight': 0,
+                'latencies': deque(maxlen=self.window),
+                'baseline_p95': None,
+                'peak_limit': 0,
+                'increases': 0,
+                'decreases': 0,
+                'requests': 0,
+                'decreased_at_request': 0
+            }
+            self.origins[origin] = state
+        return state
+    
+    def acquire(self, url):
+        """Block until the origin of url has a free slot"""
+        origin = _origin(url)
+        with self.condition:
+            state = self._get_origin(origin)
+            while state['in_flight'] >= int(state['limit']):
+                self.condition.wait()
+            state['in_flight'] += 1
+            state['peak_limit'] = max(state['peak_limit'], int(state['limit']))
+    
+    def release(self, url, latency, slot):
+        """Free the slot of a finished request and adapt the origin's limit"""
+        origin = _origin(url)
+        with self.condition:
+            state = self._get_origin(origin)
+            state['in_flight'] -= 1
+            state['requests'] += 1
+            
+            if slot.overloaded or slot.status_code in OVERLOAD_STATUS_CODES:
+                self._decrease(state)
+            elif not slot.ignore:
+                state['latencies'].append(latency)
+                if len(state['latencies']) == self.window:
+                    self._evaluate_window(state)
+            
+            self.condition.notify_all()
+    
+    def _decrease(self, state):
+        """Multiplicative decrease; the latency window restarts at the new limit"""
+        # Requests already in flight at the old limit report the same overload,
+        # so back off at most once per round of in-flight requests
+        if state['decreases'] and state['requests'] - state['decreased_at_request'] < int(state['limit']):
+            return
+        state['limit'] = max(float(self.min_limit), state['limit'] * self.decrease_factor)
+        state['latencies'].clear()
+        state['decreases'] += 1
+        state['decreased_at_request'] = state['requests']
+    
+    def _evaluate_window(self, state):
+        """Grow the limit while p95 latency stays flat, shrink it when latency rises"""
+        p95 = float(np.percentile(np.fromiter(state['latencies'], dtype=np.float64), 95))
+        baseline = state['baseline_p95']
+        
+        if baseline is not None and p95 > baseline * self.latency_tolerance:
+            self._decrease(state)
+            return
+        
+        # Slowly follow the latency the origin shows at healthy concurrency
+        state['baseline_p95'] = p95 if baseline is None else 0.8 * baseline + 0.2 * p95
+        state['limit'] = min(float(self.max_limit), state['limit'] + 1)
+        state['latencies'].clear()
+        state['increases'] += 1
+    
+    def call(self, url, func, classify=None):
+        """Run func(url) in a slot of the url's origin.
+        
+        classify(result) returns (status_code, overloaded), or None for results
+        that did not reach the origin (cached or short-circuited) and say
+        nothing about its latency.
+        """
+        slot = _Slot()
+        self.acquire(url)
+        start_time = time.time()
+        try:
+            result = func(url)
+            outcome = classify(result) if classify else (None, False)
+            if outcome is None:
+                slot.ignore = True
+            else:
+                slot.status_code, slot.overloaded = outcome
+            return result
+        except Exception:
+            slot.ignore = True
+            raise
+        finally:
+            self.release(url, time.time() - start_time, slot)
+    
+    @staticmethod
+    def interleave_origins(urls):
+        """Order URLs round-robin by origin so one slow origin does not hold every worker"""
+        by_origin = {}
+        for url in urls:
+            by_origin.setdefault(_origin(url), deque()).append(url)
+        
+        ordered = []
+        queues = list(by_origin.values())
+        while queues:
+            for queue in queues:
+                ordered.append(queue.popleft())
+            queues = [queue for queue in queues if queue]
+        return ordered
+    
+    def map_as_completed(self, func, urls, classify=None):
+        """Run func over urls under per-origin limits, yielding (url, future) as they finish"""
+        with ThreadPoolExecutor(max_workers=self.max_limit) as executor:
+            future_to_url = {executor.submit(self.call, url, func, classify): url
+                             for url in self.interleave_origins(urls)}
+            for future in as_completed(future_to_url):
+                yield future_to_url[future], future
+    
+    def get_statistics(self):
+        """Get the learned concurrency of each origin"""
+        with self.condition:
+            return [{
+                'origin': origin,
+                'current_limit': int(state['limit']),
+                'peak_limit': state['peak_limit'],
+                'increases': state['increases'],
+                'decreases': state['decreases'],
+                'requests': state['requests'],
+                'baseline_p95_ms': round(state['baseline_p95'] * 1000) if state['baseline_p95'] else None
+            } for origin, state in self.origins.items()]
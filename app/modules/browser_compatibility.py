@@ -2,35 +2,42 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+from modules.page_fetcher import fetch_page
+from modules.stylesheet_store import get_page_css
+from modules.script_index import get_page_scripts
 
 class BrowserCompatibility:
     """Check browser compatibility issues"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None, stylesheet_store=None, script_store=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
+        self.stylesheet_store = stylesheet_store
+        self.script_store = script_store
     
     def check_compatibility(self, url):
         """Check browser compatibility"""
         test_cases = []
         
         try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher)
+            css = get_page_css(soup, url, self.stylesheet_store)
+            scripts = get_page_scripts(soup, url, self.script_store)
             
             # 1. HTML5 Compatibility Check
             html5_test_cases = self._check_html5_compatibility(soup, url)
             test_cases.extend(html5_test_cases)
             
             # 2. CSS Compatibility Check
-            css_test_cases = self._check_css_compatibility(soup, url)
+            css_test_cases = self._check_css_compatibility(css, url)
             test_cases.extend(css_test_cases)
             
             # 3. JavaScript Compatibility Check
-            js_test_cases = self._check_javascript_compatibility(soup, url)
+            js_test_cases = self._check_javascript_compatibility(scripts, url)
             test_cases.extend(js_test_cases)
             
             # 4. Vendor Prefix Check
-            vendor_test_cases = self._check_vendor_prefixes(soup, url)
+            vendor_test_cases = self._check_vendor_prefixes(css, url)
             test_cases.extend(vendor_test_cases)
             
             # 5. Cross-Browser Features Check
@@ -134,22 +141,19 @@ class BrowserCompatibility:
         
         return test_cases
     
-    def _check_css_compatibility(self, soup, url):
+    def _check_css_compatibility(self, css, url):
         """Check CSS compatibility issues"""
         test_cases = []
         
-        # Extract CSS from style tags
-        css_content = ''
-        for style in soup.find_all('style'):
-            if style.string:
-                css_content += style.string
+        # Check for CSS Grid and Flexbox (modern features) in the property index
+        properties = css.properties()
+        display_values = {value.lower() for value in css.values('display')}
+        grid_properties = {'grid-template', 'grid-template-columns', 'grid-template-rows', 'grid-template-areas',
+                           'grid-area', 'grid-gap'}
+        flexbox_properties = {'flex-direction', 'flex-wrap', 'flex-flow', 'justify-content', 'align-items'}
         
-        # Check for CSS Grid and Flexbox (modern features)
-        grid_features = ['display: grid', 'grid-template', 'grid-area', 'grid-gap']
-        flexbox_features = ['display: flex', 'flex-direction', 'justify-content', 'align-items']
-        
-        has_grid = any(feature in css_content for feature in grid_features)
-        has_flexbox = any(feature in css_content for feature in flexbox_features)
+        has_grid = bool(display_values & {'grid', 'inline-grid'}) or bool(properties & grid_properties)
+        has_flexbox = bool(display_values & {'flex', 'inline-flex'}) or bool(properties & flexbox_properties)
         
         if has_grid:
             test_cases.append(self._create_compatibility_test_case(
@@ -177,7 +181,7 @@ class BrowserCompatibility:
             ))
         
         # Check for CSS Custom Properties (CSS Variables)
-        if 'var(--' in css_content or '--' in css_content:
+        if any(name.startswith('--') for name in properties):
             test_cases.append(self._create_compatibility_test_case(
                 url=url,
                 module="CSS Custom Properties",
@@ -192,72 +196,46 @@ class BrowserCompatibility:
         
         return test_cases
     
-    def _check_javascript_compatibility(self, soup, url):
+    def _check_javascript_compatibility(self, scripts, url):
         """Check JavaScript compatibility"""
         test_cases = []
         
-        # Check for modern JavaScript features in inline scripts
-        modern_js_features = ['let ', 'const ', '=>', 'class ', 'async ', 'await ']
-        
-        for script in soup.find_all('script'):
-            script_content = script.string or ''
-            
-            found_features = []
-            for feature in modern_js_features:
-                if feature in script_content:
-                    found_features.append(feature.strip())
-            
-            if found_features:
-                test_cases.append(self._create_compatibility_test_case(
-                    url=url,
-                    module="Modern JavaScript",
-                    description="Check for modern JavaScript features",
-                    test_steps="1. Analyze inline JavaScript\n2. Check for ES6+ features\n3. Evaluate compatibility",
-                    expected_result="Modern JavaScript should be transpiled for older browsers",
-                    actual_result=f"Found modern JS features: {', '.join(found_features)}",
-                    status="Info",
-                    severity="Low",
-                    comments="Consider transpiling ES6+ code for better browser compatibility"
-                ))
-                break
+        # Check for modern JavaScript features in inline and external scripts
+        if scripts.features:
+            test_cases.append(self._create_compatibility_test_case(
+                url=url,
+                module="Modern JavaScript",
+                description="Check for modern JavaScript features",
+                test_steps="1. Analyze inline and external JavaScript\n2. Check for ES6+ features\n3. Evaluate compatibility",
+                expected_result="Modern JavaScript should be transpiled for older browsers",
+                actual_result=f"Found modern JS features in {len(scripts.indexes)} scripts: {', '.join(sorted(scripts.features))}",
+                status="Info",
+                severity="Low",
+                comments="Consider transpiling ES6+ code for better browser compatibility"
+            ))
         
         # Check for browser-specific code
-        browser_specific = ['navigator.userAgent', 'MSIE', 'Trident', 'Edge',
-                           'Chrome', 'Firefox', 'Safari', 'Opera']
-        
-        for script in soup.find_all('script'):
-            script_content = script.string or ''
-            
-            found_browser_code = []
-            for code in browser_specific:
-                if code in script_content:
-                    found_browser_code.append(code)
-            
-            if found_browser_code:
-                test_cases.append(self._create_compatibility_test_case(
-                    url=url,
-                    module="Browser Detection",
-                    description="Check for browser-specific code",
-                    test_steps="1. Search for browser detection code\n2. Analyze user agent checks\n3. Evaluate approach",
-                    expected_result="Avoid browser detection, use feature detection instead",
-                    actual_result=f"Found browser-specific code: {', '.join(found_browser_code[:3])}",
-                    status="Warning",
-                    severity="Low",
-                    resolutions="Replace browser detection with feature detection using Modernizr or similar"
-                ))
-                break
+        if scripts.sniffs_user_agent:
+            found_browser_code = sorted(scripts.ua_tokens, key=lambda token: (not token.startswith('navigator.'), token))
+            test_cases.append(self._create_compatibility_test_case(
+                url=url,
+                module="Browser Detection",
+                description="Check for browser-specific code",
+                test_steps="1. Search for browser detection code\n2. Analyze user agent checks\n3. Evaluate approach",
+                expected_result="Avoid browser detection, use feature detection instead",
+                actual_result=f"Found browser-specific code: {', '.join(found_browser_code[:3])}",
+                status="Warning",
+                severity="Low",
+                resolutions="Replace browser detection with feature detection using Modernizr or similar"
+            ))
         
         return test_cases
     
-    def _check_vendor_prefixes(self, soup, url):
+    def _check_vendor_prefixes(self, css, url):
         """Check for CSS vendor prefixes"""
         test_cases = []
         
-        css_content = ''
-        for style in soup.find_all('style'):
-            if style.string:
-                css_content += style.string
-        
+        used_prefixes = css.vendor_prefixes()
         vendor_prefixes = {
             '-webkit-': 'WebKit (Chrome, Safari, newer Opera)',
             '-moz-': 'Mozilla Firefox',
@@ -267,7 +245,7 @@ class BrowserCompatibility:
         
         found_prefixes = []
         for prefix in vendor_prefixes:
-            if prefix in css_content:
+            if prefix in used_prefixes:
                 found_prefixes.append(prefix)
         
         if found_prefixes:
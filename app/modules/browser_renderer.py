@@ -0,0 +1,259 @@
+# modules/browser_renderer.py - Headless Chromium worker pool for rendered DOM and paint timings
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from config import RENDERING_SETTINGS
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    sync_playwright = None
+
+# Installed before any page script runs: records LCP candidates and long tasks
+# as they happen, since neither can be read back reliably after load
+METRICS_INIT_SCRIPT = """
+window.__renderMetrics = {lcp: null, longTasks: []};
+try {
+    new PerformanceObserver(list => {
+        for (const entry of list.getEntries()) window.__renderMetrics.lcp = entry.startTime;
+    }).observe({type: 'largest-contentful-paint', buffered: true});
+} catch (e) {}
+try {
+    new PerformanceObserver(list => {
+        for (const entry of list.getEntries())
+            window.__renderMetrics.longTasks.push([entry.startTime, entry.startTime + entry.duration]);
+    }).observe({type: 'longtask', buffered: true});
+} catch (e) {}
+"""
+
+# Navigation and paint timings of the current document, in ms from navigation start
+METRICS_SCRIPT = """() => {
+    const navigation = performance.getEntriesByType('navigation')[0] || {};
+    const paints = {};
+    for (const entry of performance.getEntriesByType('paint')) paints[entry.name] = entry.startTime;
+    const recorded = window.__renderMetrics || {lcp: null, longTasks: []};
+    return {
+        now: performance.now(),
+        ttfb_ms: navigation.responseStart || null,
+        dom_content_loaded_ms: navigation.domContentLoadedEventEnd || null,
+        load_ms: navigation.loadEventEnd || null,
+        fp_ms: paints['first-paint'] ?? null,
+        fcp_ms: paints['first-contentful-paint'] ?? null,
+        lcp_ms: recorded.lcp,
+        long_tasks: recorded.longTasks,
+        dom_elements: document.getElementsByTagName('*').length
+    };
+}"""
+
+class RenderedPage:
+    """DOM and timings of a page after a headless browser rendered it"""
+    
+    def __init__(self, url, final_url, html, metrics, render_ms):
+        self.url = url
+        self.final_url = final_url
+        self.html = html
+        self.render_ms = render_ms
+        self.long_tasks = metrics['long_tasks']
+        self.dom_elements = metrics['dom_elements']
+        self.timings = {key: round(metrics[key], 1) if metrics[key] is not None else None
+                        for key in ['ttfb_ms', 'dom_content_loaded_ms', 'load_ms', 'fp_ms', 'fcp_ms', 'lcp_ms']}
+        self.timings['tti_ms'] = round(interactive_time(metrics), 1)
+    
+    @property
+    def blocking_ms(self):
+        """Total blocking time: main-thread time beyond 50ms in each long task"""
+        return sum(max(0, end - start - 50) for start, end in self.long_tasks)
+    
+    def to_dict(self):
+        """Timings and counts for reports, without the DOM"""
+        return {
+            'url': self.url,
+            'final_url': self.final_url,
+            **self.timings,
+            'long_tasks': len(self.long_tasks),
+            'blocking_ms': round(self.blocking_ms, 1),
+            'dom_elements': self.dom_elements,
+            'rendered_html_bytes': len(self.html.encode('utf-8')),
+            'render_ms': round(self.render_ms, 1)
+        }
+
+def interactive_time(metrics):
+    """Time to Interactive: end of the last long task, not before FCP or DOMContentLoaded.
+    
+    Lighthouse looks for a 5 s window without long tasks or busy network;
+    here the window is RENDERING_SETTINGS['quiet_window_ms'] of main-thread
+    quiet, which is what the renderer waits for after load.
+    """
+    floor = max(metrics['fcp_ms'] or 0, metrics['dom_content_loaded_ms'] or 0)
+    return max([floor] + [end for start, end in metrics['long_tasks'] if end > floor])
+
+class BrowserRenderer:
+    """Render pages in a pool of long-lived headless Chromium browsers.
+    
+    Each worker thread owns one Playwright instance, browser, context and
+    page and reuses them for every job; the browser is relaunched after
+    pages_per_worker renders or after a failure. Playwright's sync API is
+    bound to the thread that started it, so jobs are handed to workers
+    through a queue instead of sharing browsers between threads.
+    """
+    
+    def __init__(self, workers=None, pages_per_worker=None):
+        self.enabled = False
+        self.workers = workers or RENDERING_SETTINGS['workers']
+        self.pages_per_worker = pages_per_worker or RENDERING_SETTINGS['pages_per_worker']
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.results = {}
+        self.errors = {}
+        self.browsers_launched = 0
+    
+    @property
+    def available(self):
+        """Whether playwright is installed"""
+        return sync_playwright is not None
+    
+    def configure(self, enabled=False):
+        """Enable or disable rendering for the next run; stays off without playwright"""
+        self.enabled = enabled and self.available
+    
+    def clear(self):
+        """Forget the timings and errors of previous runs; browsers keep running"""
+        with self.lock:
+            self.results = {}
+            self.errors = {}
+    
+    def render(self, url):
+        """Render a URL on a pooled browser and return its RenderedPage"""
+        self._start_workers()
+        future = Future()
+        self.jobs.put((url, future))
+        timeout = (RENDERING_SETTINGS['navigation_timeout_ms'] + RENDERING_SETTINGS['max_interactive_wait_ms']) / 1000
+        try:
+            rendered = future.result(timeout=timeout * 2)
+        except Exception as e:
+            # A job still waiting for a worker is dropped instead of rendered for nobody
+            future.cancel()
+            with self.lock:
+                self.errors[url] = str(e)[:200]
+            raise
+        
+        with self.lock:
+            self.results[url] = rendered.to_dict()
+        return rendered
+    
+    def close(self):
+        """Stop the workers and their browsers"""
+        with self.lock:
+            threads, self.threads = self.threads, []
+        for _ in threads:
+            self.jobs.put(None)
+        for thread in threads:
+            thread.join()
+    
+    def get_results(self):
+        """Get the rendered timings of every page, then pages that failed to render"""
+        with self.lock:
+            return list(self.results.values()) + [{'url': url, 'error': error} for url, error in self.errors.items()]
+    
+    def get_statistics(self):
+        """Pool size and usage"""
+        with self.lock:
+            return {
+                'workers': len(self.threads),
+                'browsers_launched': self.browsers_launched,
+                'rendered_pages': len(self.results),
+                'failed_pages': len(self.errors)
+            }
+    
+    def _start_workers(self):
+        """Start the worker threads on first use"""
+        with self.lock:
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True,
+                                          name=f"browser-renderer-{len(self.threads)}")
+                thread.start()
+                self.threads.append(thread)
+    
+    def _worker(self):
+        """Serve render jobs on this thread's own browser until close() is called"""
+        try:
+            playwright = sync_playwright().start()
+        except Exception as e:
+            playwright, startup_error = None, e
+        
+        browser = page = None
+        rendered_pages = 0
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                url, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if playwright is None:
+                    future.set_exception(startup_error)
+                    continue
+                
+                try:
+                    if page is None:
+                        browser, page = self._launch(playwright)
+                        rendered_pages = 0
+                    future.set_result(self._render(page, url))
+                    rendered_pages += 1
+                except Exception as e:
+                    future.set_exception(e)
+                    # The browser may have crashed or hung; start the next job on a fresh one
+                    rendered_pages = self.pages_per_worker
+                
+                if rendered_pages >= self.pages_per_worker:
+                    self._close_browser(browser)
+                    browser = page = None
+        finally:
+            self._close_browser(browser)
+            if playwright is not None:
+                playwright.stop()
+    
+    def _launch(self, playwright):
+        """Launch a browser with the single context and page this worker reuses"""
+        browser = playwright.chromium.launch(headless=True, args=['--disable-dev-shm-usage'])
+        context = browser.new_context(viewport=RENDERING_SETTINGS['viewport'], ignore_https_errors=True)
+        context.add_init_script(METRICS_INIT_SCRIPT)
+        page = context.new_page()
+        page.set_default_navigation_timeout(RENDERING_SETTINGS['navigation_timeout_ms'])
+        if RENDERING_SETTINGS['cold_cache']:
+            # Every page is measured like a first visit although the page is reused
+            context.new_cdp_session(page).send('Network.setCacheDisabled', {'cacheDisabled': True})
+        with self.lock:
+            self.browsers_launched += 1
+        return browser, page
+    
+    def _close_browser(self, browser):
+        """Close a browser, ignoring one that already crashed"""
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Exception:
+            pass
+    
+    def _render(self, page, url):
+        """Load a URL, wait for main-thread quiet and capture DOM and timings"""
+        page.context.clear_cookies()
+        start = time.perf_counter()
+        page.goto(url, wait_until='load')
+        
+        # Wait until quiet_window_ms pass without a long task, up to max_interactive_wait_ms
+        deadline = start + RENDERING_SETTINGS['max_interactive_wait_ms'] / 1000
+        quiet_window = RENDERING_SETTINGS['quiet_window_ms']
+        while True:
+            metrics = page.evaluate(METRICS_SCRIPT)
+            busy_until = max([metrics['load_ms'] or 0] + [end for start_ms, end in metrics['long_tasks']])
+            remaining = quiet_window - (metrics['now'] - busy_until)
+            if remaining <= 0 or time.perf_counter() >= deadline:
+                break
+            page.wait_for_timeout(min(remaining, 250))
+        
+        return RenderedPage(url, page.url, page.content(), metrics, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,207 @@
+# modules/build_diff.py - Changes between two builds and the link cache for incremental runs
+import hashlib
+import os
+import sqlite3
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import BUILD_SCAN_CACHE_PATH
+
+# Parameters per SQLite IN (...) query, below the default variable limit
+QUERY_BATCH_SIZE = 500
+# Bytes read at a time and files hashed in parallel when digesting a build tree
+DIGEST_CHUNK_SIZE = 1024 * 1024
+DIGEST_WORKERS = 8
+
+def link_target(url):
+    """URL of the file a link loads: without query string and fragment"""
+    return url.split('#', 1)[0].split('?', 1)[0]
+
+def _file_digest(path):
+    """Content digest of a file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(DIGEST_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _list_files(root):
+    """{relative posix path: content digest} of every file below root"""
+    paths = {}
+    for directory, directories, filenames in os.walk(root):
+        directories[:] = [name for name in directories if name != '.git']
+        relative_directory = os.path.relpath(directory, root).replace(os.sep, '/')
+        for filename in filenames:
+            relative_path = filename if relative_directory == '.' else f"{relative_directory}/{filename}"
+            paths[relative_path] = os.path.join(directory, filename)
+    # hashlib releases the GIL on large buffers, so threads hash files in parallel
+    with ThreadPoolExecutor(max_workers=DIGEST_WORKERS) as executor:
+        return dict(zip(paths, executor.map(_file_digest, paths.values())))
+
+def tree_signature(files):
+    """Digest of the paths and content digests of a build tree"""
+    digest = hashlib.blake2b(digest_size=16)
+    for relative_path in sorted(files):
+        digest.update(f"{relative_path}\0{files[relative_path]}\n".encode('utf-8'))
+    return f"tree:{digest.hexdigest()}"
+
+def diff_directories(previous_root, current_root):
+    """Added, modified and removed files between two build directories.
+    
+    Every file is hashed once, and files whose digests differ are modified.
+    Returns (changes, previous state, current state), the states identifying
+    each tree's contents for the scan cache.
+    """
+    previous = _list_files(previous_root)
+    current = _list_files(current_root)
+    modified = [relative_path for relative_path, digest in current.items()
+                if relative_path in previous and previous[relative_path] != digest]
+    changes = {
+        'added': sorted(set(current) - set(previous)),
+        'modified': sorted(modified),
+        'removed': sorted(set(previous) - set(current))
+    }
+    return changes, tree_signature(previous), tree_signature(current)
+
+def _git(root, *args):
+    """Output of a git command run in root, raising ValueError with git's message on failure"""
+    try:
+        result = subprocess.run(['git', '-C', root, *args], capture_output=True, text=True, check=True)
+    except FileNotFoundError:
+        raise ValueError("git is not installed")
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"git {args[0]} failed: {e.stderr.strip()[:200]}")
+    return result.stdout
+
+def diff_commits(root, previous_commit, commit='HEAD'):
+    """Added, modified and removed files of the build directory root between two commits.
+    
+    root must be checked out at commit, since pages are read from disk.
+    Paths are relative to root. Returns (changes, previous state, current
+    state) with the commit hashes as states.
+    """
+    previous_sha = _git(root, 'rev-parse', '--verify', f"{previous_commit}^{{commit}}").strip()
+    sha = _git(root, 'rev-parse', '--verify', f"{commit}^{{commit}}").strip()
+    head = _git(root, 'rev-parse', 'HEAD').strip()
+    if sha != head:
+        raise ValueError(f"Build directory is checked out at {head[:12]}, not {commit}")
+    
+    changes = {'added': [], 'modified': [], 'removed': []}
+    fields = _git(root, 'diff', '--name-status', '--no-renames', '-z', '--relative', previous_sha, sha, '--', '.').split('\0')
+    for status, relative_path in zip(fields[0::2], fields[1::2]):
+        if status == 'A':
+            changes['added'].append(relative_path)
+        elif status == 'D':
+            changes['removed'].append(relative_path)
+        elif status:
+            changes['modified'].append(relative_path)
+    return changes, f"commit:{previous_sha}", f"commit:{sha}"
+
+def diff_builds(previous, current_root):
+    """Changes from a previous build, given as a directory or as a git commit of current_root"""
+    if os.path.isdir(previous):
+        return diff_directories(previous, current_root)
+    return diff_commits(current_root, previous)
+
+class BuildScanCache:
+    """SQLite store of the internal links found in each page of a build.
+    
+    Links are indexed by the file they load (see link_target), so the pages
+    referencing changed files are found without reading any page, whatever
+    query string the reference carries. The state records which build the
+    stored links describe; an incremental run only trusts them when its
+    previous build is that state.
+    """
+    
+    def __init__(self, path=BUILD_SCAN_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(build_links)")]
+            if columns and 'target_path' not in columns:
+                # Links stored before the target_path column are rebuilt by a full scan
+                self.connection.execute("DROP TABLE build_links")
+                self.connection.execute("DROP TABLE IF EXISTS build_state")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS build_state (base_url TEXT PRIMARY KEY, state TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS build_pages (base_url TEXT, path TEXT, PRIMARY KEY (base_url, path))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS build_links ("
+                "base_url TEXT, source_path TEXT, target_url TEXT, target_path TEXT, anchor_text TEXT, element TEXT)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS build_links_target ON build_links (base_url, target_path)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS build_links_source ON build_links (base_url, source_path)"
+            )
+    
+    def get_state(self, base_url):
+        """State of the build whose links are stored for base_url, or None"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT state FROM build_state WHERE base_url = ?", (base_url,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def cached_paths(self, base_url):
+        """Paths of the pages whose links are stored"""
+        with self.lock:
+            return {row[0] for row in self.connection.execute(
+                "SELECT path FROM build_pages WHERE base_url = ?", (base_url,))}
+    
+    def update(self, base_url, pages, removed_paths, state, replace_all=False):
+        """Store the links of scanned pages {path: references}, drop removed pages and record the state"""
+        with self.lock, self.connection:
+            if replace_all:
+                self.connection.execute("DELETE FROM build_links WHERE base_url = ?", (base_url,))
+                self.connection.execute("DELETE FROM build_pages WHERE base_url = ?", (base_url,))
+            else:
+                stale = [(base_url, path) for path in list(pages) + list(removed_paths)]
+                self.connection.executemany("DELETE FROM build_links WHERE base_url = ? AND source_path = ?", stale)
+                self.connection.executemany("DELETE FROM build_pages WHERE base_url = ? AND path = ?", stale)
+            
+            self.connection.executemany("INSERT INTO build_pages VALUES (?, ?)",
+                                        ((base_url, path) for path in pages))
+            self.connection.executemany(
+                "INSERT INTO build_links VALUES (?, ?, ?, ?, ?, ?)",
+                ((base_url, path, target, link_target(target), text, element)
+                 for path, references in pages.items() for target, text, element in references)
+            )
+            self.connection.execute("INSERT OR REPLACE INTO build_state VALUES (?, ?)", (base_url, state))
+    
+    def referrers(self, base_url, target_urls):
+        """Paths of the pages linking to any of target_urls, with or without a query string"""
+        target_urls = list({link_target(url) for url in target_urls})
+        paths = set()
+        with self.lock:
+            for start in range(0, len(target_urls), QUERY_BATCH_SIZE):
+                batch = target_urls[start:start + QUERY_BATCH_SIZE]
+                paths.update(row[0] for row in self.connection.execute(
+                    f"SELECT DISTINCT source_path FROM build_links WHERE base_url = ? "
+                    f"AND target_path IN ({', '.join('?' * len(batch))})", [base_url] + batch))
+        return paths
+    
+    def references(self, base_url, paths):
+        """{path: [(target_url, anchor_text, element)]} of stored pages"""
+        paths = list(paths)
+        references = {path: [] for path in paths}
+        with self.lock:
+            for start in range(0, len(paths), QUERY_BATCH_SIZE):
+                batch = paths[start:start + QUERY_BATCH_SIZE]
+                for path, target, text, element in self.connection.execute(
+                        f"SELECT source_path, target_url, anchor_text, element FROM build_links WHERE base_url = ? "
+                        f"AND source_path IN ({', '.join('?' * len(batch))})", [base_url] + batch):
+                    references[path].append((target, text, element))
+        return references
+    
+    def clear(self):
+        """Delete all stored links and states"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM build_links")
+            self.connection.execute("DELETE FROM build_pages")
+            self.connection.execute("DELETE FROM build_state")
@@ -0,0 +1,345 @@
+# modules/build_directory.py - Offline mode: serve a local build directory as the site at a base URL
+import html
+import io
+import mimetypes
+import mmap
+import os
+import posixpath
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin, urlparse, unquote, quote
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.response import HTTPResponse
+from config import BUILD_DIRECTORY_SETTINGS
+from modules.page_fetcher import timed_session
+from modules.url_processor import URLProcessor
+
+# Link attributes of the elements the crawler follows, matched on the raw bytes
+LINK_PATTERN = re.compile(
+    rb'<(a|link|script|img|form)\b[^>]*?\s(?:href|src|action)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))',
+    re.IGNORECASE
+)
+TAG_PATTERN = re.compile(rb'<[^>]*>')
+# Bytes searched after an <a> start tag for its closing tag
+MAX_ANCHOR_BYTES = 2048
+# Links that never point to a file of the site
+SKIPPED_SCHEMES = ('#', 'mailto:', 'tel:', 'javascript:', 'data:')
+# Non-text/* types served with a charset; build output is taken to be UTF-8
+TEXT_CONTENT_TYPES = {'application/javascript', 'application/json', 'application/xml', 'image/svg+xml'}
+
+def _anchor_text(data, position):
+    """Text of the <a> element whose start tag continues at position"""
+    start = data.find(b'>', position, position + MAX_ANCHOR_BYTES)
+    if start < 0:
+        return ''
+    end = data.find(b'</a', start, start + MAX_ANCHOR_BYTES)
+    if end < 0:
+        return ''
+    text = TAG_PATTERN.sub(b' ', data[start + 1:end]).decode('utf-8', 'replace')
+    return ' '.join(html.unescape(text).split())
+
+def _absolute_url(href, page_url, origin):
+    """Absolute URL of a link without its fragment; root-relative and absolute links skip urljoin"""
+    if href.startswith('/') and not href.startswith('//') and '/.' not in href:
+        url = origin + href
+    elif href.startswith(('http://', 'https://')):
+        url = href
+    else:
+        url = urljoin(page_url, href)
+    return url.split('#', 1)[0]
+
+def scan_html_file(job):
+    """(page_url, [(target_url, anchor_text, element)]) of a built HTML file.
+    
+    The file is memory-mapped and scanned with a bytes pattern, so no DOM is
+    built and the file is never copied into a Python string as a whole.
+    Runs in scan processes; job is (path, page_url).
+    """
+    path, page_url = job
+    origin = page_url[:page_url.find('/', page_url.find('//') + 2)]
+    references = []
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return page_url, references
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for match in LINK_PATTERN.finditer(data):
+                element = match.group(1).lower().decode('ascii')
+                value = match.group(2) or match.group(3) or match.group(4) or b''
+                href = html.unescape(value.decode('utf-8', 'replace')).strip()
+                if not href or href.lower().startswith(SKIPPED_SCHEMES):
+                    continue
+                target = _absolute_url(href, page_url, origin)
+                text = _anchor_text(data, match.end()) if element == 'a' else ''
+                references.append((target, text, element))
+    return page_url, references
+
+class BuildDirectoryAdapter(BaseAdapter):
+    """requests transport answering URLs under the base URL from the build directory.
+    
+    Mounted on the shared session, so pages, stylesheets, scripts and images
+    of the site are read from disk by every analyzer; a missing file is a 404.
+    Text files are served as UTF-8.
+    """
+    
+    def __init__(self, build_directory):
+        super().__init__()
+        self.build_directory = build_directory
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        path = self.build_directory.resolve(request.url)
+        if path is None:
+            status, reason, body = 404, 'Not Found', b''
+            headers = {'Content-Type': 'text/html', 'Content-Length': '0'}
+        else:
+            with open(path, 'rb') as file:
+                body = b'' if request.method == 'HEAD' else file.read()
+            status, reason = 200, 'OK'
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type in TEXT_CONTENT_TYPES:
+                # Without a charset requests would decode text as ISO-8859-1
+                content_type += '; charset=utf-8'
+            headers = {
+                'Content-Type': content_type,
+                'Content-Length': str(os.path.getsize(path))
+            }
+        
+        response = Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status, reason=reason,
+                                    preload_content=False, decode_content=False)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+    
+    def close(self):
+        pass
+
+class BuildDirectory:
+    """A local build output directory analyzed as the site at base_url, without network.
+    
+    The file tree is listed once per run; internal URLs resolve against it
+    like a static file server would (index.html for directories, optional
+    .html suffix). Pages are scanned for links in a process pool.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.root = None
+        self.base_url = None
+        self.files = set()
+        self.html_files = []
+        self.adapter = None
+        self.statistics = {}
+        self.changed_pages = None
+    
+    def configure(self, root=None, base_url=None):
+        """Serve root as base_url for the next run, or go back to HTTP when root is None"""
+        with self.lock:
+            if self.adapter is not None:
+                timed_session.adapters.pop(self.base_url, None)
+                self.adapter = None
+            self.enabled = False
+            self.files = set()
+            self.html_files = []
+            self.statistics = {}
+            self.changed_pages = None
+            if not root:
+                return
+            
+            root = os.path.abspath(root)
+            if not os.path.isdir(root):
+                raise ValueError(f"Build directory not found: {root}")
+            parsed = urlparse(URLProcessor.normalize_url(base_url))
+            self.root = root
+            self.base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path.rstrip('/')}/"
+            
+            extensions = tuple(BUILD_DIRECTORY_SETTINGS['html_extensions'])
+            for directory, directories, filenames in os.walk(root):
+                # A build committed to git is served without its repository metadata
+                directories[:] = [name for name in directories if name != '.git']
+                relative_directory = os.path.relpath(directory, root).replace(os.sep, '/')
+                for filename in filenames:
+                    relative_path = filename if relative_directory == '.' else f"{relative_directory}/{filename}"
+                    self.files.add(relative_path)
+                    if filename.lower().endswith(extensions):
+                        self.html_files.append(relative_path)
+            self.html_files.sort()
+            
+            self.adapter = BuildDirectoryAdapter(self)
+            timed_session.mount(self.base_url, self.adapter)
+            self.enabled = True
+    
+    def clear(self):
+        """Stop serving the build directory"""
+        self.configure()
+    
+    def serves(self, url):
+        """Whether a URL belongs to the site in the build directory"""
+        return self.enabled and (url.startswith(self.base_url) or url == self.base_url[:-1])
+    
+    def url_for(self, relative_path):
+        """URL of a file in the build directory; index.html files map to their directory"""
+        if relative_path == 'index.html' or relative_path.endswith('/index.html'):
+            relative_path = relative_path[:-len('index.html')]
+        return self.base_url + quote(relative_path)
+    
+    def resolve(self, url):
+        """Path of the file a URL under base_url is served from, or None"""
+        if not self.serves(url):
+            return None
+        path = unquote(urlparse(url).path)
+        base_path = urlparse(self.base_url).path
+        relative = path[len(base_path):] if path.startswith(base_path) else ''
+        if relative.endswith('/') or not relative:
+            candidates = [relative + 'index.html']
+        else:
+            candidates = [relative, relative + '/index.html', relative + '.html']
+        
+        for candidate in candidates:
+            candidate = posixpath.normpath(candidate)
+            if candidate.startswith('..'):
+                return None
+            if candidate in self.files:
+                return os.path.join(self.root, *candidate.split('/'))
+        return None
+    
+    def scan(self, link_graph=None, max_links=None):
+        """Scan every page for links in a process pool and return the site's URLs.
+        
+        Pages come first, then other internal URLs they reference (assets and
+        links to missing files); external links are left out because offline
+        mode makes no requests. References are recorded in the link graph.
+        """
+        start = time.perf_counter()
+        pages = {relative_path: references for relative_path, references in self._scan_files(self.html_files)}
+        links_list = self._collect_links(pages, link_graph)
+        self.statistics = {
+            'build_directory': self.root,
+            'base_url': self.base_url,
+            'files': len(self.files),
+            'html_files': len(self.html_files),
+            'references': sum(len(references) for references in pages.values()),
+            'scan_seconds': round(time.perf_counter() - start, 2)
+        }
+        return links_list[:max_links] if max_links else links_list
+    
+    def scan_changes(self, changes, scan_cache, previous_state, state, link_graph=None, max_links=None):
+        """Scan only what changed since a previous build and return the URLs it affects.
+        
+        changes lists added, modified and removed files (see build_diff).
+        Added and modified pages are rescanned; the links of every other page
+        come from scan_cache when it holds the previous build, otherwise the
+        whole build is scanned once to rebuild it. Affected pages are the
+        added and modified pages plus every page linking to a changed or
+        removed file; only they and their links are returned, and
+        changed_pages lists them for the analyzers. Changes that affect no
+        page raise ValueError rather than pass as a clean build.
+        """
+        start = time.perf_counter()
+        html_files = set(self.html_files)
+        changed_files = set(changes['added']) | set(changes['modified'])
+        
+        full_scan = scan_cache.get_state(self.base_url) != previous_state
+        if full_scan:
+            rescan = self.html_files
+        else:
+            cached = scan_cache.cached_paths(self.base_url)
+            rescan = [relative_path for relative_path in self.html_files
+                      if relative_path in changed_files or relative_path not in cached]
+        scanned = {relative_path: references for relative_path, references in self._scan_files(rescan)}
+        scan_cache.update(self.base_url, scanned, changes['removed'], state, replace_all=full_scan)
+        
+        changed_urls = set()
+        for relative_path in changed_files | set(changes['removed']):
+            changed_urls.update(self.urls_for(relative_path))
+        affected = (changed_files | scan_cache.referrers(self.base_url, changed_urls)) & html_files
+        if changed_urls and not affected:
+            raise ValueError(f"{len(changed_files) + len(changes['removed'])} changed files are not referenced "
+                             f"by any page; run a full scan without the previous build")
+        pages = scan_cache.references(self.base_url, affected)
+        
+        links_list = self._collect_links(pages, link_graph)
+        self.changed_pages = [self.url_for(relative_path) for relative_path in sorted(pages)]
+        self.statistics = {
+            'build_directory': self.root,
+            'base_url': self.base_url,
+            'files': len(self.files),
+            'html_files': len(self.html_files),
+            'added_files': len(changes['added']),
+            'modified_files': len(changes['modified']),
+            'removed_files': len(changes['removed']),
+            'rescanned_pages': len(scanned),
+            'affected_pages': len(pages),
+            'full_scan': full_scan,
+            'references': sum(len(references) for references in pages.values()),
+            'scan_seconds': round(time.perf_counter() - start, 2)
+        }
+        return links_list[:max_links] if max_links else links_list
+    
+    def urls_for(self, relative_path):
+        """Every URL a file is served under (index.html by its directory, .html without suffix)"""
+        url = self.base_url + quote(relative_path)
+        urls = {url}
+        if relative_path == 'index.html' or relative_path.endswith('/index.html'):
+            directory_url = url[:-len('index.html')]
+            urls.update([directory_url, directory_url.rstrip('/')])
+        elif relative_path.endswith('.html'):
+            urls.add(url[:-len('.html')])
+        return urls
+    
+    def _scan_files(self, relative_paths):
+        """Yield (relative path, internal references) of pages, scanned in a process pool when there are many"""
+        jobs = [(os.path.join(self.root, *relative_path.split('/')), relative_path) for relative_path in relative_paths]
+        chunksize = BUILD_DIRECTORY_SETTINGS['scan_chunksize']
+        workers = BUILD_DIRECTORY_SETTINGS['scan_workers'] or os.cpu_count() or 1
+        
+        def internal(page_url, references):
+            return [reference for reference in references if self.serves(reference[0])]
+        
+        # A handful of changed pages is scanned faster than a pool starts
+        if len(jobs) <= chunksize:
+            for path, relative_path in jobs:
+                yield relative_path, internal(*scan_html_file((path, self.url_for(relative_path))))
+            return
+        
+        jobs = [(path, self.url_for(relative_path)) for path, relative_path in jobs]
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs) // chunksize + 1))) as executor:
+            for relative_path, (page_url, references) in zip(relative_paths,
+                                                             executor.map(scan_html_file, jobs, chunksize=chunksize)):
+                yield relative_path, internal(page_url, references)
+    
+    def _collect_links(self, pages, link_graph=None):
+        """Page URLs followed by the internal URLs they reference, recorded in the link graph"""
+        page_urls = {relative_path: self.url_for(relative_path) for relative_path in pages}
+        if link_graph is not None:
+            for url in page_urls.values():
+                link_graph.add_page(url, root=url == self.base_url)
+        
+        links = dict.fromkeys(page_urls.values())
+        for relative_path, references in pages.items():
+            links.update(dict.fromkeys(target for target, _, _ in references))
+            if link_graph is not None:
+                page_url = page_urls[relative_path]
+                link_graph.add_links(page_url, [target for target, _, element in references
+                                                if element == 'a' and self.is_page(target)])
+                link_graph.add_references(page_url, references)
+        return URLProcessor.remove_duplicate_urls(list(links))
+    
+    def is_page(self, url):
+        """Whether a URL is served from an HTML file of the build"""
+        path = self.resolve(url)
+        return path is not None and path.lower().endswith(tuple(BUILD_DIRECTORY_SETTINGS['html_extensions']))
+    
+    def get_statistics(self):
+        """File counts and scan time of the current build directory"""
+        return dict(self.statistics)
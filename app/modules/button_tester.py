@@ -4,12 +4,17 @@ import re
 import time
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
+from modules.page_fetcher import fetch_page
+from modules.script_index import get_page_scripts
 
 class ButtonTester:
     """Test button functionality on web pages including click events"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None, component_cache=None, script_store=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
+        self.component_cache = component_cache
+        self.script_store = script_store
         self.click_test_results = []
     
     def test_buttons_on_page(self, url):
@@ -17,18 +22,10 @@ class ButtonTester:
         test_cases = []
         
         try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher)
             
             # Find all button elements
-            buttons = soup.find_all(['button', 'input', 'a'], 
-                                attrs={'type': ['button', 'submit', 'reset']})
-            
-            if not buttons:
-                # Also check for anchor tags that look like buttons
-                buttons = soup.find_all('a', class_=lambda x: x and any(
-                    cls in str(x).lower() for cls in ['btn', 'button', 'cta']
-                ))
+            buttons = self._find_buttons(soup)
             
             if not buttons:
                 test_cases.append(self._create_button_test_case(
@@ -44,16 +41,18 @@ class ButtonTester:
                 ))
                 return test_cases
             
-            # Test each button
-            for idx, button in enumerate(buttons[:10]):  # Limit to 10 buttons
-                button_test_cases = self._analyze_button(button, url, idx)
-                test_cases.extend(button_test_cases)
-                
-                # Test click event execution for buttons with handlers
-                click_test_case = self._test_click_event(button, url, idx)
-                if click_test_case:
-                    test_cases.append(click_test_case)
+            # Scripts are indexed once per page; buttons look themselves up in the index
+            scripts = get_page_scripts(soup, url, self.script_store)
+            
+            # Buttons in shared chrome (header, nav, footer) are tested once per run
+            if self.component_cache:
+                test_cases, excluded_ids = self.component_cache.analyze_components(
+                    soup, url, 'buttons',
+                    lambda component, label: self._test_buttons(self._find_buttons(component), url, scripts)
+                )
+                buttons = [button for button in buttons if id(button) not in excluded_ids]
             
+            test_cases.extend(self._test_buttons(buttons, url, scripts))
             return test_cases
             
         except Exception as e:
@@ -69,7 +68,36 @@ class ButtonTester:
             ))
             return test_cases
     
-    def _analyze_button(self, button, url, index):
+    def _find_buttons(self, root):
+        """Find button elements below root"""
+        buttons = root.find_all(['button', 'input', 'a'], 
+                                attrs={'type': ['button', 'submit', 'reset']})
+        
+        if not buttons:
+            # Also check for anchor tags that look like buttons
+            buttons = root.find_all('a', class_=lambda x: x and any(
+                cls in str(x).lower() for cls in ['btn', 'button', 'cta']
+            ))
+        
+        return buttons
+    
+    def _test_buttons(self, buttons, url, scripts):
+        """Analyze buttons and their click events"""
+        test_cases = []
+        
+        # Test each button
+        for idx, button in enumerate(buttons[:10]):  # Limit to 10 buttons
+            button_test_cases = self._analyze_button(button, url, idx, scripts)
+            test_cases.extend(button_test_cases)
+            
+            # Test click event execution for buttons with handlers
+            click_test_case = self._test_click_event(button, url, idx)
+            if click_test_case:
+                test_cases.append(click_test_case)
+        
+        return test_cases
+    
+    def _analyze_button(self, button, url, index, scripts):
         """Analyze individual button"""
         test_cases = []
         
@@ -152,7 +180,7 @@ class ButtonTester:
             ))
         
         # Check for event listeners in script tags
-        event_listeners = self._find_event_listeners_in_scripts(button, url)
+        event_listeners = self._find_event_listeners_in_scripts(button, scripts)
         if event_listeners:
             test_cases.append(self._create_button_test_case(
                 url=url,
@@ -267,50 +295,9 @@ class ButtonTester:
             redirected_url=redirected_url or "None"
         )
     
-    def _find_event_listeners_in_scripts(self, button, url):
+    def _find_event_listeners_in_scripts(self, button, scripts):
         """Find event listeners attached to button via JavaScript"""
-        try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            scripts = soup.find_all('script')
-            
-            event_listeners = []
-            button_id = button.get('id', '')
-            button_classes = button.get('class', [])
-            
-            for script in scripts:
-                if script.string:
-                    script_content = script.string
-                    
-                    # Look for addEventListener or jQuery bindings
-                    if button_id:
-                        # Check for ID-based selectors
-                        patterns = [
-                            f"addEventListener\\s*\\([^)]*['\"]{re.escape(button_id)}['\"][^)]*\\)",
-                            f"\\.addEventListener\\s*\\([^)]*['\"]click['\"][^)]*\\)",
-                            f"\\$\\s*\\(['\"]#{re.escape(button_id)}['\"]\\)\\.(click|bind|on)\\(",
-                            f"document\\.getElementById\\s*\\(['\"]{re.escape(button_id)}['\"]\\)"
-                        ]
-                        
-                        for pattern in patterns:
-                            if re.search(pattern, script_content, re.IGNORECASE | re.DOTALL):
-                                event_listeners.append("click event listener (by ID)")
-                    
-                    # Check for class-based selectors
-                    for cls in button_classes:
-                        patterns = [
-                            f"\\.{re.escape(cls)}\\.(click|bind|on)\\(",
-                            f"\\$\\s*\\(['\"]\\.{re.escape(cls)}['\"]\\)\\.(click|bind|on)\\(",
-                            f"querySelectorAll\\s*\\(['\"]\\.{re.escape(cls)}['\"]\\)"
-                        ]
-                        
-                        for pattern in patterns:
-                            if re.search(pattern, script_content, re.IGNORECASE | re.DOTALL):
-                                event_listeners.append(f"event listener (by class .{cls})")
-            
-            return list(set(event_listeners))
-        except:
-            return []
+        return scripts.listeners_for(button)
     
     def _get_button_text(self, button):
         """Extract text from button element"""
@@ -0,0 +1,116 @@
+# modules/circuit_breaker.py - Per-host circuit breaker for dead or slow origins
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from config import CIRCUIT_BREAKER_SETTINGS
+
+class HostUnreachableError(requests.exceptions.ConnectionError):
+    """Raised instead of a request while the circuit of its host is open"""
+
+def get_origin(url):
+    """Scheme and host of a URL, the unit the breaker tracks"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+class HostCircuitBreaker:
+    """Stop requesting hosts after consecutive connect failures or timeouts.
+    
+    closed -> open after failure_threshold consecutive failures; open ->
+    half-open once cooldown_seconds have passed, letting a single probe
+    through; the probe closes the circuit on success or reopens it.
+    """
+    
+    def __init__(self, failure_threshold=None, cooldown_seconds=None):
+        self.failure_threshold = failure_threshold or CIRCUIT_BREAKER_SETTINGS['failure_threshold']
+        self.cooldown_seconds = cooldown_seconds or CIRCUIT_BREAKER_SETTINGS['cooldown_seconds']
+        self.lock = threading.Lock()
+        self.hosts = {}
+    
+    def clear(self):
+        """Forget the state of all hosts"""
+        with self.lock:
+            self.hosts = {}
+    
+    def _get_host(self, origin):
+        """Get the breaker state of an origin, creating it closed"""
+        host = self.hosts.get(origin)
+        if host is None:
+            host = {'state': 'closed', 'failures': 0, 'opened_at': 0, 'short_circuited': 0, 'trips': 0,
+                    'last_error': ''}
+            self.hosts[origin] = host
+        return host
+    
+    def allow_request(self, url):
+        """Whether a request to the host of url may be sent now"""
+        with self.lock:
+            host = self._get_host(get_origin(url))
+            if host['state'] == 'closed':
+                return True
+            if host['state'] == 'open' and time.time() - host['opened_at'] >= self.cooldown_seconds:
+                # Half-open: this request is the probe, others keep failing fast
+                host['state'] = 'half_open'
+                return True
+            host['short_circuited'] += 1
+            return False
+    
+    def record_success(self, url):
+        """The host answered (any HTTP status counts as reachable)"""
+        with self.lock:
+            host = self._get_host(get_origin(url))
+            host['state'] = 'closed'
+            host['failures'] = 0
+    
+    def record_failure(self, url, error=''):
+        """The host could not be connected to or timed out"""
+        with self.lock:
+            host = self._get_host(get_origin(url))
+            host['failures'] += 1
+            host['last_error'] = str(error).split('\n')[0][:200]
+            if host['state'] == 'half_open' or host['failures'] >= self.failure_threshold:
+                if host['state'] != 'open':
+                    host['trips'] += 1
+                host['state'] = 'open'
+                host['opened_at'] = time.time()
+    
+    def release_probe(self, url):
+        """A half-open probe ended without telling whether the host is reachable; the next request probes again"""
+        with self.lock:
+            host = self._get_host(get_origin(url))
+            if host['state'] == 'half_open':
+                host['state'] = 'open'
+    
+    def get(self, url, request=None, **kwargs):
+        """requests.get (or the given request function) guarded by the circuit of the URL's host"""
+        if not self.allow_request(url):
+            host = self.hosts[get_origin(url)]
+            raise HostUnreachableError(
+                f"Host unreachable: {get_origin(url)} failed {host['failures']} consecutive requests "
+                f"({host['last_error'][:80]}); request skipped"
+            )
+        
+        try:
+            response = (request or requests.get)(url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self.record_failure(url, e)
+            raise
+        except Exception:
+            # Redirect loops, undecodable bodies, invalid URLs and similar
+            # errors say nothing about whether the host is reachable
+            self.release_probe(url)
+            raise
+        
+        self.record_success(url)
+        return response
+    
+    def get_statistics(self):
+        """Get the hosts whose circuit tripped during the run"""
+        with self.lock:
+            return [{
+                'host': origin,
+                'state': host['state'],
+                'consecutive_failures': host['failures'],
+                'trips': host['trips'],
+                'short_circuited_requests': host['short_circuited'],
+                'last_error': host['last_error']
+            } for origin, host in self.hosts.items() if host['trips']]
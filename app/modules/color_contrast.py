@@ -0,0 +1,413 @@
+# modules/color_contrast.py - Cascade-resolved text colors and WCAG contrast ratios
+import bisect
+import colorsys
+import re
+import numpy as np
+import soupsieve
+from bs4.element import NavigableString
+from config import CONTRAST_SETTINGS
+from modules.constants import CSS_NAMED_COLORS
+from modules.css_tokenizer import scan_stylesheet, media_breakpoints
+
+HEX_PATTERN = re.compile(r'#([0-9a-fA-F]{3,8})\b')
+COLOR_FUNCTION_PATTERN = re.compile(r'\b(rgba?|hsla?)\(\s*([^()]*)\)', re.IGNORECASE)
+VAR_PATTERN = re.compile(r'var\(\s*(--[\w-]+)\s*(?:,\s*([^()]*(?:\([^()]*\)[^()]*)*))?\)')
+WORD_PATTERN = re.compile(r'[a-zA-Z]+')
+LENGTH_PATTERN = re.compile(r'(-?[\d.]+)(px|em|rem|%|pt)\b')
+ID_SELECTOR = re.compile(r'#[\w-]+')
+CLASS_SELECTOR = re.compile(r'\.[\w-]+|\[[^\]]*\]|:(?!:)[\w-]+(?:\([^)]*\))?')
+COMBINATOR_PATTERN = re.compile(r'\s*[>+~]\s*|\s+')
+TYPE_SELECTOR = re.compile(r'(?:^|[\s>+~(])([a-zA-Z][\w-]*)')
+# States and pseudo-elements that say nothing about how text renders at rest
+DYNAMIC_SELECTOR = re.compile(r':(?:hover|focus|active|visited|target|checked|invalid|placeholder|selection|before'
+                              r'|after|first-line|first-letter|marker|-webkit-|-moz-|-ms-)', re.IGNORECASE)
+
+# Properties the resolver looks at; custom properties (--*) are always kept
+RESOLVED_PROPERTIES = ('color', 'background-color', 'background', 'background-image',
+                       'font-size', 'font-weight', 'font', 'display', 'visibility')
+NON_TEXT_ELEMENTS = {'script', 'style', 'noscript', 'template', 'head', 'title', 'svg', 'math'}
+# User-agent stylesheet defaults for relative font sizes and bold elements
+HEADING_SIZES = {'h1': 2.0, 'h2': 1.5, 'h3': 1.17, 'h5': 0.83, 'h6': 0.67, 'small': 0.833}
+BOLD_ELEMENTS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'b', 'strong', 'th'}
+FONT_SIZE_KEYWORDS = {'xx-small': 9, 'x-small': 10, 'small': 13, 'medium': 16, 'large': 18,
+                      'x-large': 24, 'xx-large': 32, 'xxx-large': 48}
+ROOT_FONT_SIZE = 16
+LINK_COLOR = (0.0, 0.0, 238.0, 1.0)
+INHERIT = 'inherit'
+
+def _channel(value, scale=255.0):
+    """Numeric color channel, with percentages relative to scale"""
+    value = value.strip()
+    if value.endswith('%'):
+        return float(value[:-1]) * scale / 100
+    return float(value)
+
+def parse_color(value):
+    """(r, g, b, alpha) of a CSS color, INHERIT for currentcolor/inherit, or None"""
+    value = value.strip().lower()
+    if value in ['inherit', 'currentcolor', 'unset']:
+        return INHERIT
+    if value == 'transparent':
+        return (0.0, 0.0, 0.0, 0.0)
+    if value in CSS_NAMED_COLORS:
+        value = CSS_NAMED_COLORS[value]
+    
+    if value.startswith('#'):
+        digits = value[1:]
+        if len(digits) in [3, 4]:
+            digits = ''.join(digit * 2 for digit in digits)
+        if len(digits) not in [6, 8] or not re.fullmatch(r'[0-9a-f]+', digits):
+            return None
+        alpha = int(digits[6:8], 16) / 255 if len(digits) == 8 else 1.0
+        return (float(int(digits[0:2], 16)), float(int(digits[2:4], 16)), float(int(digits[4:6], 16)), alpha)
+    
+    match = COLOR_FUNCTION_PATTERN.fullmatch(value)
+    if not match:
+        return None
+    parts = [part for part in re.split(r'[\s,/]+', match.group(2).strip()) if part]
+    if len(parts) not in [3, 4]:
+        return None
+    try:
+        alpha = _channel(parts[3], 1.0) if len(parts) == 4 else 1.0
+        if match.group(1).startswith('rgb'):
+            red, green, blue = (min(255.0, max(0.0, _channel(part))) for part in parts[:3])
+        else:
+            hue = float(re.sub(r'deg$', '', parts[0])) / 360 % 1
+            red, green, blue = (channel * 255 for channel in
+                                colorsys.hls_to_rgb(hue, _channel(parts[2], 1.0), _channel(parts[1], 1.0)))
+    except ValueError:
+        return None
+    return (red, green, blue, min(1.0, max(0.0, alpha)))
+
+def find_background(value):
+    """(color, has_image) of a background shorthand; color is None when none is given"""
+    lowered = value.lower()
+    has_image = 'url(' in lowered or 'gradient(' in lowered
+    for match in COLOR_FUNCTION_PATTERN.finditer(value):
+        return parse_color(match.group(0)), has_image
+    for match in HEX_PATTERN.finditer(value):
+        return parse_color(match.group(0)), has_image
+    for word in WORD_PATTERN.findall(lowered):
+        if word in CSS_NAMED_COLORS or word == 'transparent':
+            return parse_color(word), has_image
+    return None, has_image
+
+def media_applies(media, viewport_width):
+    """Whether a media condition holds on a desktop screen of viewport_width px"""
+    if not media:
+        return True
+    for query in media.lower().split(','):
+        if query.strip().startswith('not') or ('print' in query and 'screen' not in query):
+            continue
+        if 'prefers-color-scheme' in query and 'dark' in query:
+            continue
+        if all(viewport_width >= pixels if kind == 'min' else viewport_width <= pixels
+               for kind, pixels in media_breakpoints(query)):
+            return True
+    return False
+
+def specificity(selector):
+    """(ids, classes/attributes/pseudo-classes, types) of one complex selector"""
+    selector = re.sub(r'\[[^\]]*\]', '[]', selector)
+    return (len(ID_SELECTOR.findall(selector)), len(CLASS_SELECTOR.findall(selector)),
+            len(TYPE_SELECTOR.findall(selector.replace('::', ' '))))
+
+def _split_selector_list(selectors):
+    """Complex selectors of a selector list, ignoring commas inside parentheses"""
+    parts, depth, start = [], 0, 0
+    for position, character in enumerate(selectors):
+        if character == '(':
+            depth += 1
+        elif character == ')':
+            depth -= 1
+        elif character == ',' and depth == 0:
+            parts.append(selectors[start:position].strip())
+            start = position + 1
+    parts.append(selectors[start:].strip())
+    return [part for part in parts if part]
+
+def relative_luminance(rgb):
+    """WCAG relative luminance of an (N, 3) array of 0-255 sRGB colors"""
+    channels = rgb / 255.0
+    linear = np.where(channels <= 0.04045, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+def contrast_ratios(foreground, background):
+    """WCAG contrast ratios of RGBA text colors over opaque RGB backgrounds, in one batch"""
+    foreground = np.asarray(foreground, dtype=np.float64).reshape(-1, 4)
+    background = np.asarray(background, dtype=np.float64).reshape(-1, 3)
+    alpha = foreground[:, 3:4]
+    text = foreground[:, :3] * alpha + background * (1 - alpha)
+    text_luminance = relative_luminance(text)
+    background_luminance = relative_luminance(background)
+    lighter = np.maximum(text_luminance, background_luminance)
+    darker = np.minimum(text_luminance, background_luminance)
+    return (lighter + 0.05) / (darker + 0.05)
+
+def to_hex(color):
+    return '#' + ''.join(f'{int(round(channel)):02x}' for channel in color[:3])
+
+class CascadeResolver:
+    """Computed text color, backdrop and font of elements from a page's CSS index.
+    
+    Only the properties contrast depends on are resolved. Each selector is
+    matched once per page, and only against elements carrying the id, class
+    or tag of its rightmost compound that also sit inside an element of its
+    most selective ancestor compound. Media queries are evaluated for a
+    desktop viewport; hover/focus states and pseudo-elements are ignored.
+    """
+    
+    def __init__(self, soup, page_css, viewport_width=None):
+        self.soup = soup
+        self.viewport_width = viewport_width or CONTRAST_SETTINGS['viewport_width']
+        self.specified = {}
+        self.order = 0  # Style attributes in document order
+        elements = soup.find_all(True)
+        # Candidate elements by the keys a rightmost compound selector can name
+        self.by_id, self.by_class, self.by_tag = {}, {}, {}
+        # Document position of each element and the position just past its subtree
+        self.position, self.subtree_end, self.bucket_positions = {}, {}, {}
+        open_elements = []
+        for position, element in enumerate(elements):
+            self.position[id(element)] = position
+            while open_elements and open_elements[-1] is not element.parent:
+                self.subtree_end[id(open_elements.pop())] = position
+            open_elements.append(element)
+            self.by_tag.setdefault(element.name, []).append(element)
+            if element.get('id'):
+                self.by_id.setdefault(element['id'], []).append(element)
+            for class_name in element.get('class', []):
+                self.by_class.setdefault(class_name, []).append(element)
+        for element in open_elements:
+            self.subtree_end[id(element)] = len(elements)
+        self.elements = elements
+        self._apply_stylesheets(page_css)
+        self._apply_style_attributes(elements)
+    
+    def _bucket(self, compound):
+        """Smallest id, class or tag bucket a compound selector names, or None for universal compounds"""
+        compound = re.sub(r'\[[^\]]*\]|:[\w-]+(?:\([^)]*\))?', '', compound)
+        buckets = [self.by_id.get(element_id, []) for element_id in re.findall(r'#([\w-]+)', compound)]
+        buckets += [self.by_class.get(class_name, []) for class_name in re.findall(r'\.([\w-]+)', compound)]
+        tag = re.match(r'[a-zA-Z][\w-]*', compound)
+        if tag:
+            buckets.append(self.by_tag.get(tag.group(0).lower(), []))
+        return min(buckets, key=len) if buckets else None
+    
+    def _candidates(self, selector):
+        """Elements a selector could match, from the buckets of its rightmost and most selective ancestor compounds"""
+        compounds = COMBINATOR_PATTERN.split(re.sub(r'\[[^\]]*\]|\([^)]*\)', '', selector.strip()))
+        candidates = self._bucket(compounds[-1])
+        if candidates is None:
+            candidates = self.elements
+        if len(compounds) < 2 or not candidates or re.search(r'[+~]', selector):
+            return candidates
+        
+        # With only descendant and child combinators, a match must sit inside
+        # an element of every ancestor compound; the smallest bucket prunes most
+        anchors = [bucket for bucket in map(self._bucket, compounds[:-1]) if bucket is not None]
+        if not anchors:
+            return candidates
+        anchor = min(anchors, key=len)
+        if len(anchor) >= len(candidates):
+            return candidates
+        positions = self.bucket_positions.get(id(candidates))
+        if positions is None:
+            positions = self.bucket_positions[id(candidates)] = [self.position[id(element)] for element in candidates]
+        inside = set()
+        for element in anchor:
+            start = bisect.bisect_right(positions, self.position[id(element)])
+            end = bisect.bisect_left(positions, self.subtree_end[id(element)])
+            inside.update(range(start, end))
+        return [candidates[index] for index in sorted(inside)]
+    
+    def _match(self, selector):
+        """Elements a selector matches, running the full selector only on its candidates"""
+        candidates = self._candidates(selector)
+        if not candidates:
+            return []
+        compiled = soupsieve.compile(selector)
+        return [element for element in candidates if compiled.match(element)]
+    
+    def _specify(self, element, name, value, priority):
+        specified = self.specified.setdefault(id(element), {})
+        current = specified.get(name)
+        if current is None or priority >= current[0]:
+            specified[name] = (priority, value)
+    
+    def _apply_stylesheets(self, page_css):
+        """Match every relevant rule once and keep the winning declaration per element and property"""
+        matches = {}
+        for sheet_number, index in enumerate(page_css.indexes):
+            if index.source == 'style attributes':
+                continue
+            names = [name for name in index.declarations if name in RESOLVED_PROPERTIES or name.startswith('--')]
+            for declaration in (declaration for name in names for declaration in index.declarations[name]):
+                if not media_applies(declaration.media, self.viewport_width):
+                    continue
+                for selector in _split_selector_list(declaration.selector):
+                    if DYNAMIC_SELECTOR.search(selector):
+                        continue
+                    if selector not in matches:
+                        try:
+                            matches[selector] = self._match(selector)
+                        except Exception:
+                            matches[selector] = []
+                    priority = (declaration.important, 0, specificity(selector), sheet_number, declaration.order)
+                    for element in matches[selector]:
+                        self._specify(element, declaration.property, declaration.value, priority)
+    
+    def _apply_style_attributes(self, elements):
+        """Style attributes beat every selector unless a stylesheet declaration is !important"""
+        for element in elements:
+            style = element.get('style')
+            if not style:
+                continue
+            for event, value in scan_stylesheet(f"x{{{style}}}"):
+                if event == 'declaration':
+                    name, declared, important = value[0], value[1], value[2]
+                    if name in RESOLVED_PROPERTIES or name.startswith('--'):
+                        self.order += 1
+                        self._specify(element, name, declared, (important, 1, (0, 0, 0), 0, self.order))
+    
+    def _font_size(self, value, parent_size):
+        value = value.strip().lower()
+        if value in FONT_SIZE_KEYWORDS:
+            return FONT_SIZE_KEYWORDS[value]
+        if value in ['smaller', 'larger']:
+            return parent_size * (0.833 if value == 'smaller' else 1.2)
+        match = LENGTH_PATTERN.search(value)
+        if not match:
+            return parent_size
+        number, unit = float(match.group(1)), match.group(2)
+        return {'px': number, 'em': number * parent_size, 'rem': number * ROOT_FONT_SIZE,
+                '%': number * parent_size / 100, 'pt': number * 4 / 3}[unit]
+    
+    def _background(self, specified, resolve):
+        """(color or None, has_image) from background-color and the background shorthand, whichever wins"""
+        color, has_image = None, False
+        longhand = specified.get('background-color')
+        shorthand = specified.get('background')
+        if longhand:
+            color = parse_color(resolve('background-color'))
+        if shorthand:
+            shorthand_color, has_image = find_background(resolve('background'))
+            if not longhand or shorthand[0] > longhand[0]:
+                # A later shorthand without a color resets it to transparent
+                color = shorthand_color if shorthand_color is not None else (0.0, 0.0, 0.0, 0.0)
+        image = resolve('background-image')
+        if image and image.strip().lower() != 'none':
+            has_image = True
+        return color, has_image
+    
+    def computed_styles(self):
+        """Yield (element, style) in document order; style holds color, backdrop, font and visibility"""
+        root = {'color': (0.0, 0.0, 0.0, 1.0), 'backdrop': (255.0, 255.0, 255.0), 'image': False,
+                'font_size': float(ROOT_FONT_SIZE), 'bold': False, 'hidden': False, 'variables': {},
+                'undetermined': False}
+        computed = {id(self.soup): root}
+        for element in self.soup.find_all(True):
+            parent = computed.get(id(element.parent), root)
+            specified = self.specified.get(id(element), {})
+            style = dict(parent)
+            
+            custom = {name: value for name, (_, value) in specified.items() if name.startswith('--')}
+            if custom:
+                style['variables'] = dict(parent['variables'], **custom)
+            
+            def resolve(name):
+                """Specified value with var() references substituted"""
+                value = specified[name][1] if name in specified else None
+                for _ in range(3):
+                    if not value or 'var(' not in value:
+                        break
+                    value = VAR_PATTERN.sub(lambda match: style['variables'].get(match.group(1), match.group(2) or ''), value)
+                return value
+            
+            # Text color inherits; links default to the user-agent link color
+            color = resolve('color')
+            if color:
+                parsed = parse_color(color)
+                if parsed != INHERIT:
+                    style['color'] = parsed
+                    style['undetermined'] = parsed is None
+            elif element.name == 'a' and element.get('href') is not None:
+                style['color'] = LINK_COLOR
+            
+            # Backgrounds do not inherit but paint behind descendants
+            background, has_image = self._background(specified, resolve)
+            if background not in [None, INHERIT] and background[3] > 0:
+                alpha = background[3]
+                style['backdrop'] = tuple(channel * alpha + backdrop * (1 - alpha)
+                                          for channel, backdrop in zip(background[:3], parent['backdrop']))
+                if alpha >= 1:
+                    style['image'] = False
+            if has_image:
+                style['image'] = True
+            
+            style['font_size'] = parent['font_size'] * HEADING_SIZES.get(element.name, 1.0)
+            if element.name in BOLD_ELEMENTS:
+                style['bold'] = True
+            if resolve('font'):
+                style['font_size'] = self._font_size(resolve('font'), parent['font_size'])
+                style['bold'] = bool(re.search(r'\b(bold|bolder|[7-9]00)\b', resolve('font')))
+            if resolve('font-size'):
+                style['font_size'] = self._font_size(resolve('font-size'), parent['font_size'])
+            weight = (resolve('font-weight') or '').strip().lower()
+            if weight:
+                style['bold'] = weight in ['bold', 'bolder'] or (weight.isdigit() and int(weight) >= 700)
+            
+            if (element.name in NON_TEXT_ELEMENTS or element.has_attr('hidden')
+                    or (resolve('display') or '').strip() == 'none'
+                    or (resolve('visibility') or '').strip() == 'hidden'):
+                style['hidden'] = True
+            
+            computed[id(element)] = style
+            yield element, style
+
+def analyze_text_contrast(soup, page_css, viewport_width=None):
+    """WCAG contrast of every visible text node of a page.
+    
+    Colors come from the cascade resolver; the ratios of all text nodes are
+    computed in one NumPy batch. Text over background images or with colors
+    that cannot be resolved is counted as undetermined.
+    """
+    resolver = CascadeResolver(soup, page_css, viewport_width)
+    texts, foregrounds, backdrops, large = [], [], [], []
+    undetermined = 0
+    for element, style in resolver.computed_styles():
+        if style['hidden']:
+            continue
+        text = ' '.join(str(child).strip() for child in element.children
+                        if type(child) is NavigableString and str(child).strip())
+        if not text:
+            continue
+        if style['image'] or style['undetermined']:
+            undetermined += 1
+            continue
+        texts.append((element, text))
+        foregrounds.append(style['color'])
+        backdrops.append(style['backdrop'])
+        large.append(style['font_size'] >= CONTRAST_SETTINGS['large_text_px'] or
+                     (style['bold'] and style['font_size'] >= CONTRAST_SETTINGS['large_bold_text_px']))
+    
+    result = {'checked': len(texts), 'undetermined': undetermined, 'failures': [], 'min_ratio': None}
+    if not texts:
+        return result
+    
+    ratios = contrast_ratios(foregrounds, backdrops)
+    required = np.where(np.array(large), CONTRAST_SETTINGS['large_text_ratio'], CONTRAST_SETTINGS['normal_text_ratio'])
+    # Compare at the two decimals ratios are reported with, so 4.499 does not fail as 4.50
+    failing = np.flatnonzero(np.round(ratios, 2) < required)
+    result['min_ratio'] = round(float(ratios.min()), 2)
+    for position in failing[np.argsort(ratios[failing])]:
+        element, text = texts[position]
+        result['failures'].append({
+            'element': element.name + (f"#{element['id']}" if element.get('id') else ''),
+            'text': text[:60],
+            'ratio': round(float(ratios[position]), 2),
+            'required': float(required[position]),
+            'foreground': to_hex(foregrounds[position]),
+            'background': to_hex(backdrops[position])
+        })
+    return result
@@ -0,0 +1,94 @@
+# modules/component_cache.py - Memoization of shared page chrome
+import hashlib
+import threading
+
+# Elements that usually hold markup repeated on every page of a site
+CHROME_TAGS = ['header', 'nav', 'footer']
+CHROME_ROLES = ['banner', 'navigation', 'contentinfo']
+
+def subtree_hash(element):
+    """Content hash of an element and everything below it"""
+    return hashlib.blake2b(str(element).encode('utf-8'), digest_size=16).hexdigest()
+
+class ComponentCache:
+    """Analyze repeated header, nav and footer subtrees once per run"""
+    
+    def __init__(self):
+        self.components = {}
+        self.analyzed = set()
+        self.lock = threading.Lock()
+    
+    def clear(self):
+        """Clear all known components"""
+        with self.lock:
+            self.components = {}
+            self.analyzed = set()
+    
+    def find_components(self, soup):
+        """Find the outermost chrome elements of a page and the ids of all elements inside them"""
+        components = []
+        component_element_ids = set()
+        for element in soup.find_all(lambda tag: tag.name in CHROME_TAGS or tag.get('role') in CHROME_ROLES):
+            if id(element) in component_element_ids:
+                continue
+            components.append(element)
+            component_element_ids.add(id(element))
+            component_element_ids.update(id(child) for child in element.find_all(True))
+        return components, component_element_ids
+    
+    def _register(self, element, url):
+        """Register a component occurrence and get its record"""
+        component_hash = subtree_hash(element)
+        with self.lock:
+            component = self.components.get(component_hash)
+            if component is None:
+                component = {
+                    'hash': component_hash,
+                    'tag': element.name,
+                    'label': f"Site-wide component <{element.name}> #{component_hash[:8]} (first seen on {url})",
+                    'first_url': url,
+                    'pages': set()
+                }
+                self.components[component_hash] = component
+            component['pages'].add(url)
+        return component
+    
+    def analyze_components(self, soup, url, analyzer, analyze):
+        """Run analyze(element, label) once per distinct component and analyzer.
+        
+        Returns the test cases of components not analyzed before, attributed to
+        the site-wide component, and the ids of all elements inside components
+        so the caller can limit its page-level analysis to the remaining markup.
+        """
+        test_cases = []
+        components, component_element_ids = self.find_components(soup)
+        
+        for element in components:
+            component = self._register(element, url)
+            key = (analyzer, component['hash'])
+            with self.lock:
+                if key in self.analyzed:
+                    continue
+                self.analyzed.add(key)
+            
+            for test_case in analyze(element, component['label']):
+                if isinstance(test_case, dict):
+                    test_case['Test Links/Data'] = component['label']
+                    test_case['Site-wide Component'] = component['hash']
+                    test_case['Comments/Bug ID'] = (
+                        f"{test_case.get('Comments/Bug ID', '')} | " if test_case.get('Comments/Bug ID') else ''
+                    ) + "Reported once for all pages sharing this component"
+                    test_cases.append(test_case)
+        
+        return test_cases, component_element_ids
+    
+    def get_components_summary(self):
+        """Get the site-wide components and how many pages include them"""
+        with self.lock:
+            components = [{
+                'component': component['label'],
+                'tag': component['tag'],
+                'first_seen_on': component['first_url'],
+                'page_count': len(component['pages'])
+            } for component in self.components.values()]
+        return sorted(components, key=lambda component: component['page_count'], reverse=True)
@@ -0,0 +1,154 @@
+# modules/compression.py - Transfer compression measurement
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Content-type classes worth compressing on the wire
+COMPRESSIBLE_CLASSES = {'html', 'css', 'script', 'text'}
+# Content codings that count as compression
+COMPRESSED_ENCODINGS = {'gzip', 'x-gzip', 'br', 'zstd', 'deflate', 'compress'}
+
+class GzipDecoder:
+    """Incremental gzip decoder that also reads bodies of several concatenated members"""
+    
+    def __init__(self):
+        self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.first_member = True
+    
+    def decompress(self, data):
+        output = []
+        while data:
+            try:
+                output.append(self.decompressor.decompress(data))
+            except zlib.error:
+                if self.first_member:
+                    raise
+                # Bytes after a complete member that are not gzip are ignored, as browsers do
+                break
+            data = self.decompressor.unused_data
+            if data:
+                self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                self.first_member = False
+        return b''.join(output)
+    
+    def flush(self):
+        return self.decompressor.flush()
+
+class DeflateDecoder:
+    """Incremental deflate decoder accepting zlib-wrapped and raw deflate bodies"""
+    
+    def __init__(self):
+        self.decompressor = zlib.decompressobj()
+        # Bytes kept until the first output shows whether the body is zlib-wrapped
+        self.pending = b''
+    
+    def decompress(self, data):
+        if self.pending is None:
+            return self.decompressor.decompress(data)
+        self.pending += data
+        try:
+            output = self.decompressor.decompress(data)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            data, self.pending = self.pending, None
+            return self.decompressor.decompress(data)
+        if output:
+            self.pending = None
+        return output
+    
+    def flush(self):
+        return self.decompressor.flush()
+
+class BrotliDecoder:
+    """Incremental brotli decoder"""
+    
+    def __init__(self):
+        self.decompressor = brotli.Decompressor()
+    
+    def decompress(self, data):
+        # brotli names it process, brotlicffi decompress
+        if hasattr(self.decompressor, 'process'):
+            return self.decompressor.process(data)
+        return self.decompressor.decompress(data)
+    
+    def flush(self):
+        return b''
+
+class MultiDecoder:
+    """Decoder for several content codings, undone in reverse order of application"""
+    
+    def __init__(self, decoders):
+        self.decoders = decoders
+    
+    def decompress(self, data):
+        for decoder in reversed(self.decoders):
+            data = decoder.decompress(data)
+        return data
+    
+    def flush(self):
+        data = b''
+        for position in range(len(self.decoders) - 1, -1, -1):
+            if data:
+                data = self.decoders[position].decompress(data)
+            data += self.decoders[position].flush()
+        return data
+
+DECODERS = {'gzip': GzipDecoder, 'x-gzip': GzipDecoder, 'deflate': DeflateDecoder}
+if brotli is not None:
+    DECODERS['br'] = BrotliDecoder
+# Advertise only codings the streaming fetch can decode
+ACCEPT_ENCODING = ', '.join(encoding for encoding in DECODERS if encoding != 'x-gzip')
+
+def content_decoder(headers):
+    """Decoder for a response's Content-Encoding, or None when the body is not decoded.
+    
+    Built from zlib, and brotli (or brotlicffi) when installed; bodies in any other coding
+    are kept as received.
+    """
+    encodings = [encoding.strip() for encoding in headers.get('Content-Encoding', '').lower().split(',')
+                 if encoding.strip() and encoding.strip() != 'identity']
+    if not encodings or any(encoding not in DECODERS for encoding in encodings):
+        return None
+    if len(encodings) == 1:
+        return DECODERS[encodings[0]]()
+    return MultiDecoder([DECODERS[encoding]() for encoding in encodings])
+
+def estimate_compressed_sizes(content):
+    """Sizes of a body compressed with gzip (level 6) and, when available, brotli"""
+    sizes = {'gzip': len(zlib.compress(content, 6)) + 18}  # plus gzip header and trailer
+    if brotli is not None:
+        sizes['br'] = len(brotli.compress(content, quality=5))
+    return sizes
+
+def compression_info(response):
+    """Encoding, wire and decoded bytes, ratio and estimated savings of a fetched response"""
+    encoding = response.headers.get('Content-Encoding', '').lower().strip()
+    wire_bytes = getattr(response, 'wire_bytes', len(response.content))
+    decoded_bytes = len(response.content)
+    compressed = any(value.strip() in COMPRESSED_ENCODINGS for value in encoding.split(','))
+    compressible = getattr(response, 'body_class', 'html') in COMPRESSIBLE_CLASSES
+    
+    info = {
+        'content_encoding': encoding or 'identity',
+        'wire_bytes': wire_bytes,
+        'decoded_bytes': decoded_bytes,
+        'compression_ratio': round(decoded_bytes / wire_bytes, 2) if compressed and wire_bytes else 1.0,
+        'compressible': compressible,
+        'estimated_savings_bytes': 0,
+        'best_encoding': ''
+    }
+    
+    # Uncompressed text bodies: estimate what br/gzip would save on the wire
+    if compressible and not compressed and decoded_bytes and not getattr(response, 'truncated', False):
+        sizes = estimate_compressed_sizes(response.content)
+        best_encoding = min(sizes, key=sizes.get)
+        info['estimated_savings_bytes'] = max(0, decoded_bytes - sizes[best_encoding])
+        info['best_encoding'] = best_encoding
+    return info
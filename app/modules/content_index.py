@@ -0,0 +1,157 @@
+# modules/content_index.py - Site-wide near-duplicate content detection
+import re
+import threading
+import zlib
+import numpy as np
+
+# MinHash signature size and LSH banding (BANDS * ROWS == NUM_PERMUTATIONS)
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = 8
+# Word shingle size and the similarity at which pages count as duplicates
+SHINGLE_SIZE = 5
+DUPLICATE_THRESHOLD = 0.8
+# Largest prime below 2**32; keeps (a * x + b) within uint64 for 32-bit a, x, b
+MERSENNE_PRIME = np.uint64(4294967291)
+# Text in these elements repeats on every page and is left out of shingles
+BOILERPLATE_TAGS = ['header', 'nav', 'footer', 'script', 'style', 'noscript']
+
+def extract_content_text(soup):
+    """Get the page text without site-wide boilerplate"""
+    parts = []
+    root = soup.body or soup
+    for text in root.find_all(string=True):
+        if text.find_parent(BOILERPLATE_TAGS):
+            continue
+        parts.append(text)
+    return ' '.join(parts)
+
+class ContentDuplicateIndex:
+    """Incremental MinHash + LSH index that clusters near-duplicate pages"""
+    
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, bands=LSH_BANDS,
+                 threshold=DUPLICATE_THRESHOLD, seed=1):
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be a multiple of bands")
+        
+        self.num_permutations = num_permutations
+        self.bands = bands
+        self.rows = num_permutations // bands
+        self.threshold = threshold
+        
+        rng = np.random.RandomState(seed)
+        self.perm_a = rng.randint(1, 2 ** 32 - 1, size=num_permutations, dtype=np.uint64)
+        self.perm_b = rng.randint(0, 2 ** 32 - 1, size=num_permutations, dtype=np.uint64)
+        self.lock = threading.Lock()
+        self.clear()
+    
+    def clear(self):
+        """Remove all indexed pages"""
+        self.urls = []
+        self.signatures = np.empty((1024, self.num_permutations), dtype=np.uint32)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.parents = []
+        self.similarities = {}
+    
+    def _shingle_hashes(self, text):
+        """32-bit hashes of the word shingles of a text"""
+        words = re.findall(r'\w+', text.lower())
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        size = min(SHINGLE_SIZE, len(words))
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        return np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                           dtype=np.uint64, count=len(shingles))
+    
+    def compute_signature(self, text):
+        """MinHash signature of a text as a uint32 array, or None for pages without words"""
+        hashes = self._shingle_hashes(text)
+        if not len(hashes):
+            return None
+        
+        signature = np.full(self.num_permutations, np.iinfo(np.uint32).max, dtype=np.uint64)
+        
+        # Process shingles in chunks to bound the permutation matrix size
+        for start in range(0, len(hashes), 4096):
+            chunk = hashes[start:start + 4096]
+            permuted = (np.outer(self.perm_a, chunk) + self.perm_b[:, None]) % MERSENNE_PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        
+        return signature.astype(np.uint32)
+    
+    def _find(self, doc_id):
+        """Union-find root of a page"""
+        while self.parents[doc_id] != doc_id:
+            self.parents[doc_id] = self.parents[self.parents[doc_id]]
+            doc_id = self.parents[doc_id]
+        return doc_id
+    
+    def add_page(self, url, text):
+        """Add a page and link it to the near-duplicates already indexed"""
+        signature = self.compute_signature(text)
+        if signature is None:
+            return
+        
+        with self.lock:
+            doc_id = len(self.urls)
+            if doc_id == len(self.signatures):
+                grown = np.empty((len(self.signatures) * 2, self.num_permutations), dtype=np.uint32)
+                grown[:doc_id] = self.signatures
+                self.signatures = grown
+            self.signatures[doc_id] = signature
+            self.urls.append(url)
+            self.parents.append(doc_id)
+            
+            checked_roots = set()
+            for band in range(self.bands):
+                key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                bucket = self.buckets[band].setdefault(key, [])
+                
+                merged = False
+                for candidate in bucket:
+                    root = self._find(candidate)
+                    if root == self._find(doc_id):
+                        merged = True
+                        continue
+                    if root in checked_roots:
+                        continue
+                    checked_roots.add(root)
+                    
+                    similarity = float(np.mean(self.signatures[candidate] == signature))
+                    if similarity >= self.threshold:
+                        self.parents[self._find(doc_id)] = root
+                        self.similarities[doc_id] = max(self.similarities.get(doc_id, 0), similarity)
+                        merged = True
+                
+                # A bucket keeps one member per cluster, so identical pages do
+                # not make later insertions quadratic
+                if not merged:
+                    bucket.append(doc_id)
+    
+    def get_duplicate_clusters(self):
+        """Get clusters of near-duplicate pages, largest first"""
+        with self.lock:
+            clusters = {}
+            for doc_id in range(len(self.urls)):
+                clusters.setdefault(self._find(doc_id), []).append(doc_id)
+            
+            result = []
+            for members in clusters.values():
+                if len(members) < 2:
+                    continue
+                similarities = [self.similarities[doc_id] for doc_id in members if doc_id in self.similarities]
+                result.append({
+                    'urls': [self.urls[doc_id] for doc_id in members],
+                    'page_count': len(members),
+                    'min_similarity': round(min(similarities), 2) if similarities else 1.0
+                })
+        
+        return sorted(result, key=lambda cluster: cluster['page_count'], reverse=True)
+    
+    def get_statistics(self):
+        """Get index size statistics"""
+        return {
+            'indexed_pages': len(self.urls),
+            'signature_bytes': len(self.urls) * self.num_permutations * 4,
+            'duplicate_clusters': len(self.get_duplicate_clusters())
+        }
@@ -0,0 +1,132 @@
+# modules/css_tokenizer.py - Single-pass CSS tokenizer
+import re
+
+# One alternation scanned left to right; every branch consumes input, so a
+# stylesheet is tokenized in one linear pass without backtracking across tokens
+TOKEN_PATTERN = re.compile(r'''
+    (?P<comment>/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?)
+  | (?P<url>[uU][rR][lL]\(\s*(?:"[^"]*"|'[^']*'|[^)]*?)\s*\))
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<semicolon>;)
+  | (?P<text>(?:[^{};"'/uU]|[uU](?![rR][lL]\()|/(?!\*))[^{};"'/uU]*
+             (?:(?:[uU](?![rR][lL]\()|/(?!\*))[^{};"'/uU]*)*|.)
+''', re.DOTALL | re.VERBOSE)
+
+AT_KEYWORD_PATTERN = re.compile(r'@([\w-]+)\s*(.*)', re.DOTALL)
+BREAKPOINT_PATTERN = re.compile(r'\(\s*(min|max)-width\s*:\s*([\d.]+)(px|em|rem)\s*\)', re.IGNORECASE)
+# Pixels per em/rem in media queries (the browser default font size)
+EM_PIXELS = 16
+
+def tokenize(css_text):
+    """Yield (kind, text) tokens: comment, string, url, open, close, semicolon, text"""
+    for match in TOKEN_PATTERN.finditer(css_text):
+        yield match.lastgroup, match.group()
+
+def url_value(token):
+    """Target of a url(...) token without quotes"""
+    return token[4:-1].strip().strip('"\'').strip()
+
+def extract_urls(css_text):
+    """Every url(...) target in a piece of CSS"""
+    return [url_value(text) for kind, text in tokenize(css_text) if kind == 'url']
+
+def media_breakpoints(media_query):
+    """(min|max, pixels) width breakpoints of a media query"""
+    return [(kind.lower(), float(value) * (EM_PIXELS if unit.lower() in ['em', 'rem'] else 1))
+            for kind, value, unit in BREAKPOINT_PATTERN.findall(media_query)]
+
+def _at_keyword(text):
+    """(lowercased name, prelude) of an at-rule such as '@media(max-width:600px)'"""
+    match = AT_KEYWORD_PATTERN.match(text)
+    return (match.group(1).lower(), match.group(2).strip()) if match else ('', text[1:].strip())
+
+def _split_declaration(text):
+    """(property, value, important) of a declaration, or None"""
+    name, separator, value = text.partition(':')
+    name = name.strip().lower()
+    value = value.strip()
+    if not separator or not name or not value or ' ' in name:
+        return None
+    important = value.lower().endswith('!important')
+    if important:
+        value = value[:-len('!important')].rstrip()
+    return name, value, important
+
+def scan_stylesheet(css_text):
+    """Walk a stylesheet once and yield what it contains as events.
+    
+    ('declaration', (property, value, important, selector, media)) for each
+    style declaration, ('rule', (selector, media)) when a style rule closes,
+    ('at_rule', (name, prelude)) when an @media/@supports/... block opens,
+    ('font_face', descriptors) for @font-face and ('at_statement', (name,
+    prelude)) for @import/@charset. No object model is built; only the stack
+    of open block preludes is kept.
+    """
+    # Open blocks as (kind, prelude, media condition, inside keyframes)
+    stack = []
+    buffer = []
+    font_face = None
+    
+    def declaration_event(text):
+        """Event for a declaration closed by ';' or '}', or None outside style rules"""
+        if not stack:
+            return None
+        declaration = _split_declaration(text)
+        if not declaration:
+            return None
+        kind, prelude, media, in_keyframes = stack[-1]
+        if kind == 'font-face':
+            font_face[declaration[0]] = declaration[1]
+            return None
+        if kind != 'rule' or in_keyframes:
+            return None
+        return 'declaration', declaration + (prelude, media)
+    
+    for match in TOKEN_PATTERN.finditer(css_text):
+        kind = match.lastgroup
+        if kind == 'text' or kind == 'string' or kind == 'url':
+            buffer.append(match.group())
+            continue
+        if kind == 'comment':
+            continue
+        text = ''.join(buffer).strip()
+        buffer.clear()
+        media, in_keyframes = (stack[-1][2], stack[-1][3]) if stack else ('', False)
+        if kind == 'open':
+            if not text.startswith('@'):
+                stack.append(('rule', text, media, in_keyframes))
+                continue
+            name, prelude = _at_keyword(text)
+            if name.endswith('keyframes'):
+                stack.append(('keyframes', prelude, media, True))
+            elif name == 'font-face':
+                stack.append(('font-face', '', media, in_keyframes))
+                font_face = {}
+            elif name == 'media':
+                stack.append(('media', prelude, f"{media} and {prelude}" if media else prelude, in_keyframes))
+                yield 'at_rule', (name, prelude)
+            else:
+                stack.append(('at-rule', prelude, media, in_keyframes))
+                yield 'at_rule', (name, prelude)
+        elif kind == 'semicolon':
+            if text.startswith('@') and (not stack or stack[-1][0] in ['media', 'at-rule']):
+                yield 'at_statement', _at_keyword(text)
+            elif text:
+                event = declaration_event(text)
+                if event:
+                    yield event
+        else:
+            if text:
+                event = declaration_event(text)
+                if event:
+                    yield event
+            if not stack:
+                continue
+            closed, prelude, media, in_keyframes = stack.pop()
+            if closed == 'font-face':
+                yield 'font_face', font_face
+                font_face = None
+            elif closed == 'rule' and not in_keyframes:
+                yield 'rule', (prelude, media)
@@ -2,22 +2,23 @@
 import requests
 from bs4 import BeautifulSoup
 import re
-import cssutils
-from io import StringIO
+from modules.page_fetcher import fetch_page
+from modules.stylesheet_store import get_page_css
 
 class FontAnalyzer:
     """Analyze fonts used on web pages"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None, stylesheet_store=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
+        self.stylesheet_store = stylesheet_store
     
     def analyze_fonts(self, url):
         """Analyze fonts on a web page"""
         test_cases = []
         
         try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher)
             
             # Extract font information from various sources
             font_info = self._extract_font_information(soup, url)
@@ -71,112 +72,59 @@ class FontAnalyzer:
         font_info = {
             'fonts_found': False,
             'font_families': set(),
+            'font_stacks': set(),
             'font_sizes': [],
             'web_fonts': [],
             'inline_styles': [],
             'external_stylesheets': [],
-            'font_face_rules': []
+            'font_face_rules': [],
+            'font_preloads': []
         }
         
-        # Extract from inline styles
-        for element in soup.find_all(style=True):
-            style_content = element['style']
-            font_families = self._extract_font_families_from_css(style_content)
-            font_sizes = self._extract_font_sizes_from_css(style_content)
-            
-            if font_families or font_sizes:
-                font_info['fonts_found'] = True
-                font_info['font_families'].update(font_families)
-                font_info['font_sizes'].extend(font_sizes)
-                font_info['inline_styles'].append({
-                    'element': element.name,
-                    'styles': style_content
-                })
-        
-        # Extract from style tags
-        for style_tag in soup.find_all('style'):
-            if style_tag.string:
-                font_families = self._extract_font_families_from_css(style_tag.string)
-                font_sizes = self._extract_font_sizes_from_css(style_tag.string)
-                font_faces = self._extract_font_face_rules(style_tag.string)
-                
-                if font_families or font_sizes or font_faces:
-                    font_info['fonts_found'] = True
-                    font_info['font_families'].update(font_families)
-                    font_info['font_sizes'].extend(font_sizes)
-                    font_info['font_face_rules'].extend(font_faces)
-        
-        # Extract from external stylesheets
-        for link in soup.find_all('link', rel='stylesheet'):
-            href = link.get('href', '')
-            if href:
-                font_info['external_stylesheets'].append(href)
+        # Linked stylesheets, <style> blocks and style attributes from the shared index
+        css = get_page_css(soup, url, self.stylesheet_store)
+        font_info['external_stylesheets'] = css.stylesheet_urls
+        
+        for declaration in css.declarations('font-family', 'font'):
+            value = declaration.value
+            if declaration.property == 'font':
+                # Shorthand: the family list follows the size (and optional line height)
+                match = re.search(r'[\d.]+(?:px|pt|em|rem|%|vw|vh|ex|ch)(?:/\S+)?\s+(.+)$', value)
+                if not match:
+                    continue
+                value = match.group(1)
+            stack = value.replace('"', '').replace("'", '').strip()
+            if stack and not stack.lower().startswith(('inherit', 'initial', 'unset', 'var(')):
+                font_info['font_stacks'].add(stack)
+                font_info['font_families'].update(font.strip() for font in stack.split(','))
+            if declaration.selector == '[style]':
+                font_info['inline_styles'].append({'element': 'style attribute', 'styles': declaration.value})
+        
+        font_info['font_sizes'] = css.values('font-size')
+        font_info['font_face_rules'] = css.font_faces
+        font_info['fonts_found'] = bool(font_info['font_stacks'] or font_info['font_sizes'] or font_info['font_face_rules'])
         
         # Check for web font imports in head
-        for element in soup.find_all(['link', 'style']):
-            if element.name == 'link' and element.get('rel') == ['stylesheet']:
-                href = element.get('href', '')
-                if any(webfont in href.lower() for webfont in ['fonts.googleapis', 'fonts.gstatic', 'typekit', 'fontawesome']):
-                    font_info['web_fonts'].append(href)
-                    font_info['fonts_found'] = True
-        
-        return font_info
-    
-    def _extract_font_families_from_css(self, css_content):
-        """Extract font families from CSS"""
-        font_families = []
-        
-        # Simple regex for font-family
-        font_family_pattern = r'font-family\s*:\s*([^;]+)'
-        matches = re.findall(font_family_pattern, css_content, re.IGNORECASE)
-        
-        for match in matches:
-            # Clean up the match
-            fonts = match.strip()
-            # Remove quotes and split by comma
-            fonts = fonts.replace('"', '').replace("'", '')
-            font_list = [f.strip() for f in fonts.split(',')]
-            font_families.extend(font_list)
-        
-        return font_families
-    
-    def _extract_font_sizes_from_css(self, css_content):
-        """Extract font sizes from CSS"""
-        font_sizes = []
-        
-        # Regex for font-size
-        font_size_pattern = r'font-size\s*:\s*([^;]+)'
-        matches = re.findall(font_size_pattern, css_content, re.IGNORECASE)
-        
-        for match in matches:
-            size = match.strip()
-            font_sizes.append(size)
-        
-        return font_sizes
-    
-    def _extract_font_face_rules(self, css_content):
-        """Extract @font-face rules from CSS"""
-        font_faces = []
-        
-        # Regex for @font-face rules
-        font_face_pattern = r'@font-face\s*\{[^}]+\}'
-        matches = re.findall(font_face_pattern, css_content, re.IGNORECASE | re.DOTALL)
+        for href in css.stylesheet_urls:
+            if any(webfont in href.lower() for webfont in ['fonts.googleapis', 'fonts.gstatic', 'typekit', 'fontawesome']):
+                font_info['web_fonts'].append(href)
+                font_info['fonts_found'] = True
         
-        for match in matches:
-            font_faces.append(match)
+        preload_links = soup.find_all('link', rel='preload')
+        font_info['font_preloads'] = [link for link in preload_links if 'font' in link.get('as', '').lower()]
         
-        return font_faces
+        return font_info
     
     def _analyze_font_stack(self, font_info, url):
         """Analyze font stack for fallbacks"""
         test_cases = []
-        font_families = list(font_info['font_families'])
+        font_families = sorted(font_info['font_families'])
         
         if not font_families:
             return test_cases
         
         # Check for font stacks (multiple fallbacks)
-        for font_declaration in font_families:
+        for font_declaration in sorted(font_info['font_stacks']):
             fonts = [f.strip() for f in font_declaration.split(',')]
             
             if len(fonts) > 1:
@@ -344,13 +292,36 @@ class FontAnalyzer:
         """Analyze font loading strategy"""
         test_cases = []
         
-        # Check for font-display property (would need CSS parsing)
-        # This is a simplified check
+        # Check font-display of @font-face rules
+        font_faces = font_info['font_face_rules']
+        blocking_faces = [font_face.get('font-family', '?').strip('"\'') for font_face in font_faces
+                          if font_face.get('font-display', 'auto').lower() in ['auto', 'block']]
+        if blocking_faces:
+            test_cases.append(self._create_font_test_case(
+                url=url,
+                module="Font Display",
+                description="Check font-display of @font-face rules",
+                test_steps="1. Collect @font-face rules from all stylesheets\n2. Check font-display\n3. Identify invisible-text periods",
+                expected_result="Web fonts should use font-display: swap, fallback or optional",
+                actual_result=f"{len(blocking_faces)} of {len(font_faces)} @font-face rules hide text while loading: {', '.join(sorted(set(blocking_faces))[:5])}",
+                status="Warning",
+                severity="Low",
+                resolutions="Add font-display: swap to @font-face rules"
+            ))
+        elif font_faces:
+            test_cases.append(self._create_font_test_case(
+                url=url,
+                module="Font Display",
+                description="Check font-display of @font-face rules",
+                test_steps="1. Collect @font-face rules from all stylesheets\n2. Check font-display\n3. Identify invisible-text periods",
+                expected_result="Web fonts should use font-display: swap, fallback or optional",
+                actual_result=f"All {len(font_faces)} @font-face rules set font-display",
+                status="Pass",
+                severity="Low"
+            ))
         
         # Check for font preloading
-        soup = BeautifulSoup(requests.get(url, timeout=5).content, 'html.parser')
-        preload_links = soup.find_all('link', rel='preload')
-        font_preloads = [link for link in preload_links if 'font' in link.get('as', '').lower()]
+        font_preloads = font_info['font_preloads']
         
         if font_preloads:
             test_cases.append(self._create_font_test_case(
@@ -0,0 +1,145 @@
+# modules/http_timing.py - Timing-instrumented HTTP transport
+import socket
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from config import ADAPTIVE_CONCURRENCY_SETTINGS
+from modules.compression import ACCEPT_ENCODING
+
+# Phases recorded per fetch and the test case fields they are reported in
+TIMING_FIELDS = {
+    'dns_ms': 'DNS Time (ms)',
+    'connect_ms': 'Connect Time (ms)',
+    'tls_ms': 'TLS Time (ms)',
+    'ttfb_ms': 'TTFB (ms)',
+    'download_ms': 'Download Time (ms)',
+    'total_ms': 'Total Time (ms)'
+}
+
+class TimedConnectionMixin:
+    """Record DNS, TCP connect and TLS handshake durations of a new connection"""
+    
+    phase_timings = None
+    
+    def _new_conn(self):
+        start = time.perf_counter()
+        host = self._dns_host.strip('[]')
+        try:
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        
+        # Connect to the resolved addresses in order, like urllib3 does, so
+        # the TCP time excludes DNS; the hostname is still used for the Host
+        # header and TLS server name
+        dns_host = self._dns_host
+        error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+            else:
+                raise error
+        finally:
+            self._dns_host = dns_host
+        
+        self.phase_timings = {'dns': resolved - start, 'connect': time.perf_counter() - resolved, 'tls': 0.0}
+        return sock
+    
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        if self.phase_timings is not None and isinstance(self, HTTPSConnection):
+            elapsed = time.perf_counter() - start
+            self.phase_timings['tls'] = max(0.0, elapsed - self.phase_timings['dns'] - self.phase_timings['connect'])
+    
+    def consume_phase_timings(self):
+        """Get the setup timings once; requests reusing the connection report zero"""
+        timings, self.phase_timings = self.phase_timings, None
+        return timings or {'dns': 0.0, 'connect': 0.0, 'tls': 0.0}
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimingAdapter(HTTPAdapter):
+    """requests adapter whose connections record their setup phases"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+class RequestCookieJar(RequestsCookieJar):
+    """Session cookie jar that stores nothing, so cookies live in each request's own jar.
+    
+    requests merges the session jar into a fresh jar per request and follows
+    redirects with it, so a cookie set before a redirect is still sent back;
+    concurrent fetches on the shared session never see each other's cookies.
+    """
+    
+    def set_cookie(self, cookie, *args, **kwargs):
+        pass
+
+def create_timed_session():
+    """Session using the timing adapter; cookies are kept per request, not between fetches"""
+    session = requests.Session()
+    # One origin gets up to max_limit parallel requests; a smaller pool would
+    # discard their connections and lose keep-alive
+    pool_size = ADAPTIVE_CONCURRENCY_SETTINGS['max_limit']
+    session.mount('http://', TimingAdapter(pool_maxsize=pool_size))
+    session.mount('https://', TimingAdapter(pool_maxsize=pool_size))
+    session.cookies = RequestCookieJar()
+    # urllib3's default may list br and zstd, which are not decoded here
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+def get_connection_timings(response):
+    """DNS, connect and TLS seconds of the connection that served a streamed response"""
+    connection = getattr(response.raw, 'connection', None)
+    if isinstance(connection, TimedConnectionMixin):
+        return connection.consume_phase_timings()
+    return {'dns': 0.0, 'connect': 0.0, 'tls': 0.0}
+
+def build_timings(response, connection_timings, download_seconds):
+    """Timing breakdown in milliseconds.
+    
+    response.elapsed runs from sending the request to parsed headers and so
+    includes connection setup; the remainder is time to first byte.
+    """
+    setup = connection_timings['dns'] + connection_timings['connect'] + connection_timings['tls']
+    elapsed = response.elapsed.total_seconds()
+    return {
+        'dns_ms': round(connection_timings['dns'] * 1000, 1),
+        'connect_ms': round(connection_timings['connect'] * 1000, 1),
+        'tls_ms': round(connection_timings['tls'] * 1000, 1),
+        'ttfb_ms': round(max(0.0, elapsed - setup) * 1000, 1),
+        'download_ms': round(download_seconds * 1000, 1),
+        'total_ms': round((max(elapsed, setup) + download_seconds) * 1000, 1)
+    }
+
+def timing_fields(timings):
+    """Test case fields of a timing breakdown"""
+    if not timings:
+        return {}
+    return {field: timings[key] for key, field in TIMING_FIELDS.items()}
@@ -0,0 +1,243 @@
+# modules/image_probe.py - Image size, format and dimensions from ranged header reads
+import re
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlparse
+from config import IMAGE_PROBE_SETTINGS
+from modules.page_fetcher import stream_get
+
+# JPEG start-of-frame markers (SOF0-SOF15 except DHT, JPG and DAC)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+\d+-\d+/(\d+)')
+MODERN_FORMATS = {'webp', 'avif'}
+
+def _jpeg_dimensions(data, offset=2):
+    """Walk JPEG segments from offset: (width, height), or (None, next_offset) when data runs out"""
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None, None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return (width, height), None
+        segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        offset += 2 + segment_length
+    return None, offset
+
+def parse_image_header(data):
+    """Sniff format and intrinsic size from the first bytes of an image.
+    
+    Returns (format, width, height, jpeg_resume_offset); width and height are
+    None when unknown, and jpeg_resume_offset tells where a JPEG's next
+    segment starts when its frame header lies beyond the bytes read.
+    """
+    if data.startswith(b'\x89PNG\r\n\x1a\n') and len(data) >= 24:
+        width, height = struct.unpack('>II', data[16:24])
+        return 'png', width, height, None
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        width, height = struct.unpack('<HH', data[6:10])
+        return 'gif', width, height, None
+    if data.startswith(b'\xff\xd8'):
+        size, resume_offset = _jpeg_dimensions(data)
+        return ('jpeg',) + (size or (None, None)) + (resume_offset,)
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP' and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', data[26:30])
+            return 'webp', width & 0x3FFF, height & 0x3FFF, None
+        if chunk == b'VP8L':
+            bits = struct.unpack('<I', data[21:25])[0]
+            return 'webp', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1, None
+        if chunk == b'VP8X':
+            width = int.from_bytes(data[24:27], 'little') + 1
+            height = int.from_bytes(data[27:30], 'little') + 1
+            return 'webp', width, height, None
+        return 'webp', None, None, None
+    if data[4:8] == b'ftyp':
+        brand = data[8:12]
+        image_format = 'avif' if brand in (b'avif', b'avis') else 'heif' if brand in (b'heic', b'heix', b'mif1') else None
+        if image_format:
+            # The image spatial extents property holds the intrinsic size
+            ispe = data.find(b'ispe')
+            if ispe != -1 and ispe + 16 <= len(data):
+                width, height = struct.unpack('>II', data[ispe + 8:ispe + 16])
+                return image_format, width, height, None
+            return image_format, None, None, None
+    head = data[:1024].lstrip().lower()
+    if head.startswith((b'<svg', b'<?xml')) and b'<svg' in head:
+        return 'svg', None, None, None
+    return 'unknown', None, None, None
+
+def parse_srcset(srcset, base_url):
+    """(url, descriptor) candidates of a srcset attribute, e.g. ('/a.jpg', '480w')"""
+    candidates = []
+    for candidate in srcset.split(','):
+        parts = candidate.strip().split()
+        if parts:
+            url = urljoin(base_url, parts[0])
+            if urlparse(url).scheme in ['http', 'https']:
+                candidates.append((url, parts[1].lower() if len(parts) > 1 else '1x'))
+    return candidates
+
+def _pixel_attribute(value):
+    """Integer pixel value of a width/height attribute, or None for percentages and blanks"""
+    match = re.fullmatch(r'\s*(\d+)(px)?\s*', value or '')
+    return int(match.group(1)) if match else None
+
+def _total_size(response):
+    """Full byte size of the image from Content-Range, or Content-Length of a complete response"""
+    match = CONTENT_RANGE_PATTERN.search(response.headers.get('Content-Range', ''))
+    if match:
+        return int(match.group(1))
+    content_length = response.headers.get('Content-Length', '')
+    if response.status_code == 200 and content_length.isdigit():
+        return int(content_length)
+    return None if response.truncated else len(response.content)
+
+class ImageProbe:
+    """Read the first bytes of every image with ranged GETs instead of downloading them.
+    
+    Probes run concurrently over the pooled timed session, under the
+    adaptive per-origin limits when a concurrency limiter is given.
+    """
+    
+    def __init__(self, concurrency_limiter=None, circuit_breaker=None, max_workers=8):
+        self.concurrency_limiter = concurrency_limiter
+        self.circuit_breaker = circuit_breaker
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.probes = {}
+        self.transfers = {}
+        self.results = {}
+    
+    def clear(self):
+        """Forget probed images and page results"""
+        with self.lock:
+            self.probes = {}
+            self.transfers = {}
+            self.results = {}
+    
+    def _read_range(self, url, start, length):
+        """Ranged GET of length bytes from start; servers ignoring Range are cut off at length"""
+        return stream_get(url, timeout=IMAGE_PROBE_SETTINGS['timeout'], max_bytes=length,
+                          circuit_breaker=self.circuit_breaker, verify=False,
+                          headers={'Range': f'bytes={start}-{start + length - 1}', 'Accept-Encoding': 'identity'})
+    
+    def probe(self, url):
+        """Byte size, format and intrinsic dimensions of one image"""
+        with self.lock:
+            if url in self.probes:
+                return self.probes[url]
+        
+        probe_bytes = IMAGE_PROBE_SETTINGS['probe_bytes']
+        record = {'url': url, 'status_code': None, 'format': 'unknown', 'bytes': None, 'width': None, 'height': None}
+        transfer = None
+        try:
+            response = self._read_range(url, 0, probe_bytes)
+            record['status_code'] = response.status_code
+            transfer = {
+                'timings': response.timings,
+                'cache_control': response.headers.get('Cache-Control', ''),
+                'etag': bool(response.headers.get('ETag'))
+            }
+            if response.status_code < 400:
+                data = response.content
+                record['bytes'] = _total_size(response)
+                image_format, width, height, resume_offset = parse_image_header(data)
+                
+                # Large EXIF or ICC segments can push a JPEG's frame header past the first read
+                reads = 1
+                while (resume_offset and reads < IMAGE_PROBE_SETTINGS['max_reads']
+                       and (record['bytes'] is None or resume_offset < record['bytes'])):
+                    resumed = self._read_range(url, resume_offset, probe_bytes)
+                    if resumed.status_code != 206 or not resumed.content:
+                        break
+                    size, next_offset = _jpeg_dimensions(resumed.content, 0)
+                    if size:
+                        width, height = size
+                        break
+                    resume_offset = resume_offset + next_offset if next_offset else None
+                    reads += 1
+                
+                record.update({'format': image_format, 'width': width, 'height': height})
+        except Exception as e:
+            record['error'] = str(e).split('\n')[0][:100]
+        
+        with self.lock:
+            self.probes[url] = record
+            self.transfers[url] = transfer
+        return record
+    
+    def get_transfer(self, url):
+        """Timings and caching headers of the first ranged GET of a probed image, or None"""
+        with self.lock:
+            return self.transfers.get(url)
+    
+    def _run_probes(self, urls):
+        """Yield (url, future) of image probes as they complete"""
+        if self.concurrency_limiter:
+            classify = lambda record: (record['status_code'], False) if record['status_code'] else None
+            yield from self.concurrency_limiter.map_as_completed(self.probe, urls, classify)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_url = {executor.submit(self.probe, url): url for url in urls}
+            for future in as_completed(future_to_url):
+                yield future_to_url[future], future
+    
+    def analyze_page(self, soup, page_url):
+        """Probe every <img> and srcset candidate of a page and flag oversized images"""
+        images = []
+        for img in soup.find_all('img')[:IMAGE_PROBE_SETTINGS['max_images']]:
+            src = img.get('src', '')
+            src_url = urljoin(page_url, src) if src and not src.startswith('data:') else None
+            if src_url and urlparse(src_url).scheme not in ['http', 'https']:
+                src_url = None
+            images.append({
+                'src': src_url,
+                'srcset': parse_srcset(img.get('srcset', ''), page_url),
+                'display_width': _pixel_attribute(img.get('width')),
+                'display_height': _pixel_attribute(img.get('height'))
+            })
+        
+        urls = {image['src'] for image in images if image['src']}
+        urls.update(url for image in images for url, _ in image['srcset'])
+        # Images already probed by the sub-resource loader are not requested again
+        with self.lock:
+            probes = {url: self.probes[url] for url in urls if url in self.probes}
+        probes.update((url, future.result()) for url, future in self._run_probes(sorted(urls - set(probes))))
+        
+        factor = IMAGE_PROBE_SETTINGS['oversize_factor']
+        records = []
+        for image in images:
+            candidates = [(image['src'], 'src')] if image['src'] else []
+            candidates += image['srcset']
+            for url, descriptor in candidates:
+                probe = probes[url]
+                reasons = []
+                width, height = probe['width'], probe['height']
+                display_width, display_height = image['display_width'], image['display_height']
+                if width and display_width and width > display_width * factor:
+                    reasons.append(f"{width}px wide, displayed at {display_width}px")
+                elif height and display_height and height > display_height * factor:
+                    reasons.append(f"{height}px tall, displayed at {display_height}px")
+                if width and descriptor.endswith('w') and descriptor[:-1].isdigit():
+                    declared = int(descriptor[:-1])
+                    if width > declared * 1.1:
+                        reasons.append(f"srcset declares {declared}w but image is {width}px wide")
+                records.append(dict(probe, page_url=page_url, descriptor=descriptor,
+                                    display_width=display_width, display_height=display_height,
+                                    oversized=bool(reasons), reason='; '.join(reasons)))
+        
+        with self.lock:
+            self.results[page_url] = records
+        return records
+    
+    def get_results(self):
+        """Get the probed images of every analyzed page"""
+        with self.lock:
+            return [record for records in self.results.values() for record in records]
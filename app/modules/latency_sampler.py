@@ -0,0 +1,110 @@
+# modules/latency_sampler.py - Repeated latency measurements with percentile statistics
+import threading
+import time
+import numpy as np
+import requests
+from config import LATENCY_SAMPLING_SETTINGS
+from modules.page_fetcher import stream_get
+
+# Timing phases summarized per URL
+SAMPLED_METRICS = ['total_ms', 'ttfb_ms']
+
+def latency_statistics(values, percentiles):
+    """Percentiles, mean, standard deviation and IQR outliers of latency samples"""
+    samples = np.asarray(values, dtype=np.float64)
+    if not len(samples):
+        return None
+    
+    q1, q3 = np.percentile(samples, [25, 75])
+    fence = LATENCY_SAMPLING_SETTINGS['outlier_iqr_factor'] * (q3 - q1)
+    outliers = (samples < q1 - fence) | (samples > q3 + fence)
+    
+    stats = {f'p{p}': round(float(value), 1) for p, value in zip(percentiles, np.percentile(samples, percentiles))}
+    stats.update({
+        'mean': round(float(samples.mean()), 1),
+        'std': round(float(samples.std(ddof=1)) if len(samples) > 1 else 0.0, 1),
+        'min': round(float(samples.min()), 1),
+        'max': round(float(samples.max()), 1),
+        'outliers': int(outliers.sum())
+    })
+    return stats
+
+class LatencySampler:
+    """Measure each URL several times so load time checks judge percentiles, not one request.
+    
+    Samples are spaced interval_seconds apart and sent with Connection: close
+    so every sample pays connection setup like a first visit would. The
+    page's own fetch may have reused a pooled connection, so it is reported
+    next to the samples rather than among them.
+    """
+    
+    def __init__(self, samples=None, interval_seconds=None, circuit_breaker=None):
+        self.enabled = False
+        self.samples = samples or LATENCY_SAMPLING_SETTINGS['samples']
+        self.interval_seconds = interval_seconds if interval_seconds is not None else LATENCY_SAMPLING_SETTINGS['interval_seconds']
+        self.percentiles = LATENCY_SAMPLING_SETTINGS['percentiles']
+        self.circuit_breaker = circuit_breaker
+        self.lock = threading.Lock()
+        self.results = {}
+    
+    def configure(self, enabled=False, samples=None):
+        """Enable or disable sampling for the next run"""
+        self.enabled = enabled
+        if samples:
+            self.samples = max(2, int(samples))
+    
+    def clear(self):
+        """Forget the samples of previous runs"""
+        with self.lock:
+            self.results = {}
+    
+    def sample(self, url, first_response=None, timeout=10):
+        """Collect latency samples of a URL and return their statistics.
+        
+        The timings of an already fetched response are kept as
+        first_response, outside the samples. Failed requests are counted but
+        not sampled.
+        """
+        samples = {metric: [] for metric in SAMPLED_METRICS}
+        failed = 0
+        
+        first_timings = None
+        if first_response is not None and getattr(first_response, 'timings', None):
+            first_timings = {metric: first_response.timings[metric] for metric in SAMPLED_METRICS}
+        
+        while len(samples['total_ms']) + failed < self.samples:
+            if len(samples['total_ms']) + failed:
+                time.sleep(self.interval_seconds)
+            try:
+                response = stream_get(url, timeout=timeout, circuit_breaker=self.circuit_breaker,
+                                      headers={'Connection': 'close'}, verify=False)
+            except requests.exceptions.RequestException:
+                failed += 1
+                continue
+            for metric in SAMPLED_METRICS:
+                samples[metric].append(response.timings[metric])
+        
+        result = {
+            'url': url,
+            'samples': samples,
+            'first_response': first_timings,
+            'failed_samples': failed,
+            'statistics': {metric: latency_statistics(values, self.percentiles)
+                           for metric, values in samples.items()}
+        }
+        with self.lock:
+            self.results[url] = result
+        return result
+    
+    def get_results(self):
+        """Get the samples and statistics of every sampled URL"""
+        with self.lock:
+            return [{
+                'url': result['url'],
+                'sample_count': len(result['samples']['total_ms']),
+                'failed_samples': result['failed_samples'],
+                'total_ms': result['statistics']['total_ms'],
+                'ttfb_ms': result['statistics']['ttfb_ms'],
+                'samples_ms': result['samples']['total_ms'],
+                'first_response_ms': result['first_response']['total_ms'] if result['first_response'] else None
+            } for result in self.results.values()]
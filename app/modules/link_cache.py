@@ -0,0 +1,93 @@
+# modules/link_cache.py - Persistent link-status cache
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, urlunparse
+from config import LINK_CACHE_PATH, LINK_CACHE_TTL
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonical_url(url):
+    """Canonical cache key: lowercase scheme and host, no default port or fragment"""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower() or 'http'
+    host = (parsed.hostname or '').lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    return urlunparse((scheme, host, parsed.path or '/', parsed.params, parsed.query, ''))
+
+class LinkStatusCache:
+    """SQLite cache of link check results with a TTL per status category"""
+    
+    def __init__(self, path=LINK_CACHE_PATH, ttl=None):
+        self.path = path
+        self.ttl = dict(LINK_CACHE_TTL, **(ttl or {}))
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS link_status ("
+                "url TEXT PRIMARY KEY, status_code INTEGER, status_text TEXT, "
+                "status_category TEXT, response_time_ms INTEGER, final_url TEXT, "
+                "checked_at REAL, expires_at REAL)"
+            )
+    
+    def get(self, url):
+        """Get an unexpired cached result for a URL, or None"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT status_code, status_text, status_category, response_time_ms, final_url, checked_at "
+                "FROM link_status WHERE url = ? AND expires_at > ?",
+                (canonical_url(url), time.time())
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        
+        return {
+            'status_code': row[0],
+            'status_text': row[1],
+            'status_category': row[2],
+            'response_time_ms': row[3],
+            'final_url': row[4],
+            'checked_at': row[5]
+        }
+    
+    def put(self, result):
+        """Store a link check result until the TTL of its status category expires"""
+        ttl = self.ttl.get(result.get('status_category'), 0)
+        if ttl <= 0:
+            return
+        
+        checked_at = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO link_status VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (canonical_url(result['url']), result.get('status_code'), result.get('status_text', ''),
+                 result.get('status_category'), result.get('response_time_ms', 0),
+                 result.get('final_url', result['url']), checked_at, checked_at + ttl)
+            )
+    
+    def purge_expired(self):
+        """Delete expired entries and return how many were removed"""
+        with self.lock, self.connection:
+            cursor = self.connection.execute("DELETE FROM link_status WHERE expires_at <= ?", (time.time(),))
+            return cursor.rowcount
+    
+    def clear(self):
+        """Delete all cached results"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM link_status")
+    
+    def get_statistics(self):
+        """Get cache hit statistics"""
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM link_status").fetchone()[0]
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -4,109 +4,201 @@ import time
 from datetime import datetime
 from urllib.parse import urlparse
 import concurrent.futures
+from modules.circuit_breaker import HostUnreachableError
+from modules.page_fetcher import stream_get
+from modules.http_timing import timing_fields
+
+def classify_link_result(result):
+    """Limiter outcome of a check_status result: (status_code, overloaded) or None"""
+    result_structured = result[1]
+    if result_structured.get('cached') or result_structured['status_text'].startswith('Host unreachable'):
+        return None
+    timed_out = result_structured['status_code'] is None and 'timed out' in result_structured['status_text'].lower()
+    return result_structured['status_code'], timed_out
 
 class LinkChecker:
     """Handle link status checking"""
     
-    def __init__(self, test_case_manager=None):
-        """Initialize LinkChecker with optional test case manager"""
+    def __init__(self, test_case_manager=None, link_graph=None, link_cache=None, circuit_breaker=None,
+                 concurrency_limiter=None, build_directory=None):
+        """Initialize LinkChecker with optional test case manager, crawl link graph, status cache,
+        per-host circuit breaker, adaptive concurrency limiter and offline build directory"""
         self.test_case_manager = test_case_manager
+        self.link_graph = link_graph
+        self.link_cache = link_cache
+        self.circuit_breaker = circuit_breaker
+        self.concurrency_limiter = concurrency_limiter
+        self.build_directory = build_directory
+    
+    def get_referrers(self, url):
+        """Get the crawled pages that link to a URL"""
+        if self.link_graph is None:
+            return []
+        return self.link_graph.get_referrers(url)
     
     def check_status(self, url):
-        """Check HTTP status of a URL"""
+        """Check HTTP status of a URL, answering from the link cache when possible"""
+        parsed = urlparse(url)
+        if not parsed.scheme:
+            url = "http://" + url
+        
+        # Offline mode: links into the site resolve against the build's file tree, never the cache
+        if self.build_directory and self.build_directory.serves(url):
+            return self._check_build_file(url)
+        
+        cached = self.link_cache.get(url) if self.link_cache else None
+        if cached:
+            checked_at = datetime.fromtimestamp(cached['checked_at']).strftime('%Y-%m-%d %H:%M:%S')
+            if cached['status_category'] == 'Error':
+                return self._build_error_result(url, cached['status_text'], cached_at=checked_at)
+            return self._build_status_result(url, cached['status_code'], cached['status_text'],
+                                             cached['response_time_ms'], cached['final_url'],
+                                             cached_at=checked_at)
+        
         try:
-            parsed = urlparse(url)
-            if not parsed.scheme:
-                url = "http://" + url
-            
             start_time = time.time()
-            response = requests.get(url, timeout=8, allow_redirects=True, verify=False)
+            # Only the status is needed, so the body is never downloaded
+            response = stream_get(url, timeout=8, max_bytes=0, circuit_breaker=self.circuit_breaker,
+                                  allow_redirects=True, verify=False)
             response_time = int((time.time() - start_time) * 1000)
             
-            status_code = response.status_code
-            status_text = response.reason
-            
-            # Status categorization
-            if 200 <= status_code < 300:
-                status_category = "Success"
-                status_emoji = "✅"
-                test_status = "Pass"
-                severity = "Low"
-            elif 300 <= status_code < 400:
-                status_category = "Redirect"
-                status_emoji = "🔄"
-                test_status = "Pass"
-                severity = "Low"
-            elif 400 <= status_code < 500:
-                status_category = "Client Error"
-                status_emoji = "❌"
-                test_status = "Fail"
-                severity = "High"
-            else:
-                status_category = "Server Error"
-                status_emoji = "🚫"
-                test_status = "Fail"
-                severity = "Critical"
-            
-            result_display = f"{status_emoji} {status_code} ({response_time}ms) - {url}"
-            
-            result_structured = {
-                'url': url,
-                'status_code': status_code,
-                'status_text': status_text,
-                'status_category': status_category,
-                'response_time_ms': response_time,
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'final_url': response.url if hasattr(response, 'url') else url,
-                'display_text': result_display
-            }
+            result = self._build_status_result(url, response.status_code, response.reason, response_time,
+                                               response.url if hasattr(response, 'url') else url,
+                                               timings=getattr(response, 'timings', None))
             
-            # Create test case if manager provided
-            test_case = None
-            if self.test_case_manager:
-                test_case = self.test_case_manager.create_link_test_case(
-                    url=url,
-                    status_code=status_code,
-                    status_text=status_text,
-                    response_time=response_time,
-                    status_category=status_category,
-                    test_status=test_status,
-                    severity=severity,
-                    final_url=response.url if hasattr(response, 'url') else url
-                )
-            
-            return result_display, result_structured, test_case
+        except HostUnreachableError as e:
+            # Derived from other failures on the host, so it is not cached
+            return self._build_error_result(url, str(e))
             
         except requests.exceptions.RequestException as e:
             error_msg = str(e).split('\n')[0]
-            result_display = f"❌ ERROR ({error_msg[:30]}...) - {url}"
-            
-            result_structured = {
-                'url': url,
-                'status_code': None,
-                'status_text': error_msg,
-                'status_category': 'Error',
-                'response_time_ms': 0,
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'final_url': url,
-                'display_text': result_display
-            }
-            
-            # Create test case for error if manager provided
-            test_case = None
-            if self.test_case_manager:
-                test_case = self.test_case_manager.create_error_test_case(
-                    url=url,
-                    error_msg=error_msg,
-                    test_type="Link Status Check"
-                )
-            
-            return result_display, result_structured, test_case
+            result = self._build_error_result(url, error_msg)
+        
+        if self.link_cache:
+            self.link_cache.put(result[1])
+        return result
     
-    def test_links(self, urls, max_workers=10):
-        """Test multiple links"""
-        results = []
-        test_cases = []
+    def _check_build_file(self, url):
+        """Status of an internal link in offline mode: 200 when the build directory has its file, else 404"""
+        start_time = time.time()
+        path = self.build_directory.resolve(url)
+        response_time = int((time.time() - start_time) * 1000)
+        if path is None:
+            return self._build_status_result(url, 404, "Not Found (no file in build directory)", response_time, url)
+        return self._build_status_result(url, 200, "OK (build directory)", response_time, url)
+    
+    def _build_status_result(self, url, status_code, status_text, response_time, final_url, cached_at=None,
+                             timings=None):
+        """Build the display text, structured result and test case of a completed request"""
+        # Status categorization
+        if 200 <= status_code < 300:
+            status_category = "Success"
+            status_emoji = "✅"
+            test_status = "Pass"
+            severity = "Low"
+        elif 300 <= status_code < 400:
+            status_category = "Redirect"
+            status_emoji = "🔄"
+            test_status = "Pass"
+            severity = "Low"
+        elif 400 <= status_code < 500:
+            status_category = "Client Error"
+            status_emoji = "❌"
+            test_status = "Fail"
+            severity = "High"
+        else:
+            status_category = "Server Error"
+            status_emoji = "🚫"
+            test_status = "Fail"
+            severity = "Critical"
+        
+        result_display = f"{status_emoji} {status_code} ({response_time}ms) - {url}"
+        if cached_at:
+            result_display += f" (cached {cached_at})"
+        
+        result_structured = {
+            'url': url,
+            'status_code': status_code,
+            'status_text': status_text,
+            'status_category': status_category,
+            'response_time_ms': response_time,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'final_url': final_url,
+            'display_text': result_display,
+            'cached': bool(cached_at)
+        }
+        if cached_at:
+            result_structured['cached_at'] = cached_at
+        if timings:
+            result_structured.update(timings)
+        
+        # Broken links list the pages that contain them
+        referrers = self.get_referrers(url) if test_status == "Fail" else []
+        if referrers:
+            result_structured['referrers'] = referrers
+        
+        # Create test case if manager provided
+        test_case = None
+        if self.test_case_manager:
+            test_case = self.test_case_manager.create_link_test_case(
+                url=url,
+                status_code=status_code,
+                status_text=status_text,
+                response_time=response_time,
+                status_category=status_category,
+                test_status=test_status,
+                severity=severity,
+                final_url=final_url,
+                referrers=referrers,
+                cached_at=cached_at
+            )
+            test_case.update(timing_fields(timings))
+        
+        return result_display, result_structured, test_case
+    
+    def _build_error_result(self, url, error_msg, cached_at=None):
+        """Build the display text, structured result and test case of a failed request"""
+        result_display = f"❌ ERROR ({error_msg[:30]}...) - {url}"
+        if cached_at:
+            result_display += f" (cached {cached_at})"
+        
+        result_structured = {
+            'url': url,
+            'status_code': None,
+            'status_text': error_msg,
+            'status_category': 'Error',
+            'response_time_ms': 0,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'final_url': url,
+            'display_text': result_display,
+            'cached': bool(cached_at)
+        }
+        if cached_at:
+            result_structured['cached_at'] = cached_at
+        
+        referrers = self.get_referrers(url)
+        if referrers:
+            result_structured['referrers'] = referrers
+        
+        # Create test case for error if manager provided
+        test_case = None
+        if self.test_case_manager:
+            test_case = self.test_case_manager.create_error_test_case(
+                url=url,
+                error_msg=error_msg,
+                test_type="Link Status Check",
+                referrers=referrers,
+                cached_at=cached_at
+            )
+        
+        return result_display, result_structured, test_case
+    
+    def _run_checks(self, urls, max_workers):
+        """Yield (url, future) of status checks as they complete"""
+        if self.concurrency_limiter:
+            # Per-origin parallelism adapts to latency, 429/503 responses and timeouts
+            yield from self.concurrency_limiter.map_as_completed(self.check_status, urls, classify_link_result)
+            return
         
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all tasks
@@ -114,23 +206,31 @@ class LinkChecker:
             
             # Process completed tasks
             for future in concurrent.futures.as_completed(future_to_url):
-                try:
-                    result_display, result_structured, test_case = future.result()
-                    results.append(result_structured)
-                    if test_case:
-                        test_cases.append(test_case)
-                except Exception as e:
-                    # Handle any exceptions from individual checks
-                    error_result = {
-                        'url': future_to_url[future],
-                        'status_code': None,
-                        'status_text': str(e),
-                        'status_category': 'Error',
-                        'response_time_ms': 0,
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'final_url': future_to_url[future],
-                        'display_text': f"❌ ERROR - {future_to_url[future]}"
-                    }
-                    results.append(error_result)
+                yield future_to_url[future], future
+    
+    def test_links(self, urls, max_workers=10):
+        """Test multiple links"""
+        results = []
+        test_cases = []
+        
+        for url, future in self._run_checks(urls, max_workers):
+            try:
+                result_display, result_structured, test_case = future.result()
+                results.append(result_structured)
+                if test_case:
+                    test_cases.append(test_case)
+            except Exception as e:
+                # Handle any exceptions from individual checks
+                error_result = {
+                    'url': url,
+                    'status_code': None,
+                    'status_text': str(e),
+                    'status_category': 'Error',
+                    'response_time_ms': 0,
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'final_url': url,
+                    'display_text': f"❌ ERROR - {url}"
+                }
+                results.append(error_result)
         
         return results, test_cases
\ No newline at end of file
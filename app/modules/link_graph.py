@@ -0,0 +1,293 @@
+# modules/link_graph.py - Internal link graph and link metrics
+import threading
+from array import array
+import numpy as np
+
+# PageRank damping factor, iteration limit and convergence tolerance (L1 norm)
+PAGERANK_DAMPING = 0.85
+PAGERANK_MAX_ITERATIONS = 100
+PAGERANK_TOLERANCE = 1e-6
+# Characters of anchor text kept per reference
+MAX_ANCHOR_TEXT = 100
+
+class StringTable:
+    """Dictionary encoding of repeated strings as integer ids"""
+    
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+    
+    def encode(self, text):
+        """Get the id of a string, adding it if needed"""
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.ids[text] = string_id
+            self.strings.append(text)
+        return string_id
+    
+    def decode(self, string_id):
+        """Get the string of an id"""
+        return self.strings[string_id]
+
+def _edge_sources(indptr):
+    """Source node of every edge of CSR row offsets"""
+    return np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+
+class LinkGraph:
+    """Compact internal link graph stored as CSR arrays.
+    
+    Edges are buffered as int32 node ids while crawling and merged into
+    sorted, de-duplicated CSR arrays (int64 row offsets, int32 targets) on
+    demand. The buffers are emptied by each build, so a built edge costs
+    4 bytes and only links added since take 8 bytes each. Reference targets
+    (stylesheets, scripts, images, forms, other sites) get ids in a table of
+    their own, so only pages are nodes of the graph.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+    
+    def clear(self):
+        """Remove all pages and links"""
+        with self.lock:
+            self.url_ids = {}
+            self.urls = []
+            self.edge_sources = array('i')
+            self.edge_targets = array('i')
+            self.root_ids = set()
+            # Last built CSR arrays, kept while pages and links are added
+            self._edges = None
+            self._csr = None
+            
+            # Every link element found while crawling, for referrer lookups;
+            # sources are page ids, targets are ids of reference_urls
+            self.reference_urls = StringTable()
+            self.ref_sources = array('i')
+            self.ref_targets = array('i')
+            self.ref_texts = array('i')
+            self.ref_elements = array('i')
+            self.anchor_texts = StringTable()
+            self.element_types = StringTable()
+            self._referrer_index = None
+    
+    def _get_id(self, url):
+        """Get the node id of a URL, adding it to the URL table if needed"""
+        node_id = self.url_ids.get(url)
+        if node_id is None:
+            node_id = len(self.urls)
+            self.url_ids[url] = node_id
+            self.urls.append(url)
+        return node_id
+    
+    def add_page(self, url, root=False):
+        """Register a page, optionally as a crawl start page"""
+        with self.lock:
+            node_id = self._get_id(url)
+            if root:
+                self.root_ids.add(node_id)
+            self._csr = None
+    
+    def add_links(self, source_url, target_urls):
+        """Record the links found on a page"""
+        with self.lock:
+            source_id = self._get_id(source_url)
+            for target_url in target_urls:
+                target_id = self._get_id(target_url)
+                if target_id != source_id:
+                    self.edge_sources.append(source_id)
+                    self.edge_targets.append(target_id)
+            self._csr = None
+    
+    def add_references(self, source_url, references):
+        """Record the (target_url, anchor_text, element) references found on a page"""
+        with self.lock:
+            source_id = self._get_id(source_url)
+            for target_url, anchor_text, element in references:
+                self.ref_sources.append(source_id)
+                self.ref_targets.append(self.reference_urls.encode(target_url))
+                self.ref_texts.append(self.anchor_texts.encode(' '.join(anchor_text.split())[:MAX_ANCHOR_TEXT]))
+                self.ref_elements.append(self.element_types.encode(element))
+            self._referrer_index = None
+    
+    def _build_referrer_index(self):
+        """Group references by target: row offsets and reference positions sorted by target"""
+        with self.lock:
+            if self._referrer_index is None:
+                targets = np.frombuffer(self.ref_targets, dtype=np.int32)
+                order = np.argsort(targets, kind='stable').astype(np.int32)
+                target_count = len(self.reference_urls.strings)
+                indptr = np.zeros(target_count + 1, dtype=np.int64)
+                np.cumsum(np.bincount(targets, minlength=target_count), out=indptr[1:])
+                del targets
+                self._referrer_index = (indptr, order)
+            return self._referrer_index
+    
+    def get_referrers(self, url):
+        """Get the pages referencing a URL with anchor text and element type"""
+        target_id = self.reference_urls.ids.get(url)
+        if target_id is None:
+            return []
+        
+        indptr, order = self._build_referrer_index()
+        referrers = []
+        seen = set()
+        for position in order[indptr[target_id]:indptr[target_id + 1]]:
+            key = (self.ref_sources[position], self.ref_texts[position], self.ref_elements[position])
+            if key in seen:
+                continue
+            seen.add(key)
+            referrers.append({
+                'url': self.urls[key[0]],
+                'anchor_text': self.anchor_texts.decode(key[1]),
+                'element': self.element_types.decode(key[2])
+            })
+        return referrers
+    
+    def build(self):
+        """Merge the buffered edges into the CSR arrays (indptr, indices)"""
+        with self.lock:
+            if self._csr is not None:
+                return self._csr
+            
+            node_count = len(self.urls)
+            stride = max(node_count, 1)
+            
+            # Sorting combined keys orders edges by source, then target, and
+            # lets duplicate links collapse into one edge; built in place to
+            # keep peak memory near 8 bytes per edge
+            keys = np.frombuffer(self.edge_sources, dtype=np.int32).astype(np.int64)
+            keys *= stride
+            keys += np.frombuffer(self.edge_targets, dtype=np.int32)
+            if self._edges is not None:
+                built = _edge_sources(self._edges[0]).astype(np.int64)
+                built *= stride
+                built += self._edges[1]
+                keys = np.concatenate((built, keys))
+                del built
+            # Links added from now on go to fresh buffers
+            self.edge_sources = array('i')
+            self.edge_targets = array('i')
+            keys.sort()
+            if len(keys):
+                keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+            indptr = np.zeros(node_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(keys // stride, minlength=node_count), out=indptr[1:])
+            indices = (keys % stride).astype(np.int32)
+            del keys
+            
+            self._edges = self._csr = (indptr, indices)
+            return self._csr
+    
+    def _neighbors(self, frontier):
+        """All link targets of the pages in frontier, gathered without a Python loop"""
+        indptr, indices = self.build()
+        starts = indptr[frontier]
+        lengths = indptr[frontier + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int32)
+        
+        # Offset of each gathered edge within its row, added to the row start
+        row_offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return indices[row_offsets + np.arange(total)]
+    
+    def click_depth(self):
+        """BFS link distance from the start pages; -1 for unreachable pages"""
+        self.build()
+        depth = np.full(len(self.urls), -1, dtype=np.int32)
+        frontier = np.array(sorted(self.root_ids), dtype=np.int64)
+        if not len(frontier):
+            return depth
+        
+        depth[frontier] = 0
+        level = 0
+        while len(frontier):
+            level += 1
+            neighbors = self._neighbors(frontier)
+            frontier = np.unique(neighbors[depth[neighbors] == -1]).astype(np.int64)
+            depth[frontier] = level
+        return depth
+    
+    def in_degree(self):
+        """Number of distinct pages linking to each page"""
+        _, indices = self.build()
+        return np.bincount(indices, minlength=len(self.urls))
+    
+    def out_degree(self):
+        """Number of distinct pages each page links to"""
+        indptr, _ = self.build()
+        return np.diff(indptr)
+    
+    def pagerank(self, damping=PAGERANK_DAMPING, max_iterations=PAGERANK_MAX_ITERATIONS,
+                 tolerance=PAGERANK_TOLERANCE):
+        """PageRank by power iteration over the edge arrays"""
+        indptr, indices = self.build()
+        # Expanded for the iteration only, not kept with the graph
+        edge_sources = _edge_sources(indptr)
+        node_count = len(self.urls)
+        if node_count == 0:
+            return np.empty(0, dtype=np.float64)
+        
+        out_degree = self.out_degree()
+        dangling = out_degree == 0
+        inverse_degree = np.zeros(node_count, dtype=np.float64)
+        inverse_degree[~dangling] = 1.0 / out_degree[~dangling]
+        
+        rank = np.full(node_count, 1.0 / node_count)
+        for _ in range(max_iterations):
+            # Pages without outgoing links spread their rank over all pages
+            dangling_share = rank[dangling].sum() / node_count
+            contributions = np.bincount(indices, weights=(rank * inverse_degree)[edge_sources],
+                                        minlength=node_count)
+            new_rank = (1 - damping) / node_count + damping * (contributions + dangling_share)
+            change = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if change < tolerance:
+                break
+        return rank
+    
+    def get_metrics(self):
+        """Get click depth, link counts and PageRank per page, highest PageRank first"""
+        if not self.urls:
+            return []
+        
+        depth = self.click_depth()
+        in_degree = self.in_degree()
+        out_degree = self.out_degree()
+        rank = self.pagerank()
+        is_root = np.zeros(len(self.urls), dtype=bool)
+        is_root[list(self.root_ids)] = True
+        
+        metrics = []
+        for node_id in np.argsort(-rank, kind='stable'):
+            metrics.append({
+                'url': self.urls[node_id],
+                'click_depth': int(depth[node_id]) if depth[node_id] >= 0 else None,
+                'inbound_links': int(in_degree[node_id]),
+                'outbound_links': int(out_degree[node_id]),
+                'pagerank': round(float(rank[node_id]), 6),
+                'orphan': bool(in_degree[node_id] == 0 and not is_root[node_id])
+            })
+        return metrics
+    
+    def get_summary(self):
+        """Get graph size and site-level link statistics"""
+        indptr, indices = self.build()
+        depth = self.click_depth()
+        reachable = depth[depth >= 0]
+        in_degree = self.in_degree()
+        is_root = np.zeros(len(self.urls), dtype=bool)
+        is_root[list(self.root_ids)] = True
+        
+        return {
+            'pages': len(self.urls),
+            'links': int(len(indices)),
+            'max_click_depth': int(reachable.max()) if len(reachable) else 0,
+            'unreachable_pages': int((depth < 0).sum()),
+            'orphan_pages': int(((in_degree == 0) & ~is_root).sum()),
+            'graph_bytes': int(indptr.nbytes + indices.nbytes
+                               + len(self.edge_sources) * self.edge_sources.itemsize
+                               + len(self.edge_targets) * self.edge_targets.itemsize)
+        }
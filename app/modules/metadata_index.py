@@ -0,0 +1,65 @@
+# modules/metadata_index.py - Site-wide duplicate title, description and H1 index
+import hashlib
+import re
+import threading
+
+# Fields indexed per page and the SEO module their duplicates are reported under
+INDEXED_FIELDS = {
+    'title': 'Duplicate Page Title',
+    'meta_description': 'Duplicate Meta Description',
+    'h1': 'Duplicate H1 Heading'
+}
+# Characters of the first occurrence kept to show in duplicate findings
+SAMPLE_LENGTH = 120
+
+def normalize_text(text):
+    """Normalize text so trivially different copies compare equal"""
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+class MetadataDuplicateIndex:
+    """Hash index of normalized page metadata for cross-page duplicate detection.
+    
+    Only a digest, a short sample and the URLs are kept per value, so pages
+    can be released as soon as they are analyzed.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+    
+    def clear(self):
+        """Remove all indexed values"""
+        with self.lock:
+            self.entries = {field: {} for field in INDEXED_FIELDS}
+    
+    def add(self, field, url, text):
+        """Index the value of a field for a page"""
+        normalized = normalize_text(text)
+        if not normalized:
+            return
+        
+        digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+        with self.lock:
+            entry = self.entries[field].get(digest)
+            if entry is None:
+                entry = {'sample': ' '.join(text.split())[:SAMPLE_LENGTH], 'urls': []}
+                self.entries[field][digest] = entry
+            if url not in entry['urls'][-1:]:
+                entry['urls'].append(url)
+    
+    def get_duplicates(self):
+        """Get values shared by more than one page, most widespread first"""
+        duplicates = []
+        with self.lock:
+            for field, entries in self.entries.items():
+                for entry in entries.values():
+                    if len(entry['urls']) < 2:
+                        continue
+                    duplicates.append({
+                        'field': field,
+                        'module': INDEXED_FIELDS[field],
+                        'value': entry['sample'],
+                        'urls': list(entry['urls']),
+                        'page_count': len(entry['urls'])
+                    })
+        return sorted(duplicates, key=lambda duplicate: duplicate['page_count'], reverse=True)
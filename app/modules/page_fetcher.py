@@ -0,0 +1,218 @@
+# modules/page_fetcher.py - Shared page fetching and parsing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from bs4 import BeautifulSoup
+from config import FETCH_BODY_LIMITS, FETCH_CHUNK_SIZE, FETCH_DRAIN_BYTES
+from modules.page_fingerprint import compute_structural_fingerprint
+from modules.http_timing import create_timed_session, get_connection_timings, build_timings
+from modules.compression import content_decoder
+
+# Shared transport that records DNS, connect, TLS, TTFB and download phases
+timed_session = create_timed_session()
+
+def content_type_class(content_type):
+    """Map a Content-Type header to a FETCH_BODY_LIMITS class"""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ['text/html', 'application/xhtml+xml'] or not content_type:
+        return 'html'
+    if content_type == 'text/css':
+        return 'css'
+    if 'javascript' in content_type or 'ecmascript' in content_type:
+        return 'script'
+    if content_type.startswith('image/'):
+        return 'image'
+    if content_type.startswith('text/') or content_type.endswith(('json', 'xml')):
+        return 'text'
+    return 'other'
+
+def _drain(response):
+    """Read and discard a short body so its connection can be reused.
+    
+    Returns the bytes read; a body longer than FETCH_DRAIN_BYTES is left
+    unread and its connection is dropped on close.
+    """
+    drained = 0
+    for raw_chunk in response.raw.stream(FETCH_CHUNK_SIZE, decode_content=False):
+        drained += len(raw_chunk)
+        if drained > FETCH_DRAIN_BYTES:
+            break
+    return drained
+
+def stream_get(url, timeout=10, max_bytes=None, circuit_breaker=None, **kwargs):
+    """GET a URL reading at most the body limit of its content-type class.
+    
+    The response behaves like a normal requests response; response.truncated
+    tells whether the body was cut off, response.body_skipped whether only
+    headers were read, and response.body_class names the content-type class.
+    max_bytes overrides the configured limit, 0 reads headers only (short
+    bodies are still read and discarded to keep the connection).
+    response.timings holds the phase breakdown in milliseconds and
+    response.wire_bytes the body bytes received before decoding.
+    """
+    if circuit_breaker:
+        response = circuit_breaker.get(url, request=timed_session.get, timeout=timeout, stream=True, **kwargs)
+    else:
+        response = timed_session.get(url, timeout=timeout, stream=True, **kwargs)
+    connection_timings = get_connection_timings(response)
+    
+    body_class = content_type_class(response.headers.get('Content-Type'))
+    limit = FETCH_BODY_LIMITS.get(body_class, 0) if max_bytes is None else max_bytes
+    
+    chunks = []
+    received = 0
+    wire_bytes = 0
+    truncated = False
+    download_start = time.perf_counter()
+    try:
+        if limit > 0:
+            # Read the body still encoded so wire bytes can be counted, then decode
+            decoder = content_decoder(response.headers)
+            for raw_chunk in response.raw.stream(FETCH_CHUNK_SIZE, decode_content=False):
+                wire_bytes += len(raw_chunk)
+                try:
+                    chunk = decoder.decompress(raw_chunk) if decoder else raw_chunk
+                except Exception as e:
+                    raise requests.exceptions.ContentDecodingError(e)
+                if received + len(chunk) > limit:
+                    chunks.append(chunk[:limit - received])
+                    truncated = True
+                    break
+                chunks.append(chunk)
+                received += len(chunk)
+            if decoder and not truncated:
+                chunks.append(decoder.flush())
+        else:
+            # Content-Length counts the encoded body
+            content_length = response.headers.get('Content-Length', '')
+            wire_bytes = int(content_length) if content_length.isdigit() else 0
+            # Short bodies, errors and redirects are read so the connection is reused
+            if content_length.isdigit():
+                drain = wire_bytes <= FETCH_DRAIN_BYTES
+            else:
+                drain = not response.ok or response.is_redirect
+            if drain:
+                wire_bytes = _drain(response)
+    finally:
+        # Closing without reading the rest drops the connection instead of
+        # downloading the remaining body
+        response.close()
+    download_seconds = time.perf_counter() - download_start
+    
+    response._content = b''.join(chunks)
+    response._content_consumed = True
+    response.truncated = truncated
+    response.body_skipped = limit <= 0
+    response.body_class = body_class
+    response.wire_bytes = wire_bytes
+    response.timings = build_timings(response, connection_timings, download_seconds)
+    return response
+
+class FetchedPage:
+    """A fetched page with its parsed DOM and structural fingerprint.
+    
+    When the page was rendered by a headless browser, content is the
+    rendered DOM and response.rendered holds its RenderedPage; the response
+    itself stays the server's.
+    """
+    
+    def __init__(self, url, response, content=None):
+        self.url = url
+        self.response = response
+        self.content = response.content if content is None else content
+        self.truncated = getattr(response, 'truncated', False)
+        self.soup = BeautifulSoup(self.content, 'html.parser')
+        self.fingerprint = compute_structural_fingerprint(self.soup)
+    
+    def parse(self):
+        """Parse a private copy of the DOM for analyzers that modify it"""
+        return BeautifulSoup(self.content, 'html.parser')
+
+class PageFetcher:
+    """Fetch and parse each page once per run and share it between analyzers"""
+    
+    def __init__(self, max_cached_pages=64, timeout=10, circuit_breaker=None, renderer=None):
+        self.max_cached_pages = max_cached_pages
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker
+        self.renderer = renderer
+        self.pages = OrderedDict()
+        self.fingerprints = {}
+        self.lock = threading.Lock()
+    
+    def get_page(self, url):
+        """Get a fetched page, requesting it only if it is not cached"""
+        with self.lock:
+            page = self.pages.get(url)
+            if page is not None:
+                self.pages.move_to_end(url)
+                return page
+        
+        response = stream_get(url, timeout=self.timeout, circuit_breaker=self.circuit_breaker, verify=False)
+        rendered = self._render(url, response)
+        page = FetchedPage(url, response, rendered.html if rendered else None)
+        
+        with self.lock:
+            self.pages[url] = page
+            self.fingerprints[url] = page.fingerprint
+            while len(self.pages) > self.max_cached_pages:
+                self.pages.popitem(last=False)
+        
+        return page
+    
+    def _render(self, url, response):
+        """Render an HTML page in the browser pool when rendering is enabled.
+        
+        Pages that fail to render keep the server HTML; the renderer records
+        the error.
+        """
+        response.rendered = None
+        if not (self.renderer and self.renderer.enabled):
+            return None
+        if response.status_code >= 400 or response.body_class != 'html':
+            return None
+        try:
+            response.rendered = self.renderer.render(url)
+        except Exception:
+            pass
+        return response.rendered
+    
+    def prefetch(self, urls, workers=None):
+        """Fetch pages in parallel ahead of the analyzers, e.g. to keep every browser of the pool busy"""
+        def fetch(url):
+            try:
+                self.get_page(url)
+            except Exception:
+                # The analyzers fetch the page again and report the error
+                pass
+        
+        with ThreadPoolExecutor(max_workers=workers or 4) as executor:
+            list(executor.map(fetch, urls))
+    
+    def get_fingerprint(self, url):
+        """Get the structural fingerprint of a page, fetching it if needed"""
+        fingerprint = self.fingerprints.get(url)
+        if fingerprint is None:
+            fingerprint = self.get_page(url).fingerprint
+        return fingerprint
+    
+    def clear(self):
+        """Clear cached pages and fingerprints"""
+        with self.lock:
+            self.pages = OrderedDict()
+            self.fingerprints = {}
+
+def fetch_page(url, page_fetcher=None, timeout=10, private_dom=False):
+    """Fetch and parse a page, through the shared fetcher when one is configured.
+    
+    Analyzers that modify the DOM must pass private_dom=True so the shared
+    soup stays intact for the other analyzers.
+    """
+    if page_fetcher:
+        page = page_fetcher.get_page(url)
+        return page.response, page.parse() if private_dom else page.soup
+    
+    response = stream_get(url, timeout=timeout, verify=False)
+    return response, BeautifulSoup(response.content, 'html.parser')
@@ -0,0 +1,195 @@
+# modules/page_fingerprint.py - Structural page fingerprinting
+import hashlib
+from collections import Counter
+from bs4 import NavigableString, Tag
+
+# SimHash size and the number of bands used to look up near matches
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+# Pages whose SimHash differs in at most this many bits share a template
+MAX_TEMPLATE_DISTANCE = 3
+# Attributes holding links of the page; the content hash keeps only their kind
+LINK_ATTRIBUTES = {'href', 'src', 'srcset', 'action', 'poster'}
+
+def _hash64(text):
+    """Stable 64-bit hash of a string"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def _content_profile(element):
+    """What analyzers read from an element besides its tag name.
+    
+    Every attribute with its value (class, alt, role, lang, aria-*, ids and
+    inline styles alike) except the page's own link targets, of which only
+    the kind is kept; the length of the element's own text; and for inline
+    stylesheets and scripts a hash of their code.
+    """
+    parts = []
+    for name, value in sorted(element.attrs.items()):
+        if isinstance(value, list):
+            value = ' '.join(value)
+        value = value.strip()
+        # Stylesheet and script URLs are kept, other links only by kind
+        if name in LINK_ATTRIBUTES and element.name not in ['link', 'script'] and value:
+            if value.startswith('#'):
+                value = '#'
+            elif value.lower().startswith('javascript:'):
+                value = 'javascript:'
+            else:
+                value = 'url'
+        parts.append(f"{name}={value}")
+    text_length = sum(len(child.strip()) for child in element.contents if isinstance(child, NavigableString))
+    if text_length:
+        parts.append(f"#text={text_length}")
+    if element.name in ['style', 'script'] and not element.get('src'):
+        parts.append(f"@{_hash64(element.get_text())}")
+    return ' '.join(parts)
+
+def compute_structural_fingerprint(soup):
+    """Compute a DOM-shape hash and a SimHash over tag paths, plus a content hash.
+    
+    Only tag names enter the shape hash and SimHash, so pages built from
+    the same template match regardless of their text, links and attribute
+    values. The content hash covers what template-level analyzers read
+    beyond structure: every element in document order with its attribute
+    values and text length (see _content_profile), so element counts, alt
+    texts, classes and ID references all have to match. Results are only
+    reused between pages whose content hashes match.
+    """
+    shape = hashlib.blake2b(digest_size=16)
+    content = hashlib.blake2b(digest_size=16)
+    tag_paths = Counter()
+    
+    # Iterative walk: (element, path of its parent, depth)
+    stack = [(child, '', 0) for child in reversed(list(soup.children)) if isinstance(child, Tag)]
+    while stack:
+        element, parent_path, depth = stack.pop()
+        path = f"{parent_path}/{element.name}"
+        tag_paths[path] += 1
+        shape.update(f"{depth}:{element.name};".encode('utf-8'))
+        content.update(f"{depth}:{element.name}[{_content_profile(element)}]\n".encode('utf-8', 'replace'))
+        
+        for child in reversed(element.contents):
+            if isinstance(child, Tag):
+                stack.append((child, path, depth + 1))
+    
+    weights = [0] * SIMHASH_BITS
+    for path, count in tag_paths.items():
+        path_hash = _hash64(path)
+        for bit in range(SIMHASH_BITS):
+            if path_hash >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+    
+    simhash = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            simhash |= 1 << bit
+    
+    return {
+        'shape_hash': shape.hexdigest(),
+        'simhash': simhash,
+        'content_hash': content.hexdigest(),
+        'tag_paths': len(tag_paths)
+    }
+
+def simhash_distance(first, second):
+    """Number of differing bits between two SimHashes"""
+    return bin(first ^ second).count('1')
+
+class TemplateResultCache:
+    """Reuse template-level analyzer results for structurally identical pages.
+    
+    Pages are grouped into templates by structure; results are kept per
+    template and content hash, so a page reuses them only when its elements,
+    attribute values and text lengths match the analyzed page too.
+    """
+    
+    def __init__(self, max_distance=MAX_TEMPLATE_DISTANCE):
+        self.max_distance = max_distance
+        self.templates = []
+        self.shape_index = {}
+        self.band_index = {}
+        self.results = {}
+        self.reuse_count = 0
+    
+    def clear(self):
+        """Clear all known templates and cached results"""
+        self.templates = []
+        self.shape_index = {}
+        self.band_index = {}
+        self.results = {}
+        self.reuse_count = 0
+    
+    def _bands(self, simhash):
+        """Split a SimHash into bands used as lookup keys"""
+        band_bits = SIMHASH_BITS // SIMHASH_BANDS
+        mask = (1 << band_bits) - 1
+        return [(band, simhash >> (band * band_bits) & mask) for band in range(SIMHASH_BANDS)]
+    
+    def find_template(self, fingerprint):
+        """Find the template id of a fingerprint, or None if no analyzed page matches.
+        
+        With MAX_TEMPLATE_DISTANCE below SIMHASH_BANDS, two matching hashes are
+        guaranteed to agree on at least one band, so only those candidates are compared.
+        """
+        template_id = self.shape_index.get(fingerprint['shape_hash'])
+        if template_id is not None:
+            return template_id
+        
+        best_id, best_distance = None, self.max_distance + 1
+        for band_key in self._bands(fingerprint['simhash']):
+            for candidate_id in self.band_index.get(band_key, []):
+                distance = simhash_distance(self.templates[candidate_id]['simhash'], fingerprint['simhash'])
+                if distance < best_distance:
+                    best_id, best_distance = candidate_id, distance
+        return best_id
+    
+    def add_template(self, fingerprint, url):
+        """Register the fingerprint of an analyzed page as a new template"""
+        template_id = len(self.templates)
+        self.templates.append({'simhash': fingerprint['simhash'], 'url': url})
+        self.shape_index[fingerprint['shape_hash']] = template_id
+        for band_key in self._bands(fingerprint['simhash']):
+            self.band_index.setdefault(band_key, []).append(template_id)
+        return template_id
+    
+    def get_results(self, analyzer, fingerprint):
+        """Get cached results of an analyzer for a matching template"""
+        template_id = self.find_template(fingerprint)
+        if template_id is None:
+            return None
+        return self.results.get((analyzer, template_id, fingerprint['content_hash']))
+    
+    def store_results(self, analyzer, fingerprint, url, test_cases):
+        """Store the results of an analyzer for the template of a page"""
+        template_id = self.find_template(fingerprint)
+        if template_id is None:
+            template_id = self.add_template(fingerprint, url)
+        self.results.setdefault((analyzer, template_id, fingerprint['content_hash']), {'url': url, 'test_cases': list(test_cases)})
+    
+    def reuse_results(self, cached, url, test_case_manager):
+        """Copy cached template-level test cases to another page"""
+        self.reuse_count += 1
+        source_url = cached['url']
+        reused = []
+        for test_case in cached['test_cases']:
+            # Site-wide component findings are reported once, not per page
+            if not isinstance(test_case, dict) or test_case.get('Site-wide Component'):
+                continue
+            comment = f"Template-level result reused from {source_url} (matching page structure, attribute values and text)"
+            if test_case.get('Comments/Bug ID'):
+                comment = f"{test_case['Comments/Bug ID']} | {comment}"
+            reused.append(test_case_manager.copy_test_case(
+                test_case,
+                test_data=str(test_case.get('Test Links/Data', '')).replace(source_url, url),
+                comments=comment
+            ))
+        return reused
+    
+    def get_statistics(self):
+        """Get template reuse statistics"""
+        return {
+            'templates': len(self.templates),
+            'reused_analyses': self.reuse_count
+        }
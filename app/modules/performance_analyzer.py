@@ -3,33 +3,53 @@ import requests
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from config import PERFORMANCE_THRESHOLDS
+from config import PERFORMANCE_THRESHOLDS, LATENCY_SAMPLING_SETTINGS
 from modules.test_case_manager import TestCaseManager
+from modules.page_fetcher import fetch_page, stream_get
+from modules.http_timing import timing_fields
+from modules.compression import compression_info
+from modules.image_probe import MODERN_FORMATS
+from modules.script_index import get_page_scripts
 
 class PerformanceAnalyzer:
     """Analyze website performance"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None, latency_sampler=None, resource_loader=None,
+                 image_probe=None, script_store=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
+        self.latency_sampler = latency_sampler
+        self.resource_loader = resource_loader
+        self.image_probe = image_probe
+        self.script_store = script_store
     
     def analyze_performance(self, url):
         """Perform comprehensive performance analysis"""
         test_cases = []
         
         try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher)
             
             # 1. Page Load Time Analysis
             load_time_test_cases = self.analyze_page_load_times(url, response)
             test_cases.extend(load_time_test_cases)
             
+            # 1b. Paint and interactivity timings (only when a headless browser rendered the page)
+            rendered = getattr(response, 'rendered', None)
+            if rendered:
+                test_cases.extend(self.analyze_rendered_timings(url, rendered))
+            
             # 2. Resource Analysis
             resource_test_cases = self.analyze_page_resources(soup, url)
             test_cases.extend(resource_test_cases)
             
+            # 2b. Page Weight (loads every sub-resource)
+            if self.resource_loader:
+                weight_test_cases = self.analyze_page_weight(soup, url, response)
+                test_cases.extend(weight_test_cases)
+            
             # 3. Network Analysis
-            network_test_cases = self.analyze_network_performance(url)
+            network_test_cases = self.analyze_network_performance(url, response)
             test_cases.extend(network_test_cases)
             
             # 4. Cache Analysis
@@ -79,8 +99,33 @@ class PerformanceAnalyzer:
         
         try:
             # Calculate total load time
-            load_time = response.elapsed.total_seconds() * 1000  # Convert to milliseconds
+            timings = getattr(response, 'timings', None)
+            if timings:
+                load_time = timings['total_ms']
+            else:
+                load_time = response.elapsed.total_seconds() * 1000  # Convert to milliseconds
+            load_label = "Total load time"
+            sample_note = ""
+            
+            # Sampling mode judges the configured percentile of several requests
+            latency = None
+            if self.latency_sampler and self.latency_sampler.enabled:
+                latency = self.latency_sampler.sample(url, response)
+                load_stats = latency['statistics']['total_ms']
+                if load_stats:
+                    percentile = LATENCY_SAMPLING_SETTINGS['threshold_percentiles']['load_time']
+                    load_time = load_stats[f'p{percentile}']
+                    load_label = f"p{percentile} load time"
+                    sample_note = (f" over {len(latency['samples']['total_ms'])} cold-connection samples: "
+                                   + ", ".join(f"p{p} {load_stats[f'p{p}']:.0f}ms"
+                                               for p in LATENCY_SAMPLING_SETTINGS['percentiles'])
+                                   + f", mean {load_stats['mean']:.0f}ms, std {load_stats['std']:.0f}ms, "
+                                   f"{load_stats['outliers']} outlier(s)")
+                    if latency['first_response']:
+                        sample_note += f"; first fetch {latency['first_response']['total_ms']:.0f}ms"
             page_size_kb = len(response.content) / 1024
+            # Bodies over the fetch limit are cut off, so the real size is larger
+            size_note = ", truncated at fetch limit" if getattr(response, 'truncated', False) else ""
             
             # Test 1: Total Load Time
             if load_time <= PERFORMANCE_THRESHOLDS['load_time']:
@@ -90,7 +135,7 @@ class PerformanceAnalyzer:
                     description="Measure total page load time",
                     test_steps="1. Send HTTP request\n2. Measure response time\n3. Calculate load time",
                     expected_result=f"Page should load within {PERFORMANCE_THRESHOLDS['load_time']}ms",
-                    actual_result=f"Total load time: {load_time:.0f}ms (Good)",
+                    actual_result=f"{load_label}: {load_time:.0f}ms{sample_note} (Good)",
                     status="Pass",
                     severity="High"
                 ))
@@ -101,7 +146,7 @@ class PerformanceAnalyzer:
                     description="Measure total page load time",
                     test_steps="1. Send HTTP request\n2. Measure response time\n3. Calculate load time",
                     expected_result=f"Page should load within {PERFORMANCE_THRESHOLDS['load_time']}ms",
-                    actual_result=f"Total load time: {load_time:.0f}ms (Slow)",
+                    actual_result=f"{load_label}: {load_time:.0f}ms{sample_note} (Slow)",
                     status="Fail",
                     severity="High",
                     resolutions="Optimize server response time, compress resources, use CDN"
@@ -126,12 +171,29 @@ class PerformanceAnalyzer:
                     description="Calculate total page size",
                     test_steps="1. Get response content\n2. Calculate size\n3. Check against threshold",
                     expected_result=f"Page should be under {PERFORMANCE_THRESHOLDS['page_size']}KB",
-                    actual_result=f"Page size: {page_size_kb:.1f}KB (Large)",
+                    actual_result=f"Page size: {page_size_kb:.1f}KB (Large{size_note})",
                     status="Fail",
                     severity="Medium",
                     resolutions="Compress images, minify CSS/JS, remove unused code"
                 ))
             
+            if timings:
+                breakdown_timings = timings
+                ttfb_stats = latency['statistics']['ttfb_ms'] if latency else None
+                if ttfb_stats:
+                    percentile = LATENCY_SAMPLING_SETTINGS['threshold_percentiles']['ttfb']
+                    breakdown_timings = dict(timings, ttfb_ms=ttfb_stats[f'p{percentile}'])
+                test_cases.append(self._analyze_timing_breakdown(url, breakdown_timings))
+                # Every load time result carries the phase breakdown
+                for test_case in test_cases:
+                    if test_case:
+                        test_case.update(timing_fields(timings))
+            
+            if latency:
+                for test_case in test_cases:
+                    if test_case:
+                        test_case['Latency Samples (ms)'] = ', '.join(f"{sample:.0f}" for sample in latency['samples']['total_ms'])
+            
             return test_cases
             
         except Exception as e:
@@ -198,37 +260,214 @@ class PerformanceAnalyzer:
             ))
             return test_cases
     
-    def analyze_network_performance(self, url):
-        """Analyze network-related performance factors."""
+    def analyze_page_weight(self, soup, url, response):
+        """Load all sub-resources to measure page weight and render-blocking bytes."""
         test_cases = []
         
         try:
-            # Test 1: GZIP Compression Check
-            headers = {'Accept-Encoding': 'gzip, deflate'}
-            response = requests.get(url, headers=headers, timeout=5, verify=False)
+            waterfall = self.resource_loader.load(url, soup, getattr(response, 'wire_bytes', len(response.content)))
+            weight_kb = waterfall['page_weight_bytes'] / 1024
+            blocking_kb = waterfall['render_blocking_bytes'] / 1024
+            by_type = ", ".join(f"{resource_type}: {size / 1024:.1f}KB"
+                                for resource_type, size in sorted(waterfall['bytes_by_type'].items()))
+            
+            # Test 1: Total Page Weight
+            weight_ok = weight_kb <= PERFORMANCE_THRESHOLDS['page_weight']
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Page Weight",
+                description="Measure HTML plus all CSS, JS, image and font bytes",
+                test_steps="1. Collect referenced sub-resources\n2. Fetch them concurrently\n3. Sum transfer sizes",
+                expected_result=f"Page weight should be under {PERFORMANCE_THRESHOLDS['page_weight']}KB",
+                actual_result=(f"Page weight: {weight_kb:.1f}KB over {waterfall['resource_count']} resources "
+                               f"({by_type or 'no sub-resources'}), loaded in {waterfall['load_time_ms']:.0f}ms "
+                               f"({'Good' if weight_ok else 'Heavy'})"),
+                status="Pass" if weight_ok else "Fail",
+                severity="Medium",
+                resolutions="" if weight_ok else "Compress and resize images, subset fonts, remove unused CSS/JS"
+            ))
+            
+            # Test 2: Render-Blocking Bytes
+            blocking_ok = blocking_kb <= PERFORMANCE_THRESHOLDS['render_blocking_size']
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Render-Blocking Resources",
+                description="Measure CSS and synchronous head scripts that block first render",
+                test_steps="1. Find stylesheets and synchronous scripts in <head>\n2. Fetch them\n3. Sum transfer sizes",
+                expected_result=f"Render-blocking resources should be under {PERFORMANCE_THRESHOLDS['render_blocking_size']}KB",
+                actual_result=(f"{waterfall['render_blocking_count']} render-blocking resource(s), {blocking_kb:.1f}KB "
+                               f"({'Good' if blocking_ok else 'Too large'})"),
+                status="Pass" if blocking_ok else "Fail",
+                severity="High",
+                resolutions="" if blocking_ok else "Inline critical CSS, defer or async scripts, split CSS by media query"
+            ))
             
-            if 'gzip' in response.headers.get('Content-Encoding', ''):
+            # Test 3: Failed Sub-resources
+            if waterfall['failed_resources']:
+                failed = [resource['url'] for resource in waterfall['resources']
+                          if not resource['status_code'] or resource['status_code'] >= 400]
                 test_cases.append(self._create_performance_test_case(
                     url=url,
-                    module="GZIP Compression",
-                    description="Check if GZIP compression is enabled",
-                    test_steps="1. Send request with Accept-Encoding header\n2. Check response headers\n3. Verify compression",
-                    expected_result="Server should use GZIP compression",
-                    actual_result="GZIP compression enabled",
-                    status="Pass",
-                    severity="Medium"
+                    module="Failed Sub-resources",
+                    description="Check that every referenced sub-resource loads",
+                    test_steps="1. Fetch sub-resources\n2. Check status codes",
+                    expected_result="All sub-resources should load successfully",
+                    actual_result=f"{len(failed)} failed: {', '.join(failed[:5])}",
+                    status="Fail",
+                    severity="Medium",
+                    resolutions="Fix or remove references to missing resources"
                 ))
+            
+            return test_cases
+            
+        except Exception as e:
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Page Weight",
+                description="Measure HTML plus all sub-resource bytes",
+                test_steps="1. Collect referenced sub-resources\n2. Fetch them concurrently\n3. Sum transfer sizes",
+                expected_result="Page weight measured successfully",
+                actual_result=f"Error loading sub-resources: {str(e)[:100]}",
+                status="Fail",
+                severity="Medium"
+            ))
+            return test_cases
+    
+    def _analyze_timing_breakdown(self, url, timings):
+        """Tell slow servers (TTFB) apart from slow networks (DNS, connect, TLS)"""
+        setup_ms = timings['dns_ms'] + timings['connect_ms'] + timings['tls_ms']
+        phases = (f"DNS {timings['dns_ms']:.0f}ms, connect {timings['connect_ms']:.0f}ms, "
+                  f"TLS {timings['tls_ms']:.0f}ms, TTFB {timings['ttfb_ms']:.0f}ms, "
+                  f"download {timings['download_ms']:.0f}ms")
+        
+        slow_server = timings['ttfb_ms'] > PERFORMANCE_THRESHOLDS['ttfb']
+        slow_network = setup_ms > PERFORMANCE_THRESHOLDS['connection_setup']
+        if slow_server and slow_network:
+            verdict, resolutions = "Slow server and slow network", "Reduce server processing time and serve from a CDN closer to users"
+        elif slow_server:
+            verdict, resolutions = "Slow server", "Profile server-side rendering, database queries and caching"
+        elif slow_network:
+            verdict, resolutions = "Slow network", "Use a CDN, faster DNS and TLS session resumption to reduce connection setup"
+        else:
+            verdict, resolutions = "Good", ""
+        
+        return self._create_performance_test_case(
+            url=url,
+            module="Request Timing Breakdown",
+            description="Split request time into DNS, connect, TLS, TTFB and download phases",
+            test_steps="1. Fetch page over an instrumented connection\n2. Record each phase\n3. Compare server and network time to thresholds",
+            expected_result=f"TTFB under {PERFORMANCE_THRESHOLDS['ttfb']}ms and connection setup under {PERFORMANCE_THRESHOLDS['connection_setup']}ms",
+            actual_result=f"{phases} ({verdict})",
+            status="Pass" if verdict == "Good" else "Warning",
+            severity="Medium",
+            resolutions=resolutions
+        )
+    
+    def analyze_rendered_timings(self, url, rendered):
+        """Judge FCP, LCP and TTI measured by the headless browser against thresholds."""
+        test_cases = []
+        metrics = [
+            ('fcp_ms', 'fcp', "First Contentful Paint", "Inline critical CSS and defer render-blocking scripts and stylesheets"),
+            ('lcp_ms', 'lcp', "Largest Contentful Paint", "Optimize and preload the largest above-the-fold image or text block"),
+            ('tti_ms', 'tti', "Time to Interactive", "Split long JavaScript tasks and defer non-critical scripts")
+        ]
+        
+        for timing, threshold_key, name, resolutions in metrics:
+            value = rendered.timings.get(timing)
+            if value is None:
+                continue
+            threshold = PERFORMANCE_THRESHOLDS[threshold_key]
+            good = value <= threshold
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module=name,
+                description=f"Measure {name} in a headless browser",
+                test_steps="1. Render page in headless Chromium\n2. Read paint and navigation timings\n3. Compare with threshold",
+                expected_result=f"{name} within {threshold}ms",
+                actual_result=f"{name}: {value:.0f}ms ({'Good' if good else 'Slow'})",
+                status="Pass" if good else "Fail",
+                severity="High" if threshold_key != 'tti' else "Medium",
+                resolutions="" if good else resolutions
+            ))
+        
+        long_tasks = len(rendered.long_tasks)
+        if long_tasks:
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Main Thread Blocking",
+                description="Check for long JavaScript tasks during load",
+                test_steps="1. Record long tasks (over 50ms) while rendering\n2. Sum time beyond 50ms per task",
+                expected_result="Few long tasks blocking input during load",
+                actual_result=f"{long_tasks} long tasks, {rendered.blocking_ms:.0f}ms total blocking time",
+                status="Warning",
+                severity="Medium",
+                resolutions="Break up long tasks and move heavy work off the main thread"
+            ))
+        
+        return test_cases
+    
+    def analyze_network_performance(self, url, response):
+        """Analyze network-related performance factors."""
+        test_cases = []
+        
+        try:
+            # Test 1: Page Compression, measured on the page response already fetched
+            page = compression_info(response)
+            savings_kb = page['estimated_savings_bytes'] / 1024
+            if page['compression_ratio'] > 1 or not page['compressible']:
+                status, verdict, resolutions = "Pass", "Good", ""
+            elif savings_kb <= PERFORMANCE_THRESHOLDS['compression_savings']:
+                status, verdict, resolutions = "Pass", "Small page", ""
             else:
+                status, verdict = "Fail", "Not compressed"
+                resolutions = f"Enable {page['best_encoding']} compression on server for text-based resources"
+            
+            savings_note = (f", {page['best_encoding']} would save {savings_kb:.1f}KB"
+                            if page['estimated_savings_bytes'] else "")
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Compression",
+                description="Check transfer compression (br, gzip, zstd) of the page",
+                test_steps="1. Send request accepting br/gzip/zstd\n2. Compare wire bytes to decoded bytes\n3. Estimate savings of uncompressed text",
+                expected_result="Text responses should be compressed",
+                actual_result=(f"Encoding: {page['content_encoding']}, {page['wire_bytes'] / 1024:.1f}KB on the wire, "
+                               f"{page['decoded_bytes'] / 1024:.1f}KB decoded (ratio {page['compression_ratio']:.2f}"
+                               f"{savings_note}) ({verdict})"),
+                status=status,
+                severity="Medium",
+                resolutions=resolutions
+            ))
+            
+            # Test 2: Sub-resource Compression by resource type, from the waterfall
+            waterfall = self.resource_loader.results.get(url) if self.resource_loader else None
+            if waterfall and waterfall['resources']:
+                by_type = {}
+                for resource in waterfall['resources']:
+                    # Images are loaded headers-only, so there are no decoded bytes to compare
+                    if not resource['status_code'] or resource['status_code'] >= 400 or resource.get('body_skipped'):
+                        continue
+                    totals = by_type.setdefault(resource['type'], {'wire': 0, 'decoded': 0, 'savings': 0})
+                    totals['wire'] += resource['wire_bytes']
+                    totals['decoded'] += resource['decoded_bytes']
+                    totals['savings'] += resource['estimated_savings_bytes']
+                
+                resource_savings_kb = sum(totals['savings'] for totals in by_type.values()) / 1024
+                summary = "; ".join(
+                    f"{resource_type}: {totals['wire'] / 1024:.1f}KB wire / {totals['decoded'] / 1024:.1f}KB decoded"
+                    + (f", {totals['savings'] / 1024:.1f}KB savable" if totals['savings'] else "")
+                    for resource_type, totals in sorted(by_type.items())
+                )
+                resources_ok = resource_savings_kb <= PERFORMANCE_THRESHOLDS['compression_savings']
                 test_cases.append(self._create_performance_test_case(
                     url=url,
-                    module="GZIP Compression",
-                    description="Check if GZIP compression is enabled",
-                    test_steps="1. Send request with Accept-Encoding header\n2. Check response headers\n3. Verify compression",
-                    expected_result="Server should use GZIP compression",
-                    actual_result="GZIP compression not enabled",
-                    status="Fail",
+                    module="Resource Compression",
+                    description="Check transfer compression of CSS, JS and other text sub-resources",
+                    test_steps="1. Load sub-resources\n2. Compare wire bytes to decoded bytes per type\n3. Estimate savings of uncompressed text",
+                    expected_result=f"Uncompressed text resources should waste under {PERFORMANCE_THRESHOLDS['compression_savings']}KB",
+                    actual_result=f"{summary} ({'Good' if resources_ok else f'{resource_savings_kb:.1f}KB savable'})",
+                    status="Pass" if resources_ok else "Fail",
                     severity="Medium",
-                    resolutions="Enable GZIP compression on server for text-based resources"
+                    resolutions="" if resources_ok else "Serve CSS, JS, SVG and JSON with br or gzip compression"
                 ))
             
             return test_cases
@@ -238,7 +477,7 @@ class PerformanceAnalyzer:
                 url=url,
                 module="Network Analysis",
                 description="Analyze network performance",
-                test_steps="1. Check HTTP version\n2. Verify compression\n3. Analyze CDN usage",
+                test_steps="1. Measure wire and decoded bytes\n2. Verify compression\n3. Estimate savings",
                 expected_result="Network analysis completed successfully",
                 actual_result=f"Error analyzing network: {str(e)[:100]}",
                 status="Fail",
@@ -320,6 +559,10 @@ class PerformanceAnalyzer:
                         resolutions="Move inline JavaScript to external files, defer non-critical JS"
                     ))
             
+            # Test 2: External bundles, analyzed once per distinct content
+            if self.script_store:
+                test_cases.extend(self._analyze_script_bundles(soup, url))
+            
             return test_cases
             
         except Exception as e:
@@ -335,6 +578,71 @@ class PerformanceAnalyzer:
             ))
             return test_cases
     
+    def _analyze_script_bundles(self, soup, url):
+        """Judge external JavaScript size, minification and duplication from the shared bundle inventory"""
+        test_cases = []
+        scripts = get_page_scripts(soup, url, self.script_store)
+        bundles = [index for index, _ in scripts.bundles.values()]
+        if not bundles:
+            return test_cases
+        
+        # Test 1: External JavaScript weight and libraries
+        limit_kb = PERFORMANCE_THRESHOLDS['script_size']
+        total_kb = sum(bundle.size for bundle in bundles) / 1024
+        wire_kb = sum(bundle.wire_bytes for bundle in bundles) / 1024
+        libraries = sorted({f"{bundle.library} {bundle.library_version}".strip() for bundle in bundles if bundle.library})
+        size_ok = total_kb <= limit_kb
+        test_cases.append(self._create_performance_test_case(
+            url=url,
+            module="External JavaScript",
+            description="Measure external JavaScript bundles and identify libraries",
+            test_steps="1. Fetch each external script once\n2. De-duplicate by content hash\n3. Sum sizes and fingerprint libraries",
+            expected_result=f"External JavaScript should be under {limit_kb}KB",
+            actual_result=(f"{len(bundles)} bundles, {total_kb:.1f}KB ({wire_kb:.1f}KB transferred)"
+                           + (f"; libraries: {', '.join(libraries)}" if libraries else "")
+                           + (" (Good)" if size_ok else " (Large)")),
+            status="Pass" if size_ok else "Fail",
+            severity="Medium",
+            resolutions="" if size_ok else "Split bundles by route, remove unused libraries and defer non-critical scripts"
+        ))
+        
+        # Test 2: Minification
+        unminified = [bundle for bundle in bundles if not bundle.minified]
+        test_cases.append(self._create_performance_test_case(
+            url=url,
+            module="JavaScript Minification",
+            description="Check that external JavaScript bundles are minified",
+            test_steps="1. Measure line length and whitespace of each bundle\n2. Flag unminified bundles",
+            expected_result="External JavaScript should be minified",
+            actual_result=("Unminified: " + ", ".join(f"{bundle.urls[0]} ({bundle.size / 1024:.0f}KB)" for bundle in unminified[:5])
+                           if unminified else f"All {len(bundles)} bundles minified (Good)"),
+            status="Warning" if unminified else "Pass",
+            severity="Low",
+            resolutions="Minify JavaScript in the build (e.g. terser, esbuild)" if unminified else ""
+        ))
+        
+        # Test 3: The same code loaded twice, or two versions of one library
+        duplicates = [f"{urls[0]} also loaded as {', '.join(urls[1:3])}" for _, urls in scripts.duplicate_bundles()]
+        versions = {}
+        for bundle in bundles:
+            if bundle.library:
+                versions.setdefault(bundle.library, set()).add(bundle.library_version or '?')
+        duplicates += [f"{library} versions {', '.join(sorted(found))}" for library, found in versions.items() if len(found) > 1]
+        if duplicates:
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Duplicate JavaScript",
+                description="Check for scripts loaded more than once",
+                test_steps="1. Hash the content of each external script\n2. Compare hashes and library versions on the page",
+                expected_result="Each script and library should be loaded once",
+                actual_result="; ".join(duplicates[:5]),
+                status="Fail",
+                severity="Medium",
+                resolutions="Load each library once from a single URL and remove cache-busting duplicates"
+            ))
+        
+        return test_cases
+    
     def analyze_css_performance(self, soup, url):
         """Analyze CSS performance factors."""
         test_cases = []
@@ -398,6 +706,10 @@ class PerformanceAnalyzer:
                 ))
                 return test_cases
             
+            # Probe file headers for real formats, sizes and dimensions
+            if self.image_probe:
+                return self._analyze_probed_images(soup, url)
+            
             # Test 1: Image Format Analysis
             modern_formats = 0
             total_images = len(images)
@@ -437,6 +749,72 @@ class PerformanceAnalyzer:
             ))
             return test_cases
     
+    def _analyze_probed_images(self, soup, url):
+        """Judge image formats, weight and oversizing from ranged header reads"""
+        test_cases = []
+        records = self.image_probe.analyze_page(soup, url)
+        loaded = {record['url']: record for record in records if record['status_code'] and record['status_code'] < 400}
+        
+        # Test 1: Image Formats (sniffed from file headers, not extensions)
+        raster = [record for record in loaded.values() if record['format'] not in ['svg', 'unknown']]
+        if raster:
+            modern = sum(1 for record in raster if record['format'] in MODERN_FORMATS)
+            modern_format_percent = modern / len(raster) * 100
+            formats = {}
+            for record in raster:
+                formats[record['format']] = formats.get(record['format'], 0) + 1
+            format_summary = ", ".join(f"{image_format}: {count}" for image_format, count in sorted(formats.items()))
+            modern_ok = modern_format_percent >= 50
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Image Formats",
+                description="Check for modern image formats",
+                test_steps="1. Read the first bytes of each image\n2. Identify format from file signature\n3. Count modern formats",
+                expected_result="Use modern formats (WebP, AVIF) when possible",
+                actual_result=f"Modern formats: {modern_format_percent:.1f}% ({format_summary}) ({'Good' if modern_ok else 'Low'})",
+                status="Pass" if modern_ok else "Warning",
+                severity="Low",
+                resolutions="" if modern_ok else "Convert images to WebP/AVIF format with fallbacks for older browsers"
+            ))
+        
+        # Test 2: Image Weight
+        sized = [record for record in loaded.values() if record['bytes']]
+        if sized:
+            limit_bytes = PERFORMANCE_THRESHOLDS['image_size'] * 1024
+            heavy = sorted((record for record in sized if record['bytes'] > limit_bytes),
+                           key=lambda record: -record['bytes'])
+            total_kb = sum(record['bytes'] for record in sized) / 1024
+            test_cases.append(self._create_performance_test_case(
+                url=url,
+                module="Image Weight",
+                description="Measure image byte sizes without downloading them",
+                test_steps="1. Send ranged GET for each image\n2. Read total size from Content-Range\n3. Compare to threshold",
+                expected_result=f"Each image should be under {PERFORMANCE_THRESHOLDS['image_size']}KB",
+                actual_result=(f"{len(sized)} images, {total_kb:.1f}KB total"
+                               + (f"; {len(heavy)} over limit: " + ", ".join(f"{record['url']} ({record['bytes'] / 1024:.0f}KB)"
+                                                                         for record in heavy[:5]) if heavy else " (Good)")),
+                status="Fail" if heavy else "Pass",
+                severity="Medium",
+                resolutions="Compress images and serve them at the size they are displayed" if heavy else ""
+            ))
+        
+        # Test 3: Oversized Images (intrinsic size vs width/height and srcset)
+        oversized = [record for record in records if record['oversized']]
+        test_cases.append(self._create_performance_test_case(
+            url=url,
+            module="Oversized Images",
+            description="Compare intrinsic image dimensions with width/height attributes and srcset descriptors",
+            test_steps="1. Read image dimensions from file headers\n2. Compare with width/height attributes\n3. Check srcset width descriptors",
+            expected_result="Images should not be much larger than the size they are displayed at",
+            actual_result=("; ".join(f"{record['url']}: {record['reason']}" for record in oversized[:5])
+                           if oversized else f"{len(records)} image sources checked (Good)"),
+            status="Fail" if oversized else "Pass",
+            severity="Medium",
+            resolutions="Resize images to their display size and list correct width descriptors in srcset" if oversized else ""
+        ))
+        
+        return test_cases
+    
     def calculate_performance_score(self, performance_test_cases, url):
         """Calculate overall performance score based on test results."""
         if not performance_test_cases:
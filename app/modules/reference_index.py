@@ -0,0 +1,79 @@
+# modules/reference_index.py - Per-page index of element IDs, labels and ID references
+from modules.constants import ID_REFERENCE_ATTRIBUTES
+
+# Elements whose 'for' attribute references other elements by ID
+FOR_ELEMENTS = ['label', 'output']
+
+class ReferenceIndex:
+    """IDs, labels and ID-reference attributes of one page, built in a single pass.
+    
+    Label and ARIA lookups for a form control are dictionary reads instead of
+    document searches, so checking every control of a page stays linear in
+    the size of the page.
+    """
+    
+    def __init__(self, soup):
+        # id -> first element carrying it (later duplicates are ignored, as in browsers)
+        self.ids = {}
+        # id -> labels whose 'for' attribute names it
+        self.labels_by_target = {}
+        # (element, attribute, [ids]) for every ID-reference attribute on the page
+        self.references = []
+        
+        for element in soup.find_all(True):
+            element_id = element.get('id')
+            if element_id and element_id not in self.ids:
+                self.ids[element_id] = element
+            
+            for attribute in ID_REFERENCE_ATTRIBUTES:
+                value = element.get(attribute)
+                if not value or (attribute == 'for' and element.name not in FOR_ELEMENTS):
+                    continue
+                targets = value.split() if isinstance(value, str) else list(value)
+                if not targets:
+                    continue
+                self.references.append((element, attribute, targets))
+                if element.name == 'label' and attribute == 'for':
+                    self.labels_by_target.setdefault(targets[0], []).append(element)
+    
+    def element(self, element_id):
+        """Element with the given ID, or None"""
+        return self.ids.get(element_id)
+    
+    def labels_for(self, control):
+        """Labels of a form control: label[for] targeting its ID, then its wrapping label"""
+        labels = []
+        control_id = control.get('id')
+        if control_id and self.ids.get(control_id) is control:
+            labels.extend(self.labels_by_target.get(control_id, []))
+        
+        # A wrapping label only labels the control when it has no 'for' of its own
+        wrapping = control.find_parent('label')
+        if wrapping is not None and not wrapping.get('for'):
+            labels.append(wrapping)
+        return labels
+    
+    def resolve(self, element, attribute):
+        """Elements an ID-reference attribute of element points to, skipping missing IDs"""
+        value = element.get(attribute) or ''
+        targets = value.split() if isinstance(value, str) else value
+        return [self.ids[target] for target in targets if target in self.ids]
+    
+    def accessible_label(self, control):
+        """Accessible name text of a form control from ARIA and labels, or ''"""
+        labelledby = ' '.join(target.get_text(' ', strip=True)
+                              for target in self.resolve(control, 'aria-labelledby')).strip()
+        if labelledby:
+            return labelledby
+        
+        aria_label = (control.get('aria-label') or '').strip()
+        if aria_label:
+            return aria_label
+        
+        return ' '.join(label.get_text(' ', strip=True) for label in self.labels_for(control)).strip()
+    
+    def broken_references(self):
+        """(element, attribute, missing id) for every reference to an ID not on the page"""
+        return [(element, attribute, target)
+                for element, attribute, targets in self.references
+                for target in targets if target not in self.ids]
@@ -197,7 +197,13 @@ class ReportGenerator:
                             'Status Text': result.get('status_text', ''),
                             'Category': result.get('status_category', ''),
                             'Response Time (ms)': result.get('response_time_ms', ''),
+                            'DNS (ms)': result.get('dns_ms', ''),
+                            'Connect (ms)': result.get('connect_ms', ''),
+                            'TLS (ms)': result.get('tls_ms', ''),
+                            'TTFB (ms)': result.get('ttfb_ms', ''),
                             'Final URL': result.get('final_url', ''),
+                            'Referring Pages': ', '.join(referrer['url'] for referrer in result.get('referrers', [])),
+                            'Cached': f"Yes ({result['cached_at']})" if result.get('cached') else 'No',
                             'Timestamp': result.get('timestamp', '')
                         }
                         link_data.append(row)
@@ -482,6 +488,248 @@ class ReportGenerator:
                         browser_df = pd.DataFrame(browser_data)
                         browser_df.to_excel(writer, sheet_name='Browser Compatibility', index=False)
                 
+                # ============================================================
+                # TEMPLATE SAMPLING COVERAGE
+                # ============================================================
+                sampling_summary = data.get('sampling_summary') or {}
+                if sampling_summary.get('enabled') and sampling_summary.get('templates'):
+                    sampling_data = []
+                    for template in sampling_summary['templates']:
+                        issues = template.get('issues', [])
+                        row = {
+                            'URL Template': template.get('template', ''),
+                            'Total URLs': template.get('total_urls', 0),
+                            'Sampled URLs': len(template.get('sampled_urls', [])),
+                            'Coverage': template.get('coverage', ''),
+                            'Estimated Pages With Issues': sum(issue['estimated_pages_affected'] for issue in issues),
+                            'Top Issues': ', '.join(f"{issue['module']} (~{issue['estimated_pages_affected']})"
+                                                    for issue in issues[:5])
+                        }
+                        sampling_data.append(row)
+                    
+                    sampling_df = pd.DataFrame(sampling_data)
+                    sampling_df.to_excel(writer, sheet_name='Template Sampling', index=False)
+                
+                # ============================================================
+                # SITE-WIDE COMPONENTS
+                # ============================================================
+                if data.get('site_wide_components'):
+                    component_data = []
+                    for component in data['site_wide_components']:
+                        row = {
+                            'Component': component.get('component', ''),
+                            'Element': component.get('tag', ''),
+                            'First Seen On': component.get('first_seen_on', ''),
+                            'Pages Including Component': component.get('page_count', 0)
+                        }
+                        component_data.append(row)
+                    
+                    component_df = pd.DataFrame(component_data)
+                    component_df.to_excel(writer, sheet_name='Site-wide Components', index=False)
+                
+                # ============================================================
+                # DUPLICATE CONTENT
+                # ============================================================
+                if data.get('duplicate_content'):
+                    duplicate_data = []
+                    for cluster_number, cluster in enumerate(data['duplicate_content'], 1):
+                        for url in cluster.get('urls', []):
+                            row = {
+                                'Cluster': cluster_number,
+                                'URL': url,
+                                'Pages In Cluster': cluster.get('page_count', 0),
+                                'Minimum Similarity': f"{cluster.get('min_similarity', 0):.0%}"
+                            }
+                            duplicate_data.append(row)
+                    
+                    duplicate_df = pd.DataFrame(duplicate_data)
+                    duplicate_df.to_excel(writer, sheet_name='Duplicate Content', index=False)
+                
+                # ============================================================
+                # DUPLICATE TITLES, DESCRIPTIONS AND H1 HEADINGS
+                # ============================================================
+                if data.get('duplicate_metadata'):
+                    metadata_data = []
+                    for duplicate in data['duplicate_metadata']:
+                        row = {
+                            'Check': duplicate.get('module', ''),
+                            'Shared Value': duplicate.get('value', ''),
+                            'Pages': duplicate.get('page_count', 0),
+                            'URLs': ', '.join(duplicate.get('urls', []))
+                        }
+                        metadata_data.append(row)
+                    
+                    metadata_df = pd.DataFrame(metadata_data)
+                    metadata_df.to_excel(writer, sheet_name='Duplicate Metadata', index=False)
+                
+                # ============================================================
+                # UNREACHABLE HOSTS (CIRCUIT BREAKER)
+                # ============================================================
+                if data.get('unreachable_hosts'):
+                    host_data = []
+                    for host in data['unreachable_hosts']:
+                        row = {
+                            'Host': host.get('host', ''),
+                            'Circuit State': host.get('state', ''),
+                            'Consecutive Failures': host.get('consecutive_failures', 0),
+                            'Times Tripped': host.get('trips', 0),
+                            'Requests Skipped': host.get('short_circuited_requests', 0),
+                            'Last Error': host.get('last_error', '')
+                        }
+                        host_data.append(row)
+                    
+                    host_df = pd.DataFrame(host_data)
+                    host_df.to_excel(writer, sheet_name='Unreachable Hosts', index=False)
+                
+                # ============================================================
+                # LATENCY SAMPLES
+                # ============================================================
+                if data.get('latency_samples'):
+                    latency_data = []
+                    for result in data['latency_samples']:
+                        total = result.get('total_ms') or {}
+                        ttfb = result.get('ttfb_ms') or {}
+                        row = {
+                            'URL': result.get('url', ''),
+                            'Samples': result.get('sample_count', 0),
+                            'Failed Samples': result.get('failed_samples', 0),
+                            'p50 (ms)': total.get('p50', ''),
+                            'p90 (ms)': total.get('p90', ''),
+                            'p99 (ms)': total.get('p99', ''),
+                            'Mean (ms)': total.get('mean', ''),
+                            'Std Dev (ms)': total.get('std', ''),
+                            'Outliers': total.get('outliers', ''),
+                            'TTFB p50 (ms)': ttfb.get('p50', ''),
+                            'TTFB p90 (ms)': ttfb.get('p90', ''),
+                            'Raw Samples (ms)': ', '.join(f"{sample:.0f}" for sample in result.get('samples_ms', []))
+                        }
+                        latency_data.append(row)
+                    
+                    latency_df = pd.DataFrame(latency_data)
+                    latency_df.to_excel(writer, sheet_name='Latency Samples', index=False)
+                
+                # ============================================================
+                # RENDERED PAGES (HEADLESS BROWSER)
+                # ============================================================
+                if data.get('rendered_pages'):
+                    rendered_data = []
+                    for page in data['rendered_pages']:
+                        row = {
+                            'URL': page.get('url', ''),
+                            'Final URL': page.get('final_url', ''),
+                            'TTFB (ms)': page.get('ttfb_ms', ''),
+                            'FCP (ms)': page.get('fcp_ms', ''),
+                            'LCP (ms)': page.get('lcp_ms', ''),
+                            'DOMContentLoaded (ms)': page.get('dom_content_loaded_ms', ''),
+                            'Load (ms)': page.get('load_ms', ''),
+                            'TTI (ms)': page.get('tti_ms', ''),
+                            'Long Tasks': page.get('long_tasks', ''),
+                            'Total Blocking (ms)': page.get('blocking_ms', ''),
+                            'Rendered DOM Elements': page.get('dom_elements', ''),
+                            'Rendered HTML (bytes)': page.get('rendered_html_bytes', ''),
+                            'Error': page.get('error', '')
+                        }
+                        rendered_data.append(row)
+                    
+                    rendered_df = pd.DataFrame(rendered_data)
+                    rendered_df.to_excel(writer, sheet_name='Rendered Pages', index=False)
+                
+                # ============================================================
+                # SUB-RESOURCE WATERFALL
+                # ============================================================
+                if data.get('resource_waterfall'):
+                    waterfall_data = []
+                    for resource in data['resource_waterfall']:
+                        row = {
+                            'Page URL': resource.get('page_url', ''),
+                            'Resource URL': resource.get('url', ''),
+                            'Type': resource.get('type', ''),
+                            'Render Blocking': 'Yes' if resource.get('render_blocking') else 'No',
+                            'Status': resource.get('status_code') or resource.get('error', ''),
+                            'Start (ms)': resource.get('start_ms', ''),
+                            'Duration (ms)': resource.get('duration_ms', ''),
+                            'TTFB (ms)': resource.get('ttfb_ms', ''),
+                            'Transfer Size (bytes)': resource.get('transfer_bytes', 0),
+                            'Decoded Size (bytes)': resource.get('decoded_bytes', 0),
+                            'Content-Encoding': resource.get('content_encoding', ''),
+                            'Compression Ratio': resource.get('compression_ratio', ''),
+                            'Estimated Savings (bytes)': resource.get('estimated_savings_bytes', 0),
+                            'Cache-Control': resource.get('cache_control', ''),
+                            'ETag': 'Yes' if resource.get('etag') else 'No'
+                        }
+                        waterfall_data.append(row)
+                    
+                    waterfall_df = pd.DataFrame(waterfall_data)
+                    waterfall_df.to_excel(writer, sheet_name='Resource Waterfall', index=False)
+                
+                # ============================================================
+                # IMAGE PROBES
+                # ============================================================
+                if data.get('image_probes'):
+                    image_data = []
+                    for image in data['image_probes']:
+                        row = {
+                            'Page URL': image.get('page_url', ''),
+                            'Image URL': image.get('url', ''),
+                            'Descriptor': image.get('descriptor', ''),
+                            'Status': image.get('status_code') or image.get('error', ''),
+                            'Format': image.get('format', ''),
+                            'Size (KB)': round(image['bytes'] / 1024, 1) if image.get('bytes') else '',
+                            'Intrinsic Size': f"{image['width']}x{image['height']}" if image.get('width') else '',
+                            'Display Size': f"{image.get('display_width') or '?'}x{image.get('display_height') or '?'}",
+                            'Oversized': 'Yes' if image.get('oversized') else 'No',
+                            'Reason': image.get('reason', '')
+                        }
+                        image_data.append(row)
+                    
+                    image_df = pd.DataFrame(image_data)
+                    image_df.to_excel(writer, sheet_name='Image Analysis', index=False)
+                
+                # ============================================================
+                # JAVASCRIPT BUNDLES
+                # ============================================================
+                if data.get('script_bundles'):
+                    bundle_data = []
+                    for bundle in data['script_bundles']:
+                        row = {
+                            'Page URL': bundle.get('page_url', ''),
+                            'Script URL': bundle.get('url', ''),
+                            'Loaded On Page': bundle.get('page_urls', 1),
+                            'Served Under URLs': bundle.get('served_urls', 1),
+                            'Content Hash': bundle.get('content_hash', ''),
+                            'Size (KB)': round(bundle.get('bytes', 0) / 1024, 1),
+                            'Transfer (KB)': round(bundle.get('wire_bytes', 0) / 1024, 1),
+                            'Minified': 'Yes' if bundle.get('minified') else 'No',
+                            'Library': bundle.get('library', ''),
+                            'Version': bundle.get('library_version', ''),
+                            'ES Level': bundle.get('es_level', ''),
+                            'Syntax Features': bundle.get('features', '')
+                        }
+                        bundle_data.append(row)
+                    
+                    bundle_df = pd.DataFrame(bundle_data)
+                    bundle_df.to_excel(writer, sheet_name='JavaScript Bundles', index=False)
+                
+                # ============================================================
+                # INTERNAL LINK GRAPH
+                # ============================================================
+                link_graph = data.get('link_graph') or {}
+                if link_graph.get('pages'):
+                    graph_data = []
+                    for page in link_graph['pages']:
+                        row = {
+                            'URL': page.get('url', ''),
+                            'Click Depth': page.get('click_depth') if page.get('click_depth') is not None else 'Unreachable',
+                            'Inbound Links': page.get('inbound_links', 0),
+                            'Outbound Links': page.get('outbound_links', 0),
+                            'PageRank': page.get('pagerank', 0),
+                            'Orphan': 'Yes' if page.get('orphan') else 'No'
+                        }
+                        graph_data.append(row)
+                    
+                    graph_df = pd.DataFrame(graph_data)
+                    graph_df.to_excel(writer, sheet_name='Link Graph', index=False)
+                
                 # ============================================================
                 # SHEET 12: TEST CASE STATISTICS
                 # ============================================================
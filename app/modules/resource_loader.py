@@ -0,0 +1,239 @@
+# modules/resource_loader.py - Concurrent sub-resource loading and page waterfall
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlparse
+from config import SUBRESOURCE_SETTINGS
+from modules.page_fetcher import stream_get
+from modules.compression import compression_info
+from modules.css_tokenizer import extract_urls, scan_stylesheet
+from modules.image_probe import ImageProbe
+# Stylesheet media that apply while the first screen renders
+BLOCKING_MEDIA = {'', 'all', 'screen'}
+
+def _resolve(base_url, reference):
+    """Absolute http(s) URL of a reference, or None for data: URIs and other schemes"""
+    if not reference or reference.strip().startswith('data:'):
+        return None
+    url = urljoin(base_url, reference.strip()).split('#')[0]
+    return url if urlparse(url).scheme in ['http', 'https'] else None
+
+def find_subresources(soup, page_url):
+    """Stylesheets, scripts, images and preloaded fonts of a page in document order.
+    
+    Returns {url: (resource_type, render_blocking)}; stylesheets without a
+    print-only media query and synchronous scripts in <head> block rendering.
+    """
+    resources = {}
+    
+    for link in soup.find_all('link', href=True):
+        rel = [value.lower() for value in link.get('rel', [])]
+        url = _resolve(page_url, link['href'])
+        if not url or url in resources:
+            continue
+        if 'stylesheet' in rel:
+            media = link.get('media', '').strip().lower()
+            resources[url] = ('stylesheet', media in BLOCKING_MEDIA and not link.has_attr('disabled'))
+        elif 'preload' in rel and link.get('as') == 'font':
+            resources[url] = ('font', False)
+    
+    for script in soup.find_all('script', src=True):
+        url = _resolve(page_url, script['src'])
+        if url and url not in resources:
+            blocking = (script.find_parent('head') is not None
+                        and not script.has_attr('async') and not script.has_attr('defer')
+                        and script.get('type', '').lower() != 'module')
+            resources[url] = ('script', blocking)
+    
+    for image in soup.find_all('img', src=True):
+        url = _resolve(page_url, image['src'])
+        if url and url not in resources:
+            resources[url] = ('image', False)
+    
+    return resources
+
+def find_font_urls(css_text, stylesheet_url):
+    """Font files referenced by the @font-face rules of a stylesheet"""
+    urls = []
+    font_faces = (descriptors for event, descriptors in scan_stylesheet(css_text) if event == 'font_face')
+    for font_face in font_faces:
+        for reference in extract_urls(font_face.get('src', '')):
+            url = _resolve(stylesheet_url, reference)
+            if url and url not in urls:
+                urls.append(url)
+    return urls
+
+class SubresourceLoader:
+    """Fetch every sub-resource of a page concurrently and build its waterfall.
+    
+    Requests share the pooled timed session; per-origin parallelism comes
+    from the adaptive concurrency limiter when one is given. Fonts found in
+    fetched stylesheets are loaded in a second wave, as a browser would.
+    Images are not downloaded: the image probe reads their header bytes with
+    a ranged GET, which also gives their full size, and keeps the result for
+    the image analysis.
+    Complete stylesheets and scripts are handed to the shared stores when
+    given, so the CSS and script analyzers do not fetch them again.
+    """
+    
+    def __init__(self, concurrency_limiter=None, circuit_breaker=None, max_workers=8,
+                 stylesheet_store=None, script_store=None, image_probe=None):
+        self.concurrency_limiter = concurrency_limiter
+        self.circuit_breaker = circuit_breaker
+        self.stylesheet_store = stylesheet_store
+        self.script_store = script_store
+        self.image_probe = image_probe or ImageProbe(concurrency_limiter, circuit_breaker)
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.results = {}
+    
+    def clear(self):
+        """Forget the waterfalls of previous runs"""
+        with self.lock:
+            self.results = {}
+    
+    def _fetch(self, url, resource_type, render_blocking, started):
+        """Fetch one resource and describe its transfer"""
+        start = time.perf_counter()
+        record = {
+            'url': url,
+            'type': resource_type,
+            'render_blocking': render_blocking,
+            'start_ms': round((start - started) * 1000, 1)
+        }
+        if resource_type == 'image':
+            return self._probe_image(record, start), ''
+        try:
+            response = stream_get(url, timeout=SUBRESOURCE_SETTINGS['timeout'],
+                                  max_bytes=SUBRESOURCE_SETTINGS['max_resource_bytes'],
+                                  circuit_breaker=self.circuit_breaker, verify=False)
+        except Exception as e:
+            record.update({'status_code': None, 'error': str(e).split('\n')[0][:100], 'transfer_bytes': 0,
+                           'decoded_bytes': 0, 'duration_ms': round((time.perf_counter() - start) * 1000, 1)})
+            return record, ''
+        
+        compression = compression_info(response)
+        record.update(compression)
+        record.update({
+            'status_code': response.status_code,
+            'transfer_bytes': compression['wire_bytes'],
+            'cache_control': response.headers.get('Cache-Control', ''),
+            'etag': bool(response.headers.get('ETag')),
+            'truncated': getattr(response, 'truncated', False),
+            'body_skipped': getattr(response, 'body_skipped', False),
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1)
+        })
+        record.update(response.timings)
+        
+        # A store waits for a fetch of the same URL in progress instead of repeating it
+        if response.ok and not record['truncated']:
+            if resource_type == 'stylesheet' and self.stylesheet_store:
+                self.stylesheet_store.get_stylesheet(url, response)
+            elif resource_type == 'script' and self.script_store:
+                self.script_store.get_script(url, response)
+        
+        css_text = response.text if resource_type == 'stylesheet' and response.ok else ''
+        return record, css_text
+    
+    def _probe_image(self, record, start):
+        """Describe an image from its probe: size from Content-Range, timings of the ranged GET"""
+        probe = self.image_probe.probe(record['url'])
+        transfer = self.image_probe.get_transfer(record['url'])
+        size = probe['bytes'] or 0
+        record.update({
+            'status_code': probe['status_code'],
+            'content_encoding': 'identity',
+            'wire_bytes': size,
+            'decoded_bytes': size,
+            'compression_ratio': 1.0,
+            'compressible': False,
+            'estimated_savings_bytes': 0,
+            'best_encoding': '',
+            'transfer_bytes': size,
+            'cache_control': transfer['cache_control'] if transfer else '',
+            'etag': transfer['etag'] if transfer else False,
+            'truncated': False,
+            'body_skipped': True,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1)
+        })
+        if probe.get('error'):
+            record['error'] = probe['error']
+        if transfer:
+            record.update(transfer['timings'])
+        return record
+    
+    def _run_fetches(self, fetch, urls):
+        """Yield (url, future) of resource fetches as they complete"""
+        if self.concurrency_limiter:
+            # Failed fetches say nothing about the origin's latency
+            classify = lambda result: (result[0]['status_code'], False) if result[0]['status_code'] else None
+            yield from self.concurrency_limiter.map_as_completed(fetch, urls, classify)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_url = {executor.submit(fetch, url): url for url in urls}
+            for future in as_completed(future_to_url):
+                yield future_to_url[future], future
+    
+    def _load_wave(self, resources, started):
+        """Fetch a group of resources concurrently; returns records and stylesheet texts"""
+        def fetch(url):
+            return self._fetch(url, resources[url][0], resources[url][1], started)
+        
+        records = []
+        stylesheets = {}
+        for url, future in self._run_fetches(fetch, list(resources)):
+            record, css_text = future.result()
+            records.append(record)
+            if css_text:
+                stylesheets[url] = css_text
+        return records, stylesheets
+    
+    def load(self, page_url, soup, page_bytes=0):
+        """Load the sub-resources of a page and return its waterfall and weight.
+        
+        page_bytes is the wire size of the HTML, so the weight counts every
+        resource as transferred.
+        """
+        resources = find_subresources(soup, page_url)
+        resources = dict(list(resources.items())[:SUBRESOURCE_SETTINGS['max_resources']])
+        started = time.perf_counter()
+        
+        records, stylesheets = self._load_wave(resources, started)
+        
+        fonts = {}
+        for stylesheet_url, css_text in stylesheets.items():
+            for font_url in find_font_urls(css_text, stylesheet_url):
+                if font_url not in resources and font_url not in fonts:
+                    fonts[font_url] = ('font', False)
+        room = SUBRESOURCE_SETTINGS['max_resources'] - len(resources)
+        if fonts and room > 0:
+            font_records, _ = self._load_wave(dict(list(fonts.items())[:room]), started)
+            records.extend(font_records)
+        
+        records.sort(key=lambda record: record['start_ms'])
+        bytes_by_type = {}
+        for record in records:
+            bytes_by_type[record['type']] = bytes_by_type.get(record['type'], 0) + record['transfer_bytes']
+        
+        result = {
+            'url': page_url,
+            'resources': records,
+            'resource_count': len(records),
+            'failed_resources': sum(1 for record in records if not record['status_code'] or record['status_code'] >= 400),
+            'page_weight_bytes': page_bytes + sum(bytes_by_type.values()),
+            'bytes_by_type': bytes_by_type,
+            'render_blocking_bytes': sum(record['transfer_bytes'] for record in records if record['render_blocking']),
+            'render_blocking_count': sum(1 for record in records if record['render_blocking']),
+            'load_time_ms': max((record['start_ms'] + record['duration_ms'] for record in records), default=0)
+        }
+        with self.lock:
+            self.results[page_url] = result
+        return result
+    
+    def get_waterfalls(self):
+        """Get every loaded resource of every page, in request order per page"""
+        with self.lock:
+            return [dict(resource, page_url=page_url)
+                    for page_url, result in self.results.items()
+                    for resource in result['resources']]
@@ -2,27 +2,31 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+from modules.page_fetcher import fetch_page
+from modules.stylesheet_store import get_page_css
 
 class ResponsivenessChecker:
     """Check website responsiveness"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None, stylesheet_store=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
+        self.stylesheet_store = stylesheet_store
     
     def check_responsiveness(self, url):
         """Check responsiveness of a web page"""
         test_cases = []
         
         try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher)
+            css = get_page_css(soup, url, self.stylesheet_store)
             
             # 1. Viewport Meta Tag Check
             viewport_test_cases = self._check_viewport(soup, url)
             test_cases.extend(viewport_test_cases)
             
             # 2. Responsive Design Elements Check
-            responsive_test_cases = self._check_responsive_elements(soup, url)
+            responsive_test_cases = self._check_responsive_elements(soup, url, css)
             test_cases.extend(responsive_test_cases)
             
             # 3. Mobile-First Design Check
@@ -38,7 +42,7 @@ class ResponsivenessChecker:
             test_cases.extend(touch_test_cases)
             
             # 6. Responsive Typography Check
-            typography_test_cases = self._check_responsive_typography(soup, url)
+            typography_test_cases = self._check_responsive_typography(css, url)
             test_cases.extend(typography_test_cases)
             
             return test_cases
@@ -113,7 +117,7 @@ class ResponsivenessChecker:
         
         return test_cases
     
-    def _check_responsive_elements(self, soup, url):
+    def _check_responsive_elements(self, soup, url, css):
         """Check for responsive design elements"""
         test_cases = []
         
@@ -138,38 +142,33 @@ class ResponsivenessChecker:
                 severity="Medium"
             ))
         
-        # Check for media queries in inline styles
-        style_content = ''
-        for style in soup.find_all('style'):
-            if style.string:
-                style_content += style.string
-        
-        media_query_count = style_content.count('@media')
-        if media_query_count > 0:
+        # Check for media queries in linked and inline stylesheets
+        media_queries = css.media_queries
+        if media_queries:
+            breakpoints = sorted({int(pixels) for _, pixels in css.breakpoints})
+            breakpoint_text = f"; width breakpoints: {', '.join(f'{pixels}px' for pixels in breakpoints[:12])}" if breakpoints else ""
             test_cases.append(self._create_responsive_test_case(
                 url=url,
                 module="CSS Media Queries",
                 description="Check for responsive media queries",
                 test_steps="1. Search for @media rules\n2. Count media queries\n3. Check breakpoints",
                 expected_result="Page should use media queries for responsiveness",
-                actual_result=f"Found {media_query_count} media queries",
+                actual_result=f"Found {len(media_queries)} media queries in {len(css.indexes)} stylesheets{breakpoint_text}",
                 status="Pass",
                 severity="Medium"
             ))
         else:
-            # Check if there are external stylesheets that might contain media queries
-            external_css = len(soup.find_all('link', rel='stylesheet'))
-            if external_css > 0:
-                test_cases.append(self._create_responsive_test_case(
-                    url=url,
-                    module="CSS Media Queries",
-                    description="Check for responsive media queries",
-                    test_steps="1. Search for @media rules\n2. Check inline styles\n3. Note external CSS",
-                    expected_result="Page should use media queries for responsiveness",
-                    actual_result="No inline media queries found (check external CSS)",
-                    status="Info",
-                    severity="Medium"
-                ))
+            test_cases.append(self._create_responsive_test_case(
+                url=url,
+                module="CSS Media Queries",
+                description="Check for responsive media queries",
+                test_steps="1. Search for @media rules\n2. Check linked and inline stylesheets",
+                expected_result="Page should use media queries for responsiveness",
+                actual_result=f"No media queries found in {len(css.stylesheet_urls)} linked stylesheets or inline styles",
+                status="Warning",
+                severity="Medium",
+                resolutions="Add @media breakpoints so the layout adapts to small screens"
+            ))
         
         return test_cases
     
@@ -306,21 +305,17 @@ class ResponsivenessChecker:
         
         return test_cases
     
-    def _check_responsive_typography(self, soup, url):
+    def _check_responsive_typography(self, css, url):
         """Check responsive typography"""
         test_cases = []
         
-        # Look for relative font units in styles
-        style_content = ''
-        for style in soup.find_all('style'):
-            if style.string:
-                style_content += style.string
-        
-        relative_units = ['em', 'rem', '%', 'vw', 'vh']
-        absolute_units = ['px', 'pt', 'cm', 'mm', 'in']
+        # Look for relative font units in font-size declarations
+        relative_units = ('em', 'rem', '%', 'vw', 'vh')
+        absolute_units = ('px', 'pt', 'cm', 'mm', 'in')
         
-        relative_count = sum(style_content.count(unit) for unit in relative_units)
-        absolute_count = sum(style_content.count(unit) for unit in absolute_units)
+        font_sizes = [value.lower() for value in css.values('font-size')]
+        relative_count = sum(1 for size in font_sizes if size.endswith(relative_units) or 'clamp(' in size)
+        absolute_count = sum(1 for size in font_sizes if size.endswith(absolute_units) and not size.endswith('em'))
         
         if relative_count > 0:
             test_cases.append(self._create_responsive_test_case(
@@ -0,0 +1,368 @@
+# modules/script_index.py - Run-wide script cache and single-pass script index
+import hashlib
+import re
+import threading
+from urllib.parse import urljoin, urlparse
+from modules.page_fetcher import stream_get
+from modules.constants import JS_LIBRARY_SIGNATURES
+
+# Every fact the button and compatibility checks need, as one alternation
+# scanned once per script. Branches are anchored on literal call names and
+# quantifiers are bounded, so no input can make a branch backtrack badly; the
+# leading lookahead skips characters no branch can start with.
+SCRIPT_PATTERN = re.compile(r'''
+    (?=[gqj$a.ndMTECFSOlc=?`])
+    (?:
+      (?<![\w$])(?P<call>getElementById|getElementsByClassName|querySelectorAll|querySelector|jQuery|\$)\s*\(\s*
+      (?P<quote>['"])(?P<selector>[^'"\n]{1,200})(?P=quote)\s*\)
+      (?:\s*\[\s*0\s*\])?
+      (?P<binding>\s*\.\s*(?:addEventListener\s*\(\s*['"](?P<bound_event>[\w:-]{1,40})|on[a-z]{0,30}\b|click\b|bind\b|delegate\b|live\b))?
+    | \.\s*(?:addEventListener\s*\(\s*['"](?P<event>[\w:-]{1,40})|(?P<handler>on[a-z]{1,30})\s*=(?!=)|(?P<method>on|click|bind)\s*\()
+    | (?<![\w$.])addEventListener\s*\(\s*['"](?P<bare_event>[\w:-]{1,40})
+    | (?P<ua>navigator\s*\.\s*(?:userAgent|appVersion|vendor)|document\s*\.\s*documentMode
+        |\b(?:MSIE|Trident|Edge|Chrome|Firefox|Safari|Opera)\b)
+    | (?<![\w$.])(?P<keyword>let|const|class|async|await)(?=\s)
+    | (?P<operator>=>|\?\.(?!\d)|\?\?|`)
+    )
+''', re.VERBOSE)
+
+# Variable an element lookup is assigned to, matched against the text just before the call
+RECEIVER_PATTERN = re.compile(r'(?<![\w$])([A-Za-z_$][\w$]*)\s*$')
+ASSIGNMENT_PATTERN = re.compile(r'(?<![\w$.])([A-Za-z_$][\w$]*)\s*=\s*(?:document\s*\.\s*)?$')
+ID_PATTERN = re.compile(r'#([\w-]+)')
+CLASS_PATTERN = re.compile(r'\.([\w-]+)')
+# Report names of ES2015+ syntax tokens
+FEATURE_NAMES = {
+    'let': 'let', 'const': 'const', 'class': 'class', 'async': 'async', 'await': 'await',
+    '=>': '=>', '?.': 'optional chaining', '??': 'nullish coalescing', '`': 'template literals'
+}
+# Language edition that introduced each syntax token
+FEATURE_LEVELS = {
+    'let': 2015, 'const': 2015, 'class': 2015, '=>': 2015, 'template literals': 2015,
+    'async': 2017, 'await': 2017, 'optional chaining': 2020, 'nullish coalescing': 2020
+}
+LIBRARY_PATTERNS = [(name, re.compile(pattern)) for name, patterns in JS_LIBRARY_SIGNATURES.items()
+                    for pattern in patterns]
+# Leading bytes of a bundle searched for library banners
+BANNER_BYTES = 8 * 1024
+
+def fingerprint_library(script_text):
+    """(library, version) named in the banner of a bundle, or ('', '')"""
+    head = script_text[:BANNER_BYTES]
+    for name, pattern in LIBRARY_PATTERNS:
+        match = pattern.search(head)
+        if match:
+            return name, match.group(1) if pattern.groups else ''
+    return '', ''
+
+def is_minified(script_text, url=''):
+    """Minified bundles have long lines and little whitespace"""
+    if '.min.' in url.rsplit('/', 1)[-1]:
+        return True
+    if len(script_text) < 1024:
+        return False
+    lines = script_text.count('\n') + 1
+    whitespace = script_text.count(' ') + script_text.count('\t') + lines
+    return len(script_text) / lines > 200 or whitespace / len(script_text) < 0.08
+
+class ScriptIndex:
+    """Element references, listeners, ES features and UA sniffing found in one script"""
+    
+    def __init__(self, source=''):
+        self.source = source
+        self.id_references = {}
+        self.class_references = {}
+        self.events = set()
+        self.features = set()
+        self.ua_tokens = set()
+        self.size = 0
+        # External bundles only: content hash, every URL it was served under,
+        # transfer bytes, minification and library fingerprint
+        self.content_hash = ''
+        self.urls = []
+        self.wire_bytes = 0
+        self.minified = False
+        self.library = ''
+        self.library_version = ''
+    
+    @property
+    def es_level(self):
+        """Newest language edition whose syntax the script uses"""
+        level = max((FEATURE_LEVELS[feature] for feature in self.features), default=None)
+        return f"ES{level}" if level else 'ES5'
+    
+    def add_reference(self, selector, call, bound):
+        """Record the ids and classes of a selector; bound when a listener is attached to it"""
+        if call == 'getElementById':
+            ids, classes = [selector.strip()], []
+        elif call == 'getElementsByClassName':
+            ids, classes = [], selector.split()
+        else:
+            ids, classes = ID_PATTERN.findall(selector), CLASS_PATTERN.findall(selector)
+        for element_id in ids:
+            self.id_references[element_id] = self.id_references.get(element_id, False) or bound
+        for class_name in classes:
+            self.class_references[class_name] = self.class_references.get(class_name, False) or bound
+
+def scan_script(script_text, source=''):
+    """Index a script in one pass of SCRIPT_PATTERN.
+    
+    Elements looked up into a variable count as bound when a listener is
+    later attached through that variable.
+    """
+    index = ScriptIndex(source)
+    index.size = len(script_text)
+    variables = {}
+    for match in SCRIPT_PATTERN.finditer(script_text):
+        if match.group('call'):
+            selector, call = match.group('selector'), match.group('call')
+            bound = match.group('binding') is not None
+            index.add_reference(selector, call, bound)
+            if match.group('bound_event'):
+                index.events.add(match.group('bound_event').lower())
+            if not bound:
+                assignment = ASSIGNMENT_PATTERN.search(script_text, max(0, match.start() - 80), match.start())
+                if assignment:
+                    variables[assignment.group(1)] = (selector, call)
+        elif match.group('bare_event'):
+            index.events.add(match.group('bare_event').lower())
+        elif match.group(0).startswith('.'):
+            # Listener attached to a variable holding an element lookup
+            receiver = RECEIVER_PATTERN.search(script_text, max(0, match.start() - 80), match.start())
+            lookup = variables.get(receiver.group(1)) if receiver else None
+            event = match.group('event') or (match.group('handler') or '')[2:]
+            if event:
+                index.events.add(event.lower())
+            if lookup:
+                index.add_reference(lookup[0], lookup[1], True)
+        elif match.group('ua'):
+            index.ua_tokens.add(re.sub(r'\s+', '', match.group('ua')))
+        else:
+            index.features.add(FEATURE_NAMES[match.group('keyword') or match.group('operator')])
+    return index
+
+class PageScripts:
+    """All scripts of one page merged for constant-time element lookups"""
+    
+    def __init__(self, indexes, script_urls, bundles=None):
+        self.indexes = indexes
+        self.script_urls = script_urls
+        # Content hash -> (bundle index, URLs this page loads it from)
+        self.bundles = bundles or {}
+        self.id_references = {}
+        self.class_references = {}
+        self.events = set()
+        self.features = set()
+        self.ua_tokens = set()
+        for index in indexes:
+            for element_id, bound in index.id_references.items():
+                self.id_references[element_id] = self.id_references.get(element_id, False) or bound
+            for class_name, bound in index.class_references.items():
+                self.class_references[class_name] = self.class_references.get(class_name, False) or bound
+            self.events.update(index.events)
+            self.features.update(index.features)
+            self.ua_tokens.update(index.ua_tokens)
+    
+    def listeners_for(self, element):
+        """Descriptions of the script bindings and references of an element"""
+        found = []
+        element_id = element.get('id', '')
+        if element_id in self.id_references:
+            found.append("click event listener (by ID)" if self.id_references[element_id]
+                         else "referenced by ID in script")
+        for class_name in element.get('class', []):
+            if self.class_references.get(class_name):
+                found.append(f"event listener (by class .{class_name})")
+        return found
+    
+    def duplicate_bundles(self):
+        """Bundles this page loads more than once under different URLs"""
+        return [(index, urls) for index, urls in self.bundles.values() if len(urls) > 1]
+    
+    @property
+    def sniffs_user_agent(self):
+        """Browser names only count as sniffing when the user agent is actually read"""
+        return any(token.startswith(('navigator.', 'document.')) for token in self.ua_tokens)
+    
+    @property
+    def size(self):
+        return sum(index.size for index in self.indexes)
+
+class ScriptStore:
+    """Fetch and index each distinct script once per run and share it between analyzers.
+    
+    External scripts are fetched once per URL and analyzed once per content
+    hash, so the same library behind several cache-busting query strings is
+    a single bundle. Inline scripts are indexed once per distinct content.
+    """
+    
+    def __init__(self, circuit_breaker=None, timeout=10):
+        self.circuit_breaker = circuit_breaker
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.scripts = {}
+        self.bundles = {}
+        self.page_bundles = {}
+        self.inline_scripts = {}
+        self.pending = {}
+        self.fetch_errors = {}
+    
+    def clear(self):
+        """Forget all fetched and indexed scripts"""
+        with self.lock:
+            self.scripts = {}
+            self.bundles = {}
+            self.page_bundles = {}
+            self.inline_scripts = {}
+            self.pending = {}
+            self.fetch_errors = {}
+    
+    def _get_bundle(self, url, response):
+        """Bundle index for a fetched script, analyzing each distinct content once"""
+        content_hash = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        with self.lock:
+            index = self.bundles.get(content_hash)
+            if index is not None:
+                index.urls.append(url)
+                return index
+        
+        script_text = response.text
+        index = scan_script(script_text, url)
+        index.size = len(response.content)
+        index.content_hash = content_hash
+        index.urls = [url]
+        index.wire_bytes = getattr(response, 'wire_bytes', len(response.content))
+        index.minified = is_minified(script_text, url)
+        index.library, index.library_version = fingerprint_library(script_text)
+        with self.lock:
+            # Another thread may have analyzed the same content meanwhile
+            existing = self.bundles.setdefault(content_hash, index)
+            if existing is not index:
+                existing.urls.append(url)
+        return existing
+    
+    def get_script(self, url, response=None):
+        """Get the index of an external script, fetching it only once.
+        
+        A complete response fetched elsewhere (the sub-resource loader) is
+        indexed instead of requesting the script again.
+        """
+        with self.lock:
+            index = self.scripts.get(url)
+            if index is not None or url in self.fetch_errors:
+                return index
+            event = self.pending.get(url)
+            owner = event is None
+            if owner:
+                event = self.pending[url] = threading.Event()
+        
+        if not owner:
+            # Another analyzer thread is already fetching this script
+            event.wait()
+            return self.scripts.get(url)
+        
+        index = None
+        try:
+            if response is None:
+                response = stream_get(url, timeout=self.timeout, circuit_breaker=self.circuit_breaker, verify=False)
+            if response.ok:
+                index = self._get_bundle(url, response)
+            else:
+                self.fetch_errors[url] = f"HTTP {response.status_code}"
+        except Exception as e:
+            self.fetch_errors[url] = str(e).split('\n')[0][:100]
+        finally:
+            with self.lock:
+                if index is not None:
+                    self.scripts[url] = index
+                self.pending.pop(url, None)
+            event.set()
+        return index
+    
+    def get_inline(self, script_text, source='<script>'):
+        """Get the index of an inline script, scanning each distinct script once"""
+        key = hashlib.blake2b(script_text.encode('utf-8', 'replace'), digest_size=16).digest()
+        with self.lock:
+            index = self.inline_scripts.get(key)
+        if index is None:
+            index = scan_script(script_text, source)
+            with self.lock:
+                self.inline_scripts[key] = index
+        return index
+    
+    def get_page_scripts(self, soup, page_url):
+        """Collect the script indexes of a page from the shared store"""
+        indexes = []
+        script_urls = []
+        bundles = {}
+        for script in soup.find_all('script'):
+            script_type = script.get('type', '').lower()
+            if script_type and 'javascript' not in script_type and script_type != 'module':
+                continue
+            if script.get('src'):
+                url = urljoin(page_url, script['src'].strip())
+                if urlparse(url).scheme not in ['http', 'https'] or url in script_urls:
+                    continue
+                script_urls.append(url)
+                index = self.get_script(url)
+                if index is None:
+                    continue
+                if index.content_hash in bundles:
+                    bundles[index.content_hash][1].append(url)
+                else:
+                    bundles[index.content_hash] = (index, [url])
+                    indexes.append(index)
+            elif script.string and script.string.strip():
+                indexes.append(self.get_inline(script.string))
+        
+        # Inline event handler attributes are scripts too
+        handlers = ';'.join(value for element in soup.find_all(True)
+                            for name, value in element.attrs.items()
+                            if name.startswith('on') and isinstance(value, str))
+        if handlers:
+            indexes.append(scan_script(handlers, 'event handler attributes'))
+        
+        with self.lock:
+            self.page_bundles[page_url] = {content_hash: urls for content_hash, (_, urls) in bundles.items()}
+        return PageScripts(indexes, script_urls, bundles)
+    
+    def get_statistics(self):
+        """Get the number of distinct scripts fetched and indexed"""
+        with self.lock:
+            return {
+                'scripts': len(self.scripts),
+                'bundles': len(self.bundles),
+                'script_bytes': sum(index.size for index in self.bundles.values()),
+                'inline_scripts': len(self.inline_scripts),
+                'failed_scripts': len(self.fetch_errors)
+            }
+    
+    def get_bundles(self):
+        """Get every external bundle of every page, one row per page and bundle"""
+        with self.lock:
+            page_bundles = [(page_url, dict(bundles)) for page_url, bundles in self.page_bundles.items()]
+            bundles = dict(self.bundles)
+        
+        rows = []
+        for page_url, page in page_bundles:
+            for content_hash, urls in page.items():
+                bundle = bundles[content_hash]
+                rows.append({
+                    'page_url': page_url,
+                    'url': urls[0],
+                    'page_urls': len(urls),
+                    'served_urls': len(bundle.urls),
+                    'content_hash': content_hash,
+                    'bytes': bundle.size,
+                    'wire_bytes': bundle.wire_bytes,
+                    'minified': bundle.minified,
+                    'library': bundle.library,
+                    'library_version': bundle.library_version,
+                    'es_level': bundle.es_level,
+                    'features': ', '.join(sorted(bundle.features))
+                })
+        return rows
+
+def get_page_scripts(soup, page_url, script_store=None):
+    """Page scripts through the shared store when one is configured"""
+    return (script_store or ScriptStore()).get_page_scripts(soup, page_url)
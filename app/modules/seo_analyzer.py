@@ -4,20 +4,24 @@ from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse
 import math
+from modules.page_fetcher import fetch_page
+from modules.content_index import extract_content_text
 
 class SEOAnalyzer:
     """Analyze SEO aspects of a website"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None, content_index=None, metadata_index=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
+        self.content_index = content_index
+        self.metadata_index = metadata_index
     
     def analyze_seo(self, url):
         """Perform comprehensive SEO analysis"""
         test_cases = []
         
         try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher)
             
             # 1. Meta Tags Analysis
             meta_test_cases = self.analyze_meta_tags(soup, url)
@@ -85,6 +89,8 @@ class SEOAnalyzer:
         if meta_description:
             description = meta_description.get('content', '')
             desc_length = len(description)
+            if self.metadata_index is not None:
+                self.metadata_index.add('meta_description', url, description)
             
             if 150 <= desc_length <= 160:
                 test_cases.append(self._create_seo_test_case(
@@ -187,6 +193,8 @@ class SEOAnalyzer:
         if title_tag:
             title_text = title_tag.get_text(strip=True)
             title_length = len(title_text)
+            if self.metadata_index is not None:
+                self.metadata_index.add('title', url, title_text)
             
             if 50 <= title_length <= 60:
                 test_cases.append(self._create_seo_test_case(
@@ -256,6 +264,10 @@ class SEOAnalyzer:
         
         total_headings = sum(len(h) for h in headings.values())
         
+        if self.metadata_index is not None:
+            for h1_text in {h1.get_text(' ', strip=True) for h1 in headings['h1']}:
+                self.metadata_index.add('h1', url, h1_text)
+        
         if total_headings > 0:
             test_cases.append(self._create_seo_test_case(
                 url=url,
@@ -328,6 +340,10 @@ class SEOAnalyzer:
         all_text = soup.get_text()
         text_length = len(all_text)
         
+        # Index the main content for site-wide duplicate detection
+        if self.content_index is not None:
+            self.content_index.add_page(url, extract_content_text(soup))
+        
         if text_length < 300:
             test_cases.append(self._create_seo_test_case(
                 url=url,
@@ -402,6 +418,61 @@ class SEOAnalyzer:
         
         return test_cases
     
+    def analyze_duplicate_content(self):
+        """Report clusters of near-duplicate pages found by the content index"""
+        test_cases = []
+        if self.content_index is None:
+            return test_cases
+        
+        for cluster in self.content_index.get_duplicate_clusters():
+            urls = cluster['urls']
+            url_list = ', '.join(urls[:10])
+            if len(urls) > 10:
+                url_list += f" and {len(urls) - 10} more"
+            
+            test_cases.append(self._create_seo_test_case(
+                url=url_list,
+                module="Duplicate Content",
+                description="Check for near-duplicate page content across the site",
+                test_steps="1. Extract main content of each page\n2. Compare MinHash signatures of word shingles\n3. Group pages above the similarity threshold",
+                expected_result="Each page should have unique main content",
+                actual_result=f"{cluster['page_count']} pages share near-duplicate content "
+                              f"(similarity >= {cluster['min_similarity']:.0%})",
+                status="Warning",
+                severity="Medium",
+                resolutions="Consolidate duplicate pages or add a canonical link to the preferred URL"
+            ))
+        
+        return test_cases
+    
+    def analyze_duplicate_metadata(self):
+        """Report titles, meta descriptions and H1 headings shared by several pages"""
+        test_cases = []
+        if self.metadata_index is None:
+            return test_cases
+        
+        field_names = {'title': 'title', 'meta_description': 'meta description', 'h1': 'H1 heading'}
+        for duplicate in self.metadata_index.get_duplicates():
+            urls = duplicate['urls']
+            url_list = ', '.join(urls[:10])
+            if len(urls) > 10:
+                url_list += f" and {len(urls) - 10} more"
+            field_name = field_names[duplicate['field']]
+            
+            test_cases.append(self._create_seo_test_case(
+                url=url_list,
+                module=duplicate['module'],
+                description=f"Check that the page {field_name} is unique across the site",
+                test_steps=f"1. Normalize the {field_name} of each page\n2. Group pages by {field_name}\n3. Report values used by more than one page",
+                expected_result=f"Each page should have a unique {field_name}",
+                actual_result=f"{duplicate['page_count']} pages share the {field_name}: {duplicate['value']}",
+                status="Warning" if duplicate['field'] == 'h1' else "Fail",
+                severity="Low" if duplicate['field'] == 'h1' else "Medium",
+                resolutions=f"Write a distinct {field_name} for each page describing its own content"
+            ))
+        
+        return test_cases
+    
     def analyze_url_structure(self, url):
         """Analyze URL structure for SEO"""
         test_cases = []
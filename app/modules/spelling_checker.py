@@ -3,20 +3,21 @@ import requests
 from bs4 import BeautifulSoup
 from textblob import TextBlob
 import re
+from modules.page_fetcher import fetch_page
 
 class SpellingChecker:
     """Check spelling and grammar on web pages"""
     
-    def __init__(self, test_case_manager=None):
+    def __init__(self, test_case_manager=None, page_fetcher=None):
         self.test_case_manager = test_case_manager
+        self.page_fetcher = page_fetcher
     
     def check_spelling_on_page(self, url):
         """Check spelling on a web page"""
         test_cases = []
         
         try:
-            response = requests.get(url, timeout=10, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response, soup = fetch_page(url, self.page_fetcher, private_dom=True)
             
             # Remove script and style elements
             for script in soup(["script", "style", "nav", "header", "footer"]):
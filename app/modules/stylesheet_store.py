@@ -0,0 +1,260 @@
+# modules/stylesheet_store.py - Run-wide stylesheet cache and parsed CSS index
+import hashlib
+import threading
+from urllib.parse import urljoin, urlparse
+from modules.page_fetcher import stream_get
+from modules.css_tokenizer import tokenize, url_value, scan_stylesheet, media_breakpoints
+
+VENDOR_PREFIXES = ('-webkit-', '-moz-', '-ms-', '-o-')
+# Levels of nested @import followed from a stylesheet
+MAX_IMPORT_DEPTH = 3
+
+class CSSDeclaration:
+    """One property declaration with the selector and media condition it applies under"""
+    
+    __slots__ = ('property', 'value', 'selector', 'media', 'important', 'order')
+    
+    def __init__(self, property, value, selector, media, important, order=0):
+        self.property = property
+        self.value = value
+        self.selector = selector
+        self.media = media
+        self.important = important
+        # Position in the stylesheet, for source-order ties in the cascade
+        self.order = order
+
+class CSSIndex:
+    """Declarations of one stylesheet indexed by property, plus its at-rules"""
+    
+    def __init__(self, source=''):
+        self.source = source
+        self.declarations = {}
+        self.media_queries = []
+        self.font_faces = []
+        self.imports = []
+        self.breakpoints = set()
+        self.rule_count = 0
+        self.size = 0
+    
+    def add_declaration(self, declaration):
+        self.declarations.setdefault(declaration.property, []).append(declaration)
+
+def _import_target(prelude):
+    """Stylesheet referenced by an @import prelude: url(...) or a quoted string"""
+    for kind, text in tokenize(prelude):
+        if kind == 'url':
+            return url_value(text)
+        if kind == 'string':
+            return text.strip('"\'')
+    return None
+
+def parse_stylesheet(css_text, source=''):
+    """Index CSS text in one linear pass of the tokenizer.
+    
+    Declarations inside @media keep the media condition they apply under;
+    @keyframes steps are skipped and width breakpoints of every @media
+    prelude are collected in pixels.
+    """
+    index = CSSIndex(source)
+    index.size = len(css_text)
+    for order, (event, value) in enumerate(scan_stylesheet(css_text)):
+        if event == 'declaration':
+            index.add_declaration(CSSDeclaration(value[0], value[1], value[3], value[4], value[2], order))
+        elif event == 'rule':
+            index.rule_count += 1
+        elif event == 'at_rule':
+            name, prelude = value
+            if name == 'media':
+                index.media_queries.append(prelude)
+                index.breakpoints.update(media_breakpoints(prelude))
+        elif event == 'font_face':
+            index.font_faces.append(value)
+        elif event == 'at_statement' and value[0] == 'import':
+            target = _import_target(value[1])
+            if target:
+                index.imports.append(target)
+    return index
+
+class PageCSS:
+    """All CSS that applies to one page: linked stylesheets, then <style> blocks, then style attributes"""
+    
+    def __init__(self, indexes, stylesheet_urls):
+        self.indexes = indexes
+        self.stylesheet_urls = stylesheet_urls
+    
+    def declarations(self, *properties):
+        """All declarations of the given properties in cascade order"""
+        return [declaration for index in self.indexes for name in properties
+                for declaration in index.declarations.get(name, [])]
+    
+    def values(self, *properties):
+        """Values of the given properties"""
+        return [declaration.value for declaration in self.declarations(*properties)]
+    
+    def properties(self):
+        """Every declared property name"""
+        names = set()
+        for index in self.indexes:
+            names.update(index.declarations)
+        return names
+    
+    @property
+    def media_queries(self):
+        return [query for index in self.indexes for query in index.media_queries]
+    
+    @property
+    def breakpoints(self):
+        """Distinct (min|max, pixels) width breakpoints across all media queries"""
+        return sorted({breakpoint for index in self.indexes for breakpoint in index.breakpoints},
+                      key=lambda breakpoint: (breakpoint[1], breakpoint[0]))
+    
+    @property
+    def font_faces(self):
+        return [font_face for index in self.indexes for font_face in index.font_faces]
+    
+    def vendor_prefixes(self):
+        """Vendor prefixes used in property names and values"""
+        found = set()
+        for index in self.indexes:
+            for name, declarations in index.declarations.items():
+                if name.startswith(VENDOR_PREFIXES):
+                    found.add(name[:name.index('-', 1) + 1])
+                for declaration in declarations:
+                    for prefix in VENDOR_PREFIXES:
+                        if declaration.value.startswith(prefix):
+                            found.add(prefix)
+        return found
+    
+    @property
+    def size(self):
+        return sum(index.size for index in self.indexes)
+
+class StylesheetStore:
+    """Fetch and parse each distinct stylesheet once per run and share it between analyzers.
+    
+    Inline <style> blocks are parsed once per distinct content, so a block
+    repeated on every page of a template is parsed a single time.
+    """
+    
+    def __init__(self, circuit_breaker=None, timeout=10):
+        self.circuit_breaker = circuit_breaker
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.stylesheets = {}
+        self.inline_blocks = {}
+        self.pending = {}
+        self.fetch_errors = {}
+    
+    def clear(self):
+        """Forget all fetched and parsed stylesheets"""
+        with self.lock:
+            self.stylesheets = {}
+            self.inline_blocks = {}
+            self.pending = {}
+            self.fetch_errors = {}
+    
+    def get_stylesheet(self, url, response=None):
+        """Get the parsed index of an external stylesheet, fetching it only once.
+        
+        A complete response fetched elsewhere (the sub-resource loader) is
+        parsed instead of requesting the stylesheet again.
+        """
+        with self.lock:
+            index = self.stylesheets.get(url)
+            if index is not None or url in self.fetch_errors:
+                return index
+            event = self.pending.get(url)
+            owner = event is None
+            if owner:
+                event = self.pending[url] = threading.Event()
+        
+        if not owner:
+            # Another analyzer thread is already fetching this stylesheet
+            event.wait()
+            return self.stylesheets.get(url)
+        
+        index = None
+        try:
+            if response is None:
+                response = stream_get(url, timeout=self.timeout, circuit_breaker=self.circuit_breaker, verify=False)
+            if response.ok:
+                index = parse_stylesheet(response.text, url)
+            else:
+                self.fetch_errors[url] = f"HTTP {response.status_code}"
+        except Exception as e:
+            self.fetch_errors[url] = str(e).split('\n')[0][:100]
+        finally:
+            with self.lock:
+                if index is not None:
+                    self.stylesheets[url] = index
+                self.pending.pop(url, None)
+            event.set()
+        return index
+    
+    def get_inline(self, css_text, source='<style>'):
+        """Get the parsed index of an inline style block, parsing each distinct block once"""
+        key = hashlib.blake2b(css_text.encode('utf-8', 'replace'), digest_size=16).digest()
+        with self.lock:
+            index = self.inline_blocks.get(key)
+        if index is None:
+            index = parse_stylesheet(css_text, source)
+            with self.lock:
+                self.inline_blocks[key] = index
+        return index
+    
+    def _with_imports(self, index, base_url, depth=0, seen=None):
+        """An index preceded by the stylesheets it @imports"""
+        seen = seen if seen is not None else set()
+        indexes = []
+        if depth < MAX_IMPORT_DEPTH:
+            for reference in index.imports:
+                url = urljoin(base_url, reference)
+                if url in seen or urlparse(url).scheme not in ['http', 'https']:
+                    continue
+                seen.add(url)
+                imported = self.get_stylesheet(url)
+                if imported is not None:
+                    indexes.extend(self._with_imports(imported, url, depth + 1, seen))
+        indexes.append(index)
+        return indexes
+    
+    def get_page_css(self, soup, page_url):
+        """Collect the CSS of a page from the shared store"""
+        indexes = []
+        stylesheet_urls = []
+        for link in soup.find_all('link', href=True):
+            if 'stylesheet' not in [value.lower() for value in link.get('rel', [])]:
+                continue
+            url = urljoin(page_url, link['href'].strip())
+            if urlparse(url).scheme not in ['http', 'https'] or url in stylesheet_urls:
+                continue
+            stylesheet_urls.append(url)
+            index = self.get_stylesheet(url)
+            if index is not None:
+                indexes.extend(self._with_imports(index, url))
+        
+        for style in soup.find_all('style'):
+            css_text = style.string or style.get_text()
+            if css_text and css_text.strip():
+                indexes.extend(self._with_imports(self.get_inline(css_text), page_url))
+        
+        # Style attributes form one anonymous block per page
+        attribute_rules = ''.join(f"[style]{{{element['style']}}}" for element in soup.find_all(style=True))
+        if attribute_rules:
+            indexes.append(parse_stylesheet(attribute_rules, 'style attributes'))
+        
+        return PageCSS(indexes, stylesheet_urls)
+    
+    def get_statistics(self):
+        """Get the number of distinct stylesheets fetched and parsed"""
+        with self.lock:
+            return {
+                'stylesheets': len(self.stylesheets),
+                'stylesheet_bytes': sum(index.size for index in self.stylesheets.values()),
+                'inline_blocks': len(self.inline_blocks),
+                'failed_stylesheets': len(self.fetch_errors)
+            }
+
+def get_page_css(soup, page_url, stylesheet_store=None):
+    """Page CSS through the shared store when one is configured"""
+    return (stylesheet_store or StylesheetStore()).get_page_css(soup, page_url)
@@ -0,0 +1,127 @@
+# modules/template_sampler.py - Representative sampling of URL templates
+import random
+from modules.url_processor import URLProcessor
+
+# Confidence used when stating sampling coverage
+SAMPLING_CONFIDENCE = 0.95
+
+class TemplateSampler:
+    """Analyze K representative URLs per template and extrapolate issue counts"""
+    
+    def __init__(self, samples_per_template=3, seed=0):
+        self.samples_per_template = samples_per_template
+        self.seed = seed
+        self.enabled = False
+        self.clusters = {}
+        self.representatives = {}
+        self.url_templates = {}
+        self.observed_issues = {}
+    
+    def configure(self, enabled=False, samples_per_template=None):
+        """Enable or disable sampling for the next run"""
+        self.enabled = enabled
+        if samples_per_template:
+            self.samples_per_template = max(1, int(samples_per_template))
+    
+    def clear(self):
+        """Clear clusters and recorded results"""
+        self.clusters = {}
+        self.representatives = {}
+        self.url_templates = {}
+        self.observed_issues = {}
+    
+    def select_representatives(self, url_list):
+        """Cluster URLs by template and return K representatives per template"""
+        self.clear()
+        self.clusters = URLProcessor.cluster_urls_by_template(url_list)
+        rng = random.Random(self.seed)
+        
+        selected = []
+        for template, urls in self.clusters.items():
+            if len(urls) <= self.samples_per_template:
+                sample = list(urls)
+            else:
+                sample = rng.sample(urls, self.samples_per_template)
+            
+            self.representatives[template] = sample
+            for url in sample:
+                self.url_templates[url] = template
+            selected.extend(sample)
+        
+        return selected
+    
+    def record_results(self, url, test_cases):
+        """Record failing and warning test cases of an analyzed representative"""
+        template = self.url_templates.get(url)
+        if template is None:
+            return
+        
+        issues = self.observed_issues.setdefault(template, {})
+        for test_case in test_cases:
+            if not isinstance(test_case, dict):
+                continue
+            if test_case.get('Status', '').lower() not in ['fail', 'warning']:
+                continue
+            key = (test_case.get('Test Type', 'Unknown'), test_case.get('Module', 'Unknown'))
+            issues.setdefault(key, set()).add(url)
+    
+    @staticmethod
+    def detection_threshold(sampled, population):
+        """Smallest share of affected pages that the sample detects with SAMPLING_CONFIDENCE.
+        
+        If no sampled page shows an issue, the fraction of affected pages in the
+        template is below 1 - (1 - confidence) ** (1 / sampled) at the stated confidence.
+        """
+        if sampled <= 0:
+            return 1.0
+        if sampled >= population:
+            return 0.0
+        return 1 - (1 - SAMPLING_CONFIDENCE) ** (1 / sampled)
+    
+    def get_sampling_summary(self):
+        """Get per-template coverage and extrapolated issue counts"""
+        templates = []
+        total_estimated_issues = 0
+        
+        for template, urls in self.clusters.items():
+            population = len(urls)
+            sample = self.representatives.get(template, [])
+            sampled = len(sample)
+            scale = population / sampled if sampled else 0
+            
+            issues = []
+            for (test_type, module), affected_urls in self.observed_issues.get(template, {}).items():
+                estimated_pages = round(len(affected_urls) * scale)
+                total_estimated_issues += estimated_pages
+                issues.append({
+                    'test_type': test_type,
+                    'module': module,
+                    'sampled_pages_affected': len(affected_urls),
+                    'estimated_pages_affected': estimated_pages
+                })
+            
+            threshold = self.detection_threshold(sampled, population)
+            if threshold == 0:
+                coverage = f"All {population} pages analyzed"
+            else:
+                coverage = (f"{sampled}/{population} pages analyzed; issues affecting at least "
+                            f"{threshold * 100:.0f}% of pages are detected with "
+                            f"{SAMPLING_CONFIDENCE * 100:.0f}% confidence")
+            
+            templates.append({
+                'template': template,
+                'total_urls': population,
+                'sampled_urls': sample,
+                'coverage': coverage,
+                'issues': sorted(issues, key=lambda issue: issue['estimated_pages_affected'], reverse=True)
+            })
+        
+        return {
+            'enabled': self.enabled,
+            'samples_per_template': self.samples_per_template,
+            'total_templates': len(self.clusters),
+            'total_urls': sum(len(urls) for urls in self.clusters.values()),
+            'sampled_urls': len(self.url_templates),
+            'estimated_issue_pages': total_estimated_issues,
+            'templates': sorted(templates, key=lambda t: t['total_urls'], reverse=True)
+        }
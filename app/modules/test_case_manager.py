@@ -2,6 +2,9 @@
 from datetime import datetime
 from config import TEST_CASE_COLUMNS
 
+# Referring pages named in the comments of a broken-link test case
+MAX_LISTED_REFERRERS = 10
+
 class TestCaseManager:
     """Manage test case creation and storage"""
     
@@ -49,8 +52,16 @@ class TestCaseManager:
         test_status = kwargs.get('test_status', 'Fail')
         severity = kwargs.get('severity', 'Medium')
         final_url = kwargs.get('final_url', '')
+        referrers = kwargs.get('referrers', [])
+        cached_at = kwargs.get('cached_at')
+        
+        comments = f"Final URL: {final_url}" if final_url else ""
+        if cached_at:
+            comments = f"{comments} | Cached result from {cached_at}" if comments else f"Cached result from {cached_at}"
+        if referrers:
+            comments = f"{comments} | {self.format_referrers(referrers)}" if comments else self.format_referrers(referrers)
         
-        return self.create_test_case(
+        test_case = self.create_test_case(
             test_type="Link Status Check",
             module="URL Validation",
             test_data=url,
@@ -61,17 +72,29 @@ class TestCaseManager:
             actual_result=f"Status: {status_code} {status_text}, Response Time: {response_time}ms, Category: {status_category}",
             status=test_status,
             severity=severity,
-            comments=f"Final URL: {final_url}" if final_url else "",
+            comments=comments,
             resolutions="Check URL correctness, server configuration, or network connectivity" if test_status == "Fail" else ""
         )
+        if referrers:
+            test_case['Referring Pages'] = [referrer['url'] for referrer in referrers]
+        return test_case
     
     def create_error_test_case(self, **kwargs):
         """Create test case for errors"""
         url = kwargs.get('url', '')
         error_msg = kwargs.get('error_msg', '')
         test_type = kwargs.get('test_type', 'Unknown')
+        referrers = kwargs.get('referrers', [])
+        
+        cached_at = kwargs.get('cached_at')
         
-        return self.create_test_case(
+        comments = "Connection error or timeout"
+        if cached_at:
+            comments = f"{comments} | Cached result from {cached_at}"
+        if referrers:
+            comments = f"{comments} | {self.format_referrers(referrers)}"
+        
+        test_case = self.create_test_case(
             test_type=test_type,
             module="Error Testing",
             test_data=url,
@@ -82,9 +105,43 @@ class TestCaseManager:
             actual_result=f"Request failed with error: {error_msg}",
             status="Fail",
             severity="Critical",
-            comments="Connection error or timeout",
+            comments=comments,
             resolutions="1. Check network connectivity\n2. Verify URL is correct\n3. Check if server is reachable"
         )
+        if referrers:
+            test_case['Referring Pages'] = [referrer['url'] for referrer in referrers]
+        return test_case
+    
+    @staticmethod
+    def format_referrers(referrers):
+        """Describe the pages that link to a URL"""
+        listed = []
+        for referrer in referrers[:MAX_LISTED_REFERRERS]:
+            source = f"<{referrer['element']}>"
+            if referrer.get('anchor_text'):
+                source += f" '{referrer['anchor_text']}'"
+            listed.append(f"{referrer['url']} ({source})")
+        
+        text = f"Linked from {len(referrers)} location(s): " + '; '.join(listed)
+        if len(referrers) > MAX_LISTED_REFERRERS:
+            text += f"; and {len(referrers) - MAX_LISTED_REFERRERS} more"
+        return text
+    
+    def copy_test_case(self, test_case, **overrides):
+        """Copy an existing test case under a new test ID"""
+        test_id = f"TC{self.test_case_counter:04d}"
+        self.test_case_counter += 1
+        
+        copied = dict(test_case)
+        copied['Test ID'] = test_id
+        copied['Timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if 'test_data' in overrides:
+            copied['Test Links/Data'] = str(overrides['test_data'])[:500]
+        if 'comments' in overrides:
+            copied['Comments/Bug ID'] = overrides['comments']
+        
+        self.test_cases.append(copied)
+        return copied
     
     def get_all_test_cases(self):
         """Get all test cases"""
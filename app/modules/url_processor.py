@@ -1,9 +1,17 @@
 # modules/url_processor.py - URL processing utilities
 import re
-from urllib.parse import urlparse, urljoin, urldefrag
+from urllib.parse import urlparse, urljoin, urldefrag, parse_qsl
 import requests
 from bs4 import BeautifulSoup
 import time
+from modules.page_fetcher import stream_get
+
+# Path segment patterns collapsed when building URL templates
+NUMERIC_SEGMENT = re.compile(r'^\d+$')
+HASH_SEGMENT = re.compile(r'^(?=.*\d)[0-9a-f]{8,}$|^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+SLUG_SEGMENT = re.compile(r'^[\w]+(?:[-_][\w]+)+$|^(?=.*[a-z])(?=.*\d)[a-z0-9]+$', re.IGNORECASE)
+# Extensions of URLs serving HTML pages; URLs without an extension are pages too
+PAGE_EXTENSIONS = ('.html', '.htm', '.php', '.asp', '.aspx', '.jsp')
 
 class URLProcessor:
     """Handle URL processing and extraction"""
@@ -69,13 +77,22 @@ class URLProcessor:
         return unique_urls
     
     @staticmethod
-    def scrape_all_links(base_url, max_depth=2, max_links=1000):
-        """Recursively scrape links from website with duplicate checking."""
+    def scrape_all_links(base_url, max_depth=2, max_links=1000, link_graph=None):
+        """Recursively scrape links from website with duplicate checking.
+        
+        When a LinkGraph is given, the anchor links of every crawled page are
+        recorded as edges so click depth and link equity can be computed, and
+        every link element is recorded so broken links can name their referrers.
+        """
         from modules.url_processor import URLProcessor
         
         visited = set()
         to_visit = [(base_url, 0)]
         all_links = set()
+        base_domain = urlparse(base_url).netloc
+        
+        if link_graph is not None:
+            link_graph.add_page(base_url, root=True)
         
         while to_visit and len(all_links) < max_links:
             url, depth = to_visit.pop(0)
@@ -87,18 +104,30 @@ class URLProcessor:
             
             try:
                 parsed = urlparse(url)
-                response = requests.get(url, timeout=10, verify=False)
+                response = stream_get(url, timeout=10, verify=False)
                 soup = BeautifulSoup(response.content, 'html.parser')
+                page_links = []
+                page_references = []
                 
-                # Extract all links
-                for link in soup.find_all(['a', 'link', 'script', 'img'], href=True):
-                    href = link['href']
+                # Extract all links; scripts and images reference their file by src
+                for link in soup.find_all(['a', 'link', 'script', 'img']):
+                    href = link.get('src' if link.name in ('script', 'img') else 'href')
+                    if not href or href.startswith('data:'):
+                        continue
                     full_url = urljoin(url, href)
                     full_url = urldefrag(full_url)[0]  # Remove fragments
                     
                     # Filter relevant links
                     if URLProcessor.is_relevant_link(full_url, base_url):
                         all_links.add(full_url)
+                        page_references.append((full_url, link.get_text(' ', strip=True), link.name))
+                        
+                        # Follow internal anchors to the next crawl depth; only pages are graph nodes
+                        if link.name == 'a' and urlparse(full_url).netloc == base_domain:
+                            if URLProcessor.is_page_url(full_url):
+                                page_links.append(full_url)
+                            if full_url not in visited and depth < max_depth:
+                                to_visit.append((full_url, depth + 1))
                 
                 # Also extract paths from forms
                 for form in soup.find_all('form', action=True):
@@ -106,6 +135,11 @@ class URLProcessor:
                     full_url = urljoin(url, action)
                     if URLProcessor.is_relevant_link(full_url, base_url):
                         all_links.add(full_url)
+                        page_references.append((full_url, form.get('name', ''), 'form'))
+                
+                if link_graph is not None:
+                    link_graph.add_links(url, page_links)
+                    link_graph.add_references(url, page_references)
                 
                 time.sleep(0.5)  # Be respectful
                 
@@ -135,4 +169,54 @@ class URLProcessor:
         if any(path.endswith(ext) for ext in useful_extensions) or not path.endswith('/'):
             return True
         
-        return False
\ No newline at end of file
+        return False
+    
+    @staticmethod
+    def is_page_url(url):
+        """Whether a URL looks like an HTML page rather than an asset, judged by its path extension"""
+        last_segment = urlparse(url).path.rsplit('/', 1)[-1].lower()
+        return '.' not in last_segment or last_segment.endswith(PAGE_EXTENSIONS)
+    
+    @staticmethod
+    def _collapse_path_segment(segment, position):
+        """Replace a variable path segment with a placeholder"""
+        name, dot, extension = segment.rpartition('.')
+        if not dot or not name or len(extension) > 5:
+            name, extension = segment, ''
+        
+        if NUMERIC_SEGMENT.match(name):
+            placeholder = '<id>'
+        elif HASH_SEGMENT.match(name):
+            placeholder = '<hash>'
+        elif position > 0 and SLUG_SEGMENT.match(name):
+            # The first segment usually names a section (/about-us, /contact-us)
+            placeholder = '<slug>'
+        else:
+            return segment
+        
+        return f"{placeholder}.{extension}" if extension else placeholder
+    
+    @staticmethod
+    def get_url_template(url):
+        """Get the path template of a URL, e.g. shop.com/product/<id>?color&size"""
+        parsed = urlparse(URLProcessor.normalize_url(url.strip()))
+        segments = [segment for segment in parsed.path.split('/') if segment]
+        collapsed = [URLProcessor._collapse_path_segment(segment, position)
+                     for position, segment in enumerate(segments)]
+        
+        template = parsed.netloc.lower() + '/' + '/'.join(collapsed)
+        
+        # Query values vary per page; only the set of keys describes the template
+        query_keys = sorted({key.lower() for key, _ in parse_qsl(parsed.query, keep_blank_values=True)})
+        if query_keys:
+            template += '?' + '&'.join(query_keys)
+        
+        return template
+    
+    @staticmethod
+    def cluster_urls_by_template(url_list):
+        """Group URLs by path template, preserving input order inside each cluster"""
+        clusters = {}
+        for url in url_list:
+            clusters.setdefault(URLProcessor.get_url_template(url), []).append(url)
+        return clusters
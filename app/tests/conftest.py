@@ -0,0 +1,5 @@
+# tests/conftest.py - Make the app modules importable the way app.py imports them
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+# tests/test_adaptive_concurrency.py - AIMD limits per origin
+import threading
+import time
+from modules.adaptive_concurrency import AdaptiveConcurrencyLimiter, _Slot
+
+URL = 'https://site.test/page'
+
+def complete(limiter, latency, status_code=200, count=1):
+    """Record finished requests without running them"""
+    for _ in range(count):
+        limiter.acquire(URL)
+        slot = _Slot()
+        slot.status_code = status_code
+        limiter.release(URL, latency, slot)
+
+def limit(limiter):
+    return limiter.get_statistics()[0]['current_limit']
+
+def test_limit_grows_by_one_per_window_of_steady_latency():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=6, window=5)
+    complete(limiter, 0.1, count=5)
+    assert limit(limiter) == 5
+    complete(limiter, 0.1, count=15)
+    assert limit(limiter) == 6
+    assert limiter.get_statistics()[0]['baseline_p95_ms'] == 100
+
+def test_overload_responses_halve_the_limit_once_per_round():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, window=5)
+    # A burst of 429s from requests sent at the old limit backs off only once
+    complete(limiter, 0.1, status_code=429, count=3)
+    assert limit(limiter) == 4
+    # The next round of 4 requests at the new limit may back off again
+    complete(limiter, 0.1, status_code=503, count=2)
+    assert limit(limiter) == 2
+    assert limiter.get_statistics()[0]['decreases'] == 2
+
+def test_rising_latency_shrinks_the_limit_but_not_below_the_minimum():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, window=5, latency_tolerance=1.5)
+    complete(limiter, 0.1, count=5)
+    assert limit(limiter) == 3
+    complete(limiter, 0.5, count=5)
+    assert limit(limiter) == 1
+    complete(limiter, 0.5, status_code=429, count=5)
+    assert limit(limiter) == 1
+
+def test_results_that_skip_the_origin_are_not_latency_samples():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, window=2)
+    for _ in range(4):
+        limiter.call(URL, lambda url: 'cached', classify=lambda result: None)
+    assert limit(limiter) == 2
+    limiter.call(URL, lambda url: 'fetched', classify=lambda result: (200, False))
+    limiter.call(URL, lambda url: 'fetched', classify=lambda result: (200, False))
+    assert limit(limiter) == 3
+
+def test_map_keeps_each_origin_within_its_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8, window=100)
+    lock = threading.Lock()
+    running = {'now': 0, 'peak': 0}
+    
+    def fetch(url):
+        with lock:
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+        time.sleep(0.02)
+        with lock:
+            running['now'] -= 1
+        return url
+    
+    urls = [f'https://site.test/{index}' for index in range(8)]
+    done = [future.result() for _, future in limiter.map_as_completed(fetch, urls)]
+    assert sorted(done) == sorted(urls)
+    assert running['peak'] == 2
+
+def test_origins_are_interleaved():
+    urls = ['https://a.test/1', 'https://a.test/2', 'https://a.test/3', 'https://b.test/1']
+    assert AdaptiveConcurrencyLimiter.interleave_origins(urls) == [
+        'https://a.test/1', 'https://b.test/1', 'https://a.test/2', 'https://a.test/3']
@@ -0,0 +1,29 @@
+# tests/test_browser_renderer.py - Rendered-page metrics (no browser needed)
+from modules.browser_renderer import BrowserRenderer, RenderedPage, interactive_time
+
+METRICS = {
+    'now': 4000.0, 'ttfb_ms': 120.04, 'dom_content_loaded_ms': 800.0, 'load_ms': 1500.0,
+    'fp_ms': 600.0, 'fcp_ms': 650.0, 'lcp_ms': None,
+    'long_tasks': [[300.0, 420.0], [900.0, 1100.0], [2000.0, 2040.0]],
+    'dom_elements': 420
+}
+
+def test_interactive_time_is_the_end_of_the_last_long_task_after_the_floor():
+    assert interactive_time(METRICS) == 2040.0
+    assert interactive_time(dict(METRICS, long_tasks=[[100.0, 300.0]])) == 800.0
+    assert interactive_time(dict(METRICS, fcp_ms=None, dom_content_loaded_ms=None, long_tasks=[])) == 0
+
+def test_rendered_page_reports_timings_and_blocking_time():
+    page = RenderedPage('https://site/', 'https://site/home', '<html>é</html>', METRICS, 2345.67)
+    # Only the time beyond 50ms of each long task blocks
+    assert page.blocking_ms == 70.0 + 150.0
+    report = page.to_dict()
+    assert (report['ttfb_ms'], report['lcp_ms'], report['tti_ms']) == (120.0, None, 2040.0)
+    assert (report['long_tasks'], report['blocking_ms'], report['rendered_html_bytes']) == (3, 220.0, 15)
+    assert report['render_ms'] == 2345.7
+
+def test_rendering_stays_off_without_playwright():
+    renderer = BrowserRenderer()
+    renderer.configure(enabled=True)
+    assert renderer.enabled == renderer.available
+    assert renderer.get_statistics() == {'workers': 0, 'browsers_launched': 0, 'rendered_pages': 0, 'failed_pages': 0}
@@ -0,0 +1,131 @@
+# tests/test_build_diff.py - Build diffs, the scan cache and incremental offline scans
+import os
+import subprocess
+import pytest
+from modules.build_diff import BuildScanCache, diff_directories, diff_commits, link_target
+from modules.build_directory import BuildDirectory
+
+BASE_URL = 'https://site.test/'
+
+def write(root, files):
+    for relative_path, content in files.items():
+        path = os.path.join(root, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+SITE = {
+    'index.html': '<link rel="stylesheet" href="/s.css?v=1"><a href="/about/">About</a><a href="/blog">Blog</a>',
+    'about/index.html': '<a href="/">Home</a><img src="../logo.png">',
+    'blog.html': '<script src="app.js"></script><a href="about/#team">Team</a>',
+    's.css': 'body{color:#000}',
+    'app.js': 'var a = 1;',
+    'logo.png': 'png',
+}
+
+@pytest.fixture
+def builds(tmp_path):
+    previous, current = tmp_path / 'previous', tmp_path / 'current'
+    write(previous, SITE)
+    write(current, SITE)
+    return str(previous), str(current)
+
+@pytest.fixture
+def build_directory():
+    directory = BuildDirectory()
+    yield directory
+    directory.clear()
+
+@pytest.fixture
+def scan_cache(tmp_path):
+    return BuildScanCache(str(tmp_path / 'scan.db'))
+
+def scan_incrementally(build_directory, scan_cache, previous, current):
+    """Scan the previous build into the cache, then scan the changes of the current one"""
+    build_directory.configure(previous, BASE_URL)
+    changes, _, previous_state = diff_directories(previous, previous)
+    build_directory.scan_changes(changes, scan_cache, None, previous_state)
+    
+    build_directory.configure(current, BASE_URL)
+    changes, previous_state, state = diff_directories(previous, current)
+    return build_directory.scan_changes(changes, scan_cache, previous_state, state)
+
+def test_link_target_drops_query_and_fragment():
+    assert link_target('https://site.test/s.css?v=1#x') == 'https://site.test/s.css'
+
+def test_diff_directories(builds):
+    previous, current = builds
+    write(current, {'s.css': 'body{color:#111}', 'new.html': '<p>new</p>'})
+    os.remove(os.path.join(current, 'logo.png'))
+    changes, previous_state, state = diff_directories(previous, current)
+    assert changes == {'added': ['new.html'], 'modified': ['s.css'], 'removed': ['logo.png']}
+    assert previous_state != state
+
+def test_directory_states_follow_file_contents(builds):
+    previous, current = builds
+    _, previous_state, state = diff_directories(previous, current)
+    assert previous_state == state
+    
+    # Same size, different content
+    write(current, {'s.css': 'body{color:#fff}'})
+    changes, previous_state, state = diff_directories(previous, current)
+    assert changes['modified'] == ['s.css']
+    assert previous_state != state
+
+def test_diff_commits(tmp_path):
+    root = str(tmp_path)
+    def git(*args):
+        subprocess.run(['git', '-C', root, '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                       check=True, capture_output=True)
+    write(root, {'index.html': 'a', 'old.html': 'b'})
+    git('init', '-q')
+    git('add', '.')
+    git('commit', '-q', '-m', 'first')
+    write(root, {'index.html': 'changed', 'new.html': 'c'})
+    os.remove(os.path.join(root, 'old.html'))
+    git('add', '-A')
+    git('commit', '-q', '-m', 'second')
+    changes, previous_state, state = diff_commits(root, 'HEAD~1')
+    assert changes == {'added': ['new.html'], 'modified': ['index.html'], 'removed': ['old.html']}
+    assert previous_state.startswith('commit:') and state.startswith('commit:')
+
+def test_scan_cache_finds_referrers_with_query_strings(scan_cache):
+    scan_cache.update(BASE_URL, {'index.html': [('https://site.test/s.css?v=1', '', 'link')]}, [], 'state')
+    assert scan_cache.referrers(BASE_URL, ['https://site.test/s.css']) == {'index.html'}
+    assert scan_cache.get_state(BASE_URL) == 'state'
+
+def test_modified_stylesheet_with_query_string_affects_its_page(builds, build_directory, scan_cache):
+    previous, current = builds
+    write(current, {'s.css': 'body{color:#111}'})
+    links = scan_incrementally(build_directory, scan_cache, previous, current)
+    assert build_directory.changed_pages == [BASE_URL]
+    assert 'https://site.test/s.css?v=1' in links
+    assert build_directory.get_statistics()['full_scan'] is False
+
+def test_modified_page_affects_pages_linking_to_it(builds, build_directory, scan_cache):
+    previous, current = builds
+    write(current, {'about/index.html': '<a href="/">Home</a><p>changed</p>'})
+    scan_incrementally(build_directory, scan_cache, previous, current)
+    assert build_directory.changed_pages == [BASE_URL + 'about/', BASE_URL + 'blog.html', BASE_URL]
+
+def test_removed_file_affects_its_referrers(builds, build_directory, scan_cache):
+    previous, current = builds
+    os.remove(os.path.join(current, 'app.js'))
+    scan_incrementally(build_directory, scan_cache, previous, current)
+    assert build_directory.changed_pages == [BASE_URL + 'blog.html']
+
+def test_unreferenced_change_is_an_error(builds, build_directory, scan_cache):
+    previous, current = builds
+    write(current, {'robots.txt': 'User-agent: *'})
+    with pytest.raises(ValueError, match='not referenced'):
+        scan_incrementally(build_directory, scan_cache, previous, current)
+
+def test_stale_cache_falls_back_to_full_scan(builds, build_directory, scan_cache):
+    previous, current = builds
+    write(current, {'s.css': 'body{color:#111}'})
+    build_directory.configure(current, BASE_URL)
+    changes, previous_state, state = diff_directories(previous, current)
+    build_directory.scan_changes(changes, scan_cache, previous_state, state)
+    statistics = build_directory.get_statistics()
+    assert statistics['full_scan'] is True and statistics['rescanned_pages'] == 3
+    assert build_directory.changed_pages == [BASE_URL]
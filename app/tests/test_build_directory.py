@@ -0,0 +1,63 @@
+# tests/test_build_directory.py - Serving and scanning a local build directory
+import os
+import pytest
+from modules.build_directory import BuildDirectory
+from modules.link_graph import LinkGraph
+from modules.page_fetcher import stream_get
+
+BASE_URL = 'https://site.test/docs/'
+SITE = {
+    'index.html': '<a href="guide">Guide</a> <a href="/docs/api/">API</a> <link rel="stylesheet" href="s.css">'
+                  '<a href="https://other.test/">Elsewhere</a>',
+    'guide.html': '<h1>Café</h1><a href="missing.html">Missing</a><img src="img/logo.png">',
+    'api/index.html': '<a href="../guide.html#intro">Guide</a>',
+    's.css': 'body { color: #000 }',
+    'img/logo.png': 'png',
+}
+
+@pytest.fixture
+def build_directory(tmp_path):
+    for relative_path, content in SITE.items():
+        path = tmp_path.joinpath(*relative_path.split('/'))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+    directory = BuildDirectory()
+    directory.configure(str(tmp_path), 'https://site.test/docs')
+    yield directory
+    directory.clear()
+
+@pytest.mark.parametrize('url, relative_path', [
+    ('https://site.test/docs/', 'index.html'),
+    ('https://site.test/docs', 'index.html'),
+    ('https://site.test/docs/guide', 'guide.html'),
+    ('https://site.test/docs/api', 'api/index.html'),
+    ('https://site.test/docs/img/logo.png?v=2', 'img/logo.png'),
+    ('https://site.test/docs/../secret.html', None),
+    ('https://site.test/docs/missing.html', None),
+    ('https://other.test/docs/guide', None),
+])
+def test_urls_resolve_like_a_static_file_server(build_directory, url, relative_path):
+    expected = os.path.join(build_directory.root, *relative_path.split('/')) if relative_path else None
+    assert build_directory.resolve(url) == expected
+
+def test_files_are_served_through_the_shared_session(build_directory):
+    response = stream_get(BASE_URL + 'guide')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert 'Café' in response.text
+    assert stream_get(BASE_URL + 'missing.html').status_code == 404
+    
+    build_directory.clear()
+    assert not build_directory.serves(BASE_URL)
+
+def test_scan_lists_pages_then_internal_references(build_directory):
+    graph = LinkGraph()
+    urls = build_directory.scan(graph)
+    assert urls[:3] == [BASE_URL + 'api/', BASE_URL + 'guide.html', BASE_URL]
+    assert set(urls[3:]) == {BASE_URL + 'guide', BASE_URL + 's.css', BASE_URL + 'missing.html',
+                             BASE_URL + 'img/logo.png'}
+    assert build_directory.get_statistics()['html_files'] == 3
+    
+    # Only links to pages are edges; assets and missing files are references
+    assert graph.get_summary()['pages'] == 4
+    assert [referrer['url'] for referrer in graph.get_referrers(BASE_URL + 'missing.html')] == [BASE_URL + 'guide.html']
@@ -0,0 +1,66 @@
+# tests/test_circuit_breaker.py - Per-host circuit states and fail-fast requests
+import time
+from types import SimpleNamespace
+import pytest
+import requests
+from modules.circuit_breaker import HostCircuitBreaker, HostUnreachableError, get_origin
+
+def failing(error):
+    def request(url, **kwargs):
+        raise error
+    return request
+
+def answering(url, **kwargs):
+    return SimpleNamespace(status_code=503)
+
+def trip(breaker, url, times=3):
+    for _ in range(times):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            breaker.get(url, request=failing(requests.exceptions.ConnectionError('refused')))
+
+def test_origin_is_scheme_and_host():
+    assert get_origin('HTTPS://Site.test:8443/a?b') == 'https://site.test:8443'
+
+def test_consecutive_failures_open_the_circuit_and_requests_fail_fast():
+    breaker = HostCircuitBreaker(failure_threshold=3, cooldown_seconds=60)
+    trip(breaker, 'https://dead.test/a')
+    with pytest.raises(HostUnreachableError, match='failed 3 consecutive requests'):
+        breaker.get('https://dead.test/b', request=answering)
+    # Other hosts are not affected
+    assert breaker.get('https://alive.test/', request=answering).status_code == 503
+    
+    statistics = breaker.get_statistics()
+    assert [(host['host'], host['state'], host['trips'], host['short_circuited_requests'])
+            for host in statistics] == [('https://dead.test', 'open', 1, 1)]
+
+def test_any_http_answer_resets_the_failure_count():
+    breaker = HostCircuitBreaker(failure_threshold=3, cooldown_seconds=60)
+    trip(breaker, 'https://flaky.test/', times=2)
+    breaker.get('https://flaky.test/', request=answering)
+    trip(breaker, 'https://flaky.test/', times=2)
+    assert breaker.allow_request('https://flaky.test/')
+
+def test_half_open_probe_closes_or_reopens_the_circuit():
+    breaker = HostCircuitBreaker(failure_threshold=1, cooldown_seconds=0.05)
+    trip(breaker, 'https://slow.test/', times=1)
+    time.sleep(0.06)
+    # The probe times out and the circuit opens again
+    with pytest.raises(requests.exceptions.Timeout):
+        breaker.get('https://slow.test/', request=failing(requests.exceptions.Timeout('read timed out')))
+    assert not breaker.allow_request('https://slow.test/')
+    
+    time.sleep(0.06)
+    breaker.get('https://slow.test/', request=answering)
+    assert breaker.allow_request('https://slow.test/')
+    assert breaker.get_statistics()[0]['trips'] == 2
+
+def test_errors_unrelated_to_the_host_release_the_probe():
+    breaker = HostCircuitBreaker(failure_threshold=1, cooldown_seconds=0.05)
+    trip(breaker, 'https://site.test/', times=1)
+    time.sleep(0.06)
+    with pytest.raises(requests.exceptions.TooManyRedirects):
+        breaker.get('https://site.test/', request=failing(requests.exceptions.TooManyRedirects('loop')))
+    # Still open, and the next request after the cooldown probes again
+    host = breaker.hosts['https://site.test']
+    assert (host['state'], host['failures']) == ('open', 1)
+    assert breaker.allow_request('https://site.test/')
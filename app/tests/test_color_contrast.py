@@ -0,0 +1,74 @@
+# tests/test_color_contrast.py - Color parsing, cascade resolution and WCAG contrast
+import numpy as np
+import pytest
+from bs4 import BeautifulSoup
+from modules.color_contrast import parse_color, contrast_ratios, specificity, media_applies, analyze_text_contrast
+from modules.stylesheet_store import StylesheetStore
+
+def contrast(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return analyze_text_contrast(soup, StylesheetStore().get_page_css(soup, 'https://example.com/'))
+
+@pytest.mark.parametrize('value, expected', [
+    ('#fff', (255.0, 255.0, 255.0, 1.0)),
+    ('#00000080', (0.0, 0.0, 0.0, 128 / 255)),
+    ('rgb(255 0 0 / 50%)', (255.0, 0.0, 0.0, 0.5)),
+    ('navy', (0.0, 0.0, 128.0, 1.0)),
+    ('transparent', (0.0, 0.0, 0.0, 0.0)),
+])
+def test_parse_color(value, expected):
+    assert parse_color(value) == pytest.approx(expected)
+
+def test_parse_color_hsl_and_invalid_values():
+    assert parse_color('hsl(120, 100%, 50%)') == pytest.approx((0.0, 255.0, 0.0, 1.0))
+    assert parse_color('currentColor') == 'inherit'
+    assert parse_color('#12') is None
+    assert parse_color('rgb(1, 2)') is None
+
+def test_contrast_ratios_match_wcag_reference_values():
+    ratios = contrast_ratios([(0, 0, 0, 1), (255, 255, 255, 1), (119, 119, 119, 1)],
+                             [(255, 255, 255), (255, 255, 255), (255, 255, 255)])
+    assert ratios == pytest.approx([21.0, 1.0, 4.48], abs=0.01)
+
+def test_contrast_ratios_blend_translucent_text_over_background():
+    half_black = contrast_ratios([(0, 0, 0, 0.5)], [(255, 255, 255)])
+    gray = contrast_ratios([(127.5, 127.5, 127.5, 1)], [(255, 255, 255)])
+    assert np.allclose(half_black, gray)
+
+def test_specificity_counts_ids_classes_and_types():
+    assert specificity('#main .nav > a:hover') == (1, 2, 1)
+    assert specificity('ul li[data-x="a b"]') == (0, 1, 2)
+
+def test_media_applies_on_desktop_viewport():
+    assert media_applies('', 1280)
+    assert media_applies('screen and (min-width: 1024px)', 1280)
+    assert not media_applies('(max-width: 600px)', 1280)
+    assert not media_applies('print', 1280)
+
+def test_cascade_specificity_and_inheritance_decide_the_failing_text():
+    result = contrast("""<style>
+        p { color: #777; }
+        .card p { color: #111; }
+        .card .muted { color: #aaa; }
+        .muted { color: #000; }
+        </style>
+        <div class="card"><p>dark enough</p><p class="muted">too light</p></div>
+        <p>gray on white</p>""")
+    assert result['checked'] == 3
+    assert [(failure['text'], failure['foreground']) for failure in result['failures']] == [
+        ('too light', '#aaaaaa'), ('gray on white', '#777777')]
+
+def test_style_attributes_and_backgrounds_apply_to_descendants():
+    result = contrast("""<style>.banner { background: #000 url(hero.jpg); } .dark { background-color: #222; }</style>
+        <div class="dark"><span style="color: #333">dark on dark</span><span style="color: #fff">light</span></div>
+        <div class="banner"><span>over an image</span></div>""")
+    assert result['undetermined'] == 1
+    assert [failure['text'] for failure in result['failures']] == ['dark on dark']
+
+def test_large_text_needs_lower_ratio():
+    result = contrast('<style>h1, p { color: #888; }</style><h1>Large heading</h1><p>Body text</p>')
+    assert [(failure['text'], failure['required']) for failure in result['failures']] == [('Body text', 4.5)]
+
+def test_hidden_elements_are_not_checked():
+    result = contrast('<style>.x{display:none;color:#eee}</style><p class="x">hidden</p><p hidden>also hidden</p>')
+    assert result['checked'] == 0 and result['failures'] == []
@@ -0,0 +1,35 @@
+# tests/test_component_cache.py - Site-wide header, nav and footer memoization
+from bs4 import BeautifulSoup
+from modules.component_cache import ComponentCache
+
+CHROME = '<header><nav><a href="/">Home</a></nav></header><footer>(c) Site</footer>'
+
+def page(main, footer='(c) Site'):
+    return BeautifulSoup(CHROME.replace('(c) Site', footer) + f'<main>{main}</main>', 'html.parser')
+
+def test_outermost_chrome_elements_and_their_descendants():
+    soup = BeautifulSoup('<div role="banner"><header><img></header></div><main><p></p></main>', 'html.parser')
+    components, element_ids = ComponentCache().find_components(soup)
+    assert [element.name for element in components] == ['div']
+    assert id(soup.find('img')) in element_ids and id(soup.find('p')) not in element_ids
+
+def test_each_component_is_analyzed_once_per_analyzer():
+    cache = ComponentCache()
+    calls = []
+    
+    def analyze(element, label):
+        calls.append(element.name)
+        return [{'Test Links/Data': 'page', 'Comments/Bug ID': 'Missing skip link'}]
+    
+    first, _ = cache.analyze_components(page('one'), 'https://site/1', 'accessibility', analyze)
+    second, _ = cache.analyze_components(page('two'), 'https://site/2', 'accessibility', analyze)
+    other, _ = cache.analyze_components(page('two'), 'https://site/2', 'fonts', analyze)
+    changed, _ = cache.analyze_components(page('three', footer='(c) 2026'), 'https://site/3', 'accessibility', analyze)
+    
+    assert calls == ['header', 'footer', 'header', 'footer', 'footer']
+    assert len(first) == 2 and second == [] and len(other) == 2 and len(changed) == 1
+    assert first[0]['Site-wide Component'] and first[0]['Test Links/Data'].startswith('Site-wide component <header>')
+    assert first[0]['Comments/Bug ID'] == 'Missing skip link | Reported once for all pages sharing this component'
+    
+    summary = cache.get_components_summary()
+    assert [(component['tag'], component['page_count']) for component in summary][:2] == [('header', 3), ('footer', 2)]
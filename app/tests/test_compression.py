@@ -0,0 +1,43 @@
+# tests/test_compression.py - Content decoders and the advertised Accept-Encoding
+import gzip
+import zlib
+import pytest
+from modules.compression import ACCEPT_ENCODING, DECODERS, content_decoder
+from modules.http_timing import create_timed_session
+
+BODY = b'<html><body>' + b'compressible text ' * 200 + b'</body></html>'
+
+def decode_in_chunks(headers, data, size=7):
+    decoder = content_decoder(headers)
+    output = b''.join(decoder.decompress(data[start:start + size]) for start in range(0, len(data), size))
+    return output + decoder.flush()
+
+def test_gzip_bodies_of_several_members_and_trailing_garbage():
+    data = gzip.compress(BODY[:100]) + gzip.compress(BODY[100:]) + b'\0\0garbage'
+    assert decode_in_chunks({'Content-Encoding': 'gzip'}, data) == BODY
+
+def test_corrupt_gzip_body_raises():
+    with pytest.raises(zlib.error):
+        decode_in_chunks({'Content-Encoding': 'gzip'}, b'not gzip at all')
+
+@pytest.mark.parametrize('wbits', [zlib.MAX_WBITS, -zlib.MAX_WBITS])
+def test_deflate_with_and_without_zlib_header(wbits):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+    data = compressor.compress(BODY) + compressor.flush()
+    assert decode_in_chunks({'Content-Encoding': 'deflate'}, data) == BODY
+
+def test_stacked_codings_are_undone_in_reverse_order():
+    data = gzip.compress(zlib.compress(BODY))
+    assert decode_in_chunks({'Content-Encoding': 'deflate, gzip'}, data) == BODY
+
+@pytest.mark.parametrize('encoding', ['', 'identity', 'compress', 'gzip, zstd'])
+def test_identity_and_unsupported_codings_are_not_decoded(encoding):
+    assert content_decoder({'Content-Encoding': encoding}) is None
+
+def test_only_decodable_codings_are_advertised():
+    session = create_timed_session()
+    advertised = [value.strip() for value in session.headers['Accept-Encoding'].split(',')]
+    assert session.headers['Accept-Encoding'] == ACCEPT_ENCODING
+    assert advertised and all(encoding in DECODERS for encoding in advertised)
+    assert 'zstd' not in advertised
+    assert ('br' in advertised) == ('br' in DECODERS)
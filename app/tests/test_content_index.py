@@ -0,0 +1,31 @@
+# tests/test_content_index.py - MinHash/LSH clustering of near-duplicate pages
+from bs4 import BeautifulSoup
+from modules.content_index import ContentDuplicateIndex, extract_content_text
+
+ARTICLE = ' '.join(f'word{index}' for index in range(300))
+
+def test_boilerplate_is_left_out_of_the_content_text():
+    soup = BeautifulSoup('<body><nav>Menu</nav><p>Body text</p><script>var a;</script><footer>Foot</footer></body>',
+                         'html.parser')
+    assert extract_content_text(soup).split() == ['Body', 'text']
+
+def test_near_duplicates_cluster_and_distinct_pages_do_not():
+    index = ContentDuplicateIndex()
+    index.add_page('https://site/a', ARTICLE)
+    index.add_page('https://site/b', ARTICLE.replace('word150', 'changed'))
+    index.add_page('https://site/c', ARTICLE)
+    index.add_page('https://site/other', ' '.join(f'term{index}' for index in range(300)))
+    index.add_page('https://site/empty', '')
+    
+    clusters = index.get_duplicate_clusters()
+    assert [sorted(cluster['urls']) for cluster in clusters] == [['https://site/a', 'https://site/b', 'https://site/c']]
+    assert 0.8 <= clusters[0]['min_similarity'] < 1.0
+    assert index.get_statistics() == {'indexed_pages': 4, 'signature_bytes': 4 * 128 * 4, 'duplicate_clusters': 1}
+
+def test_signature_similarity_estimates_jaccard_similarity():
+    index = ContentDuplicateIndex()
+    words = [f'w{index}' for index in range(1000)]
+    first = index.compute_signature(' '.join(words))
+    # Replacing the last 200 words leaves 796 of 1196 distinct 5-word shingles shared
+    second = index.compute_signature(' '.join(words[:800] + [f'x{index}' for index in range(200)]))
+    assert abs(float((first == second).mean()) - 796 / 1196) < 0.1
@@ -0,0 +1,39 @@
+# tests/test_css_tokenizer.py - Streaming CSS tokenizer and stylesheet events
+from modules.css_tokenizer import tokenize, extract_urls, media_breakpoints, scan_stylesheet
+
+def test_tokenize_keeps_strings_urls_and_comments_whole():
+    css = 'a{content:"};";background:url( "x}.png" )}/* { */'
+    kinds = [kind for kind, _ in tokenize(css)]
+    assert kinds == ['text', 'open', 'text', 'string', 'semicolon', 'text', 'url', 'close', 'comment']
+
+def test_tokenize_covers_every_character():
+    css = "@media (max-width:600px){.a{color:red!important}}/* unterminated"
+    assert ''.join(text for _, text in tokenize(css)) == css
+
+def test_extract_urls_strips_quotes():
+    assert extract_urls("src:url('a.woff2') format('woff2'), url(b.woff), url(\"c.ttf\")") == ['a.woff2', 'b.woff', 'c.ttf']
+
+def test_media_breakpoints_convert_em_to_pixels():
+    assert media_breakpoints('screen and (min-width: 48em) and (max-width:1200px)') == [('min', 768.0), ('max', 1200.0)]
+
+def test_scan_stylesheet_declarations_carry_selector_and_media():
+    css = "body{color:#000}@media (max-width:600px){.nav a{font-size:12px !important}}"
+    declarations = [value for event, value in scan_stylesheet(css) if event == 'declaration']
+    assert declarations == [
+        ('color', '#000', False, 'body', ''),
+        ('font-size', '12px', True, '.nav a', '(max-width:600px)'),
+    ]
+
+def test_scan_stylesheet_nested_media_conditions_combine():
+    css = "@media screen{@media (min-width:500px){p{margin:0}}}"
+    declarations = [value for event, value in scan_stylesheet(css) if event == 'declaration']
+    assert declarations == [('margin', '0', False, 'p', 'screen and (min-width:500px)')]
+
+def test_scan_stylesheet_skips_keyframes_and_collects_font_faces():
+    css = ("@import url(base.css);@keyframes spin{from{opacity:0}to{opacity:1}}"
+           "@font-face{font-family:Inter;src:url(inter.woff2)}h1{opacity:.5}")
+    events = list(scan_stylesheet(css))
+    assert ('at_statement', ('import', 'url(base.css)')) in events
+    assert ('font_face', {'font-family': 'Inter', 'src': 'url(inter.woff2)'}) in events
+    assert [value for event, value in events if event == 'declaration'] == [('opacity', '.5', False, 'h1', '')]
+    assert [value for event, value in events if event == 'rule'] == [('h1', '')]
@@ -0,0 +1,77 @@
+# tests/test_http_timing.py - Connection phase timings, address fallback and per-request cookies
+import socket
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+import pytest
+from modules.http_timing import build_timings, create_timed_session, get_connection_timings, timing_fields
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.server.cookies.append(self.headers.get('Cookie'))
+        self.send_response(302 if self.path == '/login' else 200)
+        if self.path == '/login':
+            self.send_header('Set-Cookie', 'session=abc; Path=/')
+            self.send_header('Location', '/account')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+    
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.cookies = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_build_timings_splits_elapsed_into_setup_and_ttfb():
+    response = SimpleNamespace(elapsed=timedelta(milliseconds=250))
+    timings = build_timings(response, {'dns': 0.02, 'connect': 0.03, 'tls': 0.05}, 0.1)
+    assert timings == {'dns_ms': 20.0, 'connect_ms': 30.0, 'tls_ms': 50.0, 'ttfb_ms': 150.0,
+                       'download_ms': 100.0, 'total_ms': 350.0}
+    assert timing_fields(timings)['TTFB (ms)'] == 150.0
+    assert timing_fields(None) == {}
+
+def test_only_the_first_request_on_a_connection_reports_setup(server):
+    session = create_timed_session()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    first = session.get(url, stream=True)
+    first_timings = get_connection_timings(first)
+    # Reading the body returns the connection to the pool
+    assert first.content == b'ok'
+    second = session.get(url, stream=True)
+    assert first_timings['connect'] > 0
+    assert get_connection_timings(second) == {'dns': 0.0, 'connect': 0.0, 'tls': 0.0}
+    second.close()
+
+def test_later_addresses_are_tried_when_the_first_refuses(server, monkeypatch):
+    port = server.server_address[1]
+    getaddrinfo = socket.getaddrinfo
+    
+    def resolve(host, *args, **kwargs):
+        if host == 'multi.test':
+            # 127.0.0.2 is loopback too, but nothing listens there
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port))
+                    for address in ['127.0.0.2', '127.0.0.1']]
+        return getaddrinfo(host, *args, **kwargs)
+    
+    monkeypatch.setattr(socket, 'getaddrinfo', resolve)
+    response = create_timed_session().get(f'http://multi.test:{port}/')
+    assert response.status_code == 200
+
+def test_cookies_follow_redirects_but_not_later_requests(server):
+    session = create_timed_session()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    assert session.get(base_url + '/login').url == base_url + '/account'
+    session.get(base_url + '/')
+    assert server.cookies == [None, 'session=abc', None]
+    assert len(session.cookies) == 0
@@ -0,0 +1,43 @@
+# tests/test_latency_sampler.py - Latency percentiles and cold-connection sampling
+from types import SimpleNamespace
+import pytest
+import requests
+from modules import latency_sampler
+from modules.latency_sampler import LatencySampler, latency_statistics
+
+def test_statistics_report_percentiles_spread_and_outliers():
+    stats = latency_statistics([100, 110, 120, 130, 140, 150, 160, 170, 180, 900], [50, 90])
+    assert stats['p50'] == 145.0
+    assert stats['min'] == 100.0 and stats['max'] == 900.0
+    assert stats['outliers'] == 1
+    assert latency_statistics([], [50]) is None
+    assert latency_statistics([120], [50])['std'] == 0.0
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Replace the network with responses timed 200, 210, ... ms; the third fails"""
+    calls = []
+    
+    def fake_stream_get(url, headers=None, **kwargs):
+        calls.append(headers)
+        if len(calls) == 3:
+            raise requests.exceptions.ConnectionError('reset')
+        total = 200 + 10 * len(calls)
+        return SimpleNamespace(timings={'total_ms': total, 'ttfb_ms': total / 2})
+    
+    monkeypatch.setattr(latency_sampler, 'stream_get', fake_stream_get)
+    return calls
+
+def test_samples_are_all_cold_and_the_first_fetch_is_reported_apart(fetches):
+    sampler = LatencySampler(samples=4, interval_seconds=0)
+    warm = SimpleNamespace(timings={'total_ms': 20, 'ttfb_ms': 10})
+    result = sampler.sample('https://site/', warm)
+    
+    assert result['samples']['total_ms'] == [210, 220, 240]
+    assert result['failed_samples'] == 1
+    assert result['first_response'] == {'total_ms': 20, 'ttfb_ms': 10}
+    assert all(headers == {'Connection': 'close'} for headers in fetches)
+    
+    summary = sampler.get_results()[0]
+    assert (summary['sample_count'], summary['first_response_ms']) == (3, 20)
+    assert summary['total_ms']['min'] == 210.0
@@ -0,0 +1,48 @@
+# tests/test_link_cache.py - Canonical keys and per-category TTLs of the link-status cache
+from types import SimpleNamespace
+import pytest
+from modules import link_cache
+from modules.link_cache import LinkStatusCache, canonical_url
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(link_cache, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+@pytest.fixture
+def cache(tmp_path):
+    return LinkStatusCache(str(tmp_path / 'links.db'), ttl={'Success': 100, 'Server Error': 10, 'Error': 0})
+
+def result(url, category, status_code=200):
+    return {'url': url, 'status_code': status_code, 'status_text': 'OK', 'status_category': category,
+            'response_time_ms': 42}
+
+def test_canonical_url_ignores_case_default_port_and_fragment():
+    assert canonical_url('HTTPS://Site.Test:443/a?b=1#top') == 'https://site.test/a?b=1'
+    assert canonical_url('http://site.test:8080') == 'http://site.test:8080/'
+
+def test_entries_expire_with_the_ttl_of_their_category(cache, clock):
+    cache.put(result('https://site.test/ok', 'Success'))
+    cache.put(result('https://site.test/down', 'Server Error', 500))
+    cached = cache.get('https://SITE.test/ok#section')
+    assert (cached['status_code'], cached['response_time_ms'], cached['checked_at']) == (200, 42, 1000.0)
+    
+    clock.value += 50
+    assert cache.get('https://site.test/down') is None
+    assert cache.get('https://site.test/ok') is not None
+    assert cache.purge_expired() == 1
+    
+    clock.value += 60
+    assert cache.get('https://site.test/ok') is None
+    assert cache.get_statistics() == {'entries': 1, 'hits': 2, 'misses': 2}
+
+def test_categories_without_ttl_are_not_cached(cache, clock):
+    cache.put(result('https://site.test/timeout', 'Error', None))
+    cache.put(result('https://site.test/unknown', 'Unknown'))
+    assert cache.get_statistics()['entries'] == 0
+
+def test_results_persist_across_instances(tmp_path, clock):
+    path = str(tmp_path / 'links.db')
+    LinkStatusCache(path).put(result('https://site.test/', 'Success'))
+    assert LinkStatusCache(path).get('https://site.test/')['status_text'] == 'OK'
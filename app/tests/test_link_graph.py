@@ -0,0 +1,82 @@
+# tests/test_link_graph.py - CSR link graph, click depth, PageRank and referrers
+import numpy as np
+import pytest
+from modules.link_graph import LinkGraph
+
+def site_graph():
+    """home -> a, b; a -> b, c; b -> home; d is linked from nowhere"""
+    graph = LinkGraph()
+    graph.add_page('https://site/', root=True)
+    graph.add_links('https://site/', ['https://site/a', 'https://site/b', 'https://site/a'])
+    graph.add_links('https://site/a', ['https://site/b', 'https://site/c', 'https://site/a'])
+    graph.add_links('https://site/b', ['https://site/'])
+    graph.add_page('https://site/d')
+    return graph
+
+def test_csr_arrays_deduplicate_links_and_drop_self_links():
+    graph = site_graph()
+    indptr, indices = graph.build()
+    ids = graph.url_ids
+    assert indptr.tolist() == [0, 2, 4, 5, 5, 5]
+    assert indices.tolist() == [ids['https://site/a'], ids['https://site/b'], ids['https://site/b'],
+                                ids['https://site/c'], ids['https://site/']]
+
+def test_build_releases_the_edge_buffers_and_merges_later_links():
+    graph = site_graph()
+    indptr, indices = graph.build()
+    assert len(graph.edge_sources) == len(graph.edge_targets) == 0
+    assert graph.get_summary()['graph_bytes'] == indptr.nbytes + indices.nbytes == 6 * 8 + 5 * 4
+    
+    graph.add_links('https://site/d', ['https://site/', 'https://site/e'])
+    graph.add_links('https://site/', ['https://site/a'])
+    indptr, indices = graph.build()
+    ids = graph.url_ids
+    assert indptr.tolist() == [0, 2, 4, 5, 5, 7, 7]
+    assert indices[indptr[ids['https://site/d']]:].tolist() == [ids['https://site/'], ids['https://site/e']]
+    assert graph.get_summary()['links'] == 7
+
+def test_click_depth_by_breadth_first_search():
+    graph = site_graph()
+    depth = dict(zip(graph.urls, graph.click_depth().tolist()))
+    assert depth == {'https://site/': 0, 'https://site/a': 1, 'https://site/b': 1,
+                     'https://site/c': 2, 'https://site/d': -1}
+
+def test_degrees_and_summary():
+    graph = site_graph()
+    assert dict(zip(graph.urls, graph.in_degree().tolist()))['https://site/b'] == 2
+    summary = graph.get_summary()
+    assert (summary['pages'], summary['links'], summary['max_click_depth']) == (5, 5, 2)
+    assert summary['unreachable_pages'] == 1
+    assert summary['orphan_pages'] == 1
+
+def test_pagerank_sums_to_one_and_favours_linked_pages():
+    graph = site_graph()
+    rank = dict(zip(graph.urls, graph.pagerank()))
+    assert sum(rank.values()) == pytest.approx(1.0)
+    assert rank['https://site/b'] > rank['https://site/c'] > rank['https://site/d']
+
+def test_pagerank_of_a_cycle_is_uniform():
+    graph = LinkGraph()
+    for source, target in [('x', 'y'), ('y', 'z'), ('z', 'x')]:
+        graph.add_links(source, [target])
+    assert np.allclose(graph.pagerank(), 1 / 3)
+
+def test_references_are_not_pages():
+    graph = site_graph()
+    graph.add_references('https://site/', [('https://site/a', 'About', 'a'),
+                                           ('https://site/style.css', '', 'link'),
+                                           ('https://other.example/', 'Partner', 'a')])
+    graph.add_references('https://site/a', [('https://site/style.css', '', 'link')])
+    assert 'https://site/style.css' not in graph.url_ids
+    assert graph.get_summary()['pages'] == 5
+    assert graph.get_referrers('https://site/style.css') == [
+        {'url': 'https://site/', 'anchor_text': '', 'element': 'link'},
+        {'url': 'https://site/a', 'anchor_text': '', 'element': 'link'}]
+    assert graph.get_referrers('https://site/a') == [{'url': 'https://site/', 'anchor_text': 'About', 'element': 'a'}]
+    assert graph.get_referrers('https://site/missing') == []
+
+def test_clear_removes_pages_and_references():
+    graph = site_graph()
+    graph.add_references('https://site/', [('https://site/x.png', '', 'img')])
+    graph.clear()
+    assert graph.urls == [] and graph.get_referrers('https://site/x.png') == []
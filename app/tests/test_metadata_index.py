@@ -0,0 +1,25 @@
+# tests/test_metadata_index.py - Site-wide duplicate titles, descriptions and headings
+from modules.metadata_index import MetadataDuplicateIndex
+
+def test_normalized_duplicates_are_grouped_most_widespread_first():
+    index = MetadataDuplicateIndex()
+    for page in ['a', 'b', 'c']:
+        index.add('title', f'https://site/{page}', '  Welcome   to  SITE ' if page == 'b' else 'Welcome to site')
+    index.add('meta_description', 'https://site/a', 'Shop shoes')
+    index.add('meta_description', 'https://site/b', 'shop SHOES')
+    index.add('h1', 'https://site/a', 'Unique')
+    index.add('h1', 'https://site/b', '   ')
+    
+    duplicates = index.get_duplicates()
+    assert [(duplicate['module'], duplicate['page_count']) for duplicate in duplicates] == [
+        ('Duplicate Page Title', 3), ('Duplicate Meta Description', 2)]
+    assert duplicates[0]['value'] == 'Welcome to site'
+    assert duplicates[1]['urls'] == ['https://site/a', 'https://site/b']
+
+def test_a_page_indexed_twice_is_not_its_own_duplicate():
+    index = MetadataDuplicateIndex()
+    index.add('title', 'https://site/a', 'Home')
+    index.add('title', 'https://site/a', 'Home')
+    assert index.get_duplicates() == []
+    index.clear()
+    assert index.entries == {'title': {}, 'meta_description': {}, 'h1': {}}
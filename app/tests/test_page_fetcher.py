@@ -0,0 +1,85 @@
+# tests/test_page_fetcher.py - Body limits, decoding and connection reuse of stream_get
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from modules.page_fetcher import stream_get
+
+BODIES = {
+    '/page': ('text/html', b'<p>' + b'a' * 5000 + b'</p>', False),
+    '/page.gz': ('text/html', b'<p>' + b'b' * 5000 + b'</p>', True),
+    '/small.png': ('image/png', b'\x89PNG' + b'\0' * 1000, False),
+    '/large.png': ('image/png', b'\x89PNG' + b'\0' * 500000, False),
+}
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        content_type, body, compressed = BODIES.get(self.path, ('text/plain', b'missing', False))
+        if compressed:
+            body = gzip.compress(body)
+        self.send_response(200 if self.path in BODIES else 404)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        # Dropped connections are expected when bodies are left unread
+        pass
+
+@pytest.fixture
+def server():
+    server = Server(('127.0.0.1', 0), Handler)
+    server.connections = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def base_url(server):
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+def test_body_is_read_up_to_the_limit_and_flagged(server):
+    response = stream_get(base_url(server) + '/page', max_bytes=1000)
+    assert len(response.content) == 1000
+    assert response.truncated and not response.body_skipped
+    assert response.body_class == 'html'
+    
+    response = stream_get(base_url(server) + '/page')
+    assert len(response.content) == 5007 and not response.truncated
+    assert set(response.timings) >= {'ttfb_ms', 'download_ms'}
+
+def test_compressed_body_is_decoded_and_wire_bytes_counted(server):
+    response = stream_get(base_url(server) + '/page.gz')
+    assert response.content == BODIES['/page.gz'][1]
+    assert response.wire_bytes == len(gzip.compress(BODIES['/page.gz'][1]))
+    assert response.wire_bytes < len(response.content)
+
+def test_headers_only_fetch_reports_content_length(server):
+    response = stream_get(base_url(server) + '/large.png')
+    assert response.body_skipped and response.content == b''
+    assert response.wire_bytes == len(BODIES['/large.png'][1])
+
+def test_headers_only_fetches_of_short_bodies_reuse_the_connection(server):
+    for path in ['/small.png'] * 5 + ['/missing']:
+        response = stream_get(base_url(server) + path, max_bytes=0)
+        assert response.body_skipped
+    assert response.status_code == 404
+    assert len(server.connections) == 1
+    
+    server.connections.clear()
+    for _ in range(3):
+        stream_get(base_url(server) + '/large.png', max_bytes=0)
+    # Long bodies are not downloaded; their connections are dropped instead
+    assert len(server.connections) == 3
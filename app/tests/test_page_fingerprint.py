@@ -0,0 +1,41 @@
+# tests/test_page_fingerprint.py - Structural fingerprints and template result reuse
+from bs4 import BeautifulSoup
+from modules.page_fingerprint import TemplateResultCache, compute_structural_fingerprint
+
+def gallery(headings, images_with_alt, caption='Summer sale'):
+    """A page of ten images, some with alt text, under one or more h1 headings"""
+    images = ''.join(
+        f'<img src="/img/{index}.jpg" alt="Product">' if index < images_with_alt else f'<img src="/img/{index}.jpg">'
+        for index in range(10))
+    return BeautifulSoup(
+        '<html lang="en"><body>' + '<h1>Products</h1>' * headings +
+        f'<div class="gallery">{images}</div><p>{caption}</p></body></html>', 'html.parser')
+
+def test_same_shape_with_different_content_does_not_reuse_results():
+    cache = TemplateResultCache()
+    page_a = compute_structural_fingerprint(gallery(headings=1, images_with_alt=9))
+    page_b = compute_structural_fingerprint(gallery(headings=2, images_with_alt=4))
+    cache.store_results('accessibility', page_a, 'https://site/a', [{'Status': 'Pass'}])
+    assert page_a['content_hash'] != page_b['content_hash']
+    assert cache.get_results('accessibility', page_b) is None
+
+def test_attribute_values_and_text_length_enter_the_content_hash():
+    base = compute_structural_fingerprint(gallery(1, 9))
+    relabelled = gallery(1, 9)
+    relabelled.find('div')['class'] = ['carousel']
+    assert compute_structural_fingerprint(relabelled)['content_hash'] != base['content_hash']
+    assert compute_structural_fingerprint(gallery(1, 9, caption=''))['content_hash'] != base['content_hash']
+
+def test_pages_differing_only_in_links_and_words_reuse_results():
+    cache = TemplateResultCache()
+    page_a = gallery(1, 9)
+    page_b = gallery(1, 9, caption='Winter sale')
+    for index, image in enumerate(page_b.find_all('img')):
+        image['src'] = f'/other/{index}.png'
+    fingerprint_a = compute_structural_fingerprint(page_a)
+    fingerprint_b = compute_structural_fingerprint(page_b)
+    
+    cache.store_results('accessibility', fingerprint_a, 'https://site/a', [{'Status': 'Pass'}])
+    cached = cache.get_results('accessibility', fingerprint_b)
+    assert cached == {'url': 'https://site/a', 'test_cases': [{'Status': 'Pass'}]}
+    assert cache.get_statistics()['templates'] == 1
@@ -0,0 +1,47 @@
+# tests/test_reference_index.py - Label, ARIA and ID-reference lookups of a page
+from bs4 import BeautifulSoup
+from modules.reference_index import ReferenceIndex
+
+FORM = '''
+<form>
+  <label for="email">Email</label><input id="email" type="email">
+  <label>Name <input id="name"></label>
+  <label for="other">Phone <input id="phone"></label>
+  <span id="hint">We never share it</span><span id="title">Search</span>
+  <input id="search" aria-labelledby="title missing" aria-describedby="hint">
+  <input id="zip" aria-label="  Postcode ">
+  <input id="email">
+  <td headers="nowhere"></td><div for="email"></div>
+</form>'''
+
+def controls(soup):
+    return {control['id']: control for control in reversed(soup.find_all('input'))}
+
+def test_labels_by_for_attribute_and_wrapping():
+    soup = BeautifulSoup(FORM, 'html.parser')
+    index = ReferenceIndex(soup)
+    inputs = controls(soup)
+    assert index.accessible_label(inputs['email']) == 'Email'
+    assert index.accessible_label(inputs['name']) == 'Name'
+    # A wrapping label with a 'for' of its own labels another control
+    assert index.labels_for(inputs['phone']) == []
+
+def test_aria_names_take_precedence_and_skip_missing_ids():
+    soup = BeautifulSoup(FORM, 'html.parser')
+    index = ReferenceIndex(soup)
+    inputs = controls(soup)
+    assert index.accessible_label(inputs['search']) == 'Search'
+    assert index.accessible_label(inputs['zip']) == 'Postcode'
+    assert [element.get_text() for element in index.resolve(inputs['search'], 'aria-describedby')] == ['We never share it']
+
+def test_duplicate_ids_resolve_to_the_first_element():
+    soup = BeautifulSoup(FORM, 'html.parser')
+    index = ReferenceIndex(soup)
+    duplicate = soup.find_all('input', id='email')[1]
+    assert index.element('email') is soup.find('input', id='email')
+    assert index.labels_for(duplicate) == []
+
+def test_broken_references_ignore_for_on_other_elements():
+    index = ReferenceIndex(BeautifulSoup(FORM, 'html.parser'))
+    broken = [(element.name, attribute, target) for element, attribute, target in index.broken_references()]
+    assert broken == [('label', 'for', 'other'), ('input', 'aria-labelledby', 'missing'), ('td', 'headers', 'nowhere')]
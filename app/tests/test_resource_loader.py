@@ -0,0 +1,102 @@
+# tests/test_resource_loader.py - Sub-resource discovery, page weight and image probes
+import struct
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from bs4 import BeautifulSoup
+import pytest
+from modules.image_probe import ImageProbe
+from modules.resource_loader import SubresourceLoader, find_font_urls, find_subresources
+from modules.script_index import ScriptStore
+from modules.stylesheet_store import StylesheetStore
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0\0\0\rIHDR' + struct.pack('>II', 800, 600) + b'\0' * 40000
+CSS = b'@font-face { font-family: Body; src: url(/body.woff2) format("woff2"); } body { color: #333 }'
+FILES = {
+    '/style.css': ('text/css', CSS),
+    '/app.js': ('application/javascript', b'console.log(1)'),
+    '/hero.png': ('image/png', PNG),
+    '/body.woff2': ('font/woff2', b'wOF2' + b'\0' * 500),
+}
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests[self.path] += 1
+        content_type, body = FILES.get(self.path, ('text/plain', b'missing'))
+        status = 200 if self.path in FILES else 404
+        ranges = self.headers.get('Range', '')
+        if status == 200 and ranges.startswith('bytes='):
+            start, end = (int(value) for value in ranges[6:].split('-'))
+            total = len(body)
+            body = body[start:end + 1]
+            status = 206
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{start + len(body) - 1}/{total}')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+PAGE = '''<html><head>
+<link rel="stylesheet" href="/style.css"><link rel="stylesheet" href="/print.css" media="print">
+<script src="/app.js"></script><script src="/late.js" defer></script>
+</head><body><img src="/hero.png" width="300"><img src="data:image/gif;base64,R0lGOD"></body></html>'''
+
+def test_find_subresources_marks_render_blocking_resources():
+    resources = find_subresources(BeautifulSoup(PAGE, 'html.parser'), 'https://site/page')
+    assert resources == {
+        'https://site/style.css': ('stylesheet', True),
+        'https://site/print.css': ('stylesheet', False),
+        'https://site/app.js': ('script', True),
+        'https://site/late.js': ('script', False),
+        'https://site/hero.png': ('image', False),
+    }
+    assert find_font_urls(CSS.decode(), 'https://site/css/style.css') == ['https://site/body.woff2']
+
+def test_images_are_requested_once_and_weighed_by_content_range(server):
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/'
+    page = BeautifulSoup(PAGE.replace('/print.css', '/style.css').replace('/late.js', '/app.js'), 'html.parser')
+    image_probe = ImageProbe()
+    loader = SubresourceLoader(image_probe=image_probe)
+    
+    result = loader.load(base_url, page, page_bytes=1000)
+    images = image_probe.analyze_page(page, base_url)
+    
+    assert server.requests['/hero.png'] == 1
+    assert result['bytes_by_type']['image'] == len(PNG)
+    assert result['page_weight_bytes'] == 1000 + len(CSS) + len('console.log(1)') + len(PNG) + 504
+    assert [record['type'] for record in result['resources']].count('font') == 1
+    assert (images[0]['width'], images[0]['bytes'], images[0]['oversized']) == (800, len(PNG), True)
+
+def test_loaded_stylesheets_and_scripts_are_not_fetched_again(server):
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/'
+    page = BeautifulSoup('<head><link rel="stylesheet" href="/style.css"><script src="/app.js"></script></head>',
+                         'html.parser')
+    stylesheet_store, script_store = StylesheetStore(), ScriptStore()
+    loader = SubresourceLoader(stylesheet_store=stylesheet_store, script_store=script_store)
+    
+    result = loader.load(base_url, page)
+    stylesheet_store.get_page_css(page, base_url)
+    scripts = script_store.get_page_scripts(page, base_url)
+    
+    assert (server.requests['/style.css'], server.requests['/app.js']) == (1, 1)
+    assert result['render_blocking_count'] == 2
+    assert scripts.size == len('console.log(1)')
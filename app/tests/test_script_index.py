@@ -0,0 +1,82 @@
+# tests/test_script_index.py - Script scanning, page script lookups and bundle de-duplication
+import time
+from types import SimpleNamespace
+from bs4 import BeautifulSoup
+from modules.script_index import PageScripts, ScriptStore, fingerprint_library, is_minified, scan_script
+
+SCRIPT = '''
+var menu = document.getElementById("menu");
+menu.addEventListener("click", toggle);
+document.querySelector('#search .submit').onclick = search;
+$('.tabs').on('click', select);
+document.getElementById('footer');
+window.addEventListener('resize', layout);
+const items = list?.items ?? [];
+if (navigator.userAgent.indexOf("Chrome") > -1) { legacy(); }
+'''
+
+def test_scan_finds_lookups_bindings_features_and_sniffing():
+    index = scan_script(SCRIPT, 'app.js')
+    assert index.id_references == {'menu': True, 'search': True, 'footer': False}
+    assert index.class_references == {'submit': True, 'tabs': True}
+    assert index.events == {'click', 'resize'}
+    assert index.features == {'const', 'optional chaining', 'nullish coalescing'}
+    assert index.es_level == 'ES2020'
+    assert 'navigator.userAgent' in index.ua_tokens
+
+def test_plain_es5_without_sniffing():
+    index = scan_script('function a(b) { return b.x + 1; } // supports Chrome and Safari')
+    assert index.es_level == 'ES5'
+    page = PageScripts([index], [])
+    # Browser names in comments or strings are not user agent sniffing
+    assert index.ua_tokens == {'Chrome', 'Safari'} and not page.sniffs_user_agent
+
+def test_page_scripts_describe_the_bindings_of_an_element():
+    page = PageScripts([scan_script(SCRIPT), scan_script('document.getElementById("cta")')], [])
+    soup = BeautifulSoup('<button id="menu"></button><button id="cta" class="tabs"></button><a class="x"></a>',
+                         'html.parser')
+    menu, cta, link = soup.find_all(['button', 'a'])
+    assert page.listeners_for(menu) == ['click event listener (by ID)']
+    assert page.listeners_for(cta) == ['referenced by ID in script', 'event listener (by class .tabs)']
+    assert page.listeners_for(link) == []
+    assert page.sniffs_user_agent
+
+def test_pathological_input_is_scanned_in_linear_time():
+    hostile = 'getElementById(' * 20000 + '"' * 20000 + 'a.on' * 20000
+    start = time.perf_counter()
+    scan_script(hostile)
+    assert time.perf_counter() - start < 2
+
+def response(content, status_code=200):
+    return SimpleNamespace(content=content, text=content.decode(), ok=status_code < 400,
+                           status_code=status_code, wire_bytes=len(content) // 3)
+
+JQUERY = b'/*! jQuery v3.7.1 | (c) OpenJS Foundation */' + b'!function(e,t){"use strict";e.fn=t}(window,{});' * 40
+
+def test_library_banner_and_minification():
+    assert fingerprint_library(JQUERY.decode()) == ('jQuery', '3.7.1')
+    assert fingerprint_library('console.log(1)') == ('', '')
+    assert is_minified(JQUERY.decode())
+    assert is_minified('var a = 1;', 'https://cdn.test/lib.min.js')
+    assert not is_minified('function a() {\n    return 1;\n}\n' * 100, 'app.js')
+
+def test_the_same_bundle_under_several_urls_is_indexed_once():
+    store = ScriptStore()
+    first = store.get_script('https://site.test/jquery.js?v=1', response(JQUERY))
+    second = store.get_script('https://site.test/jquery.js?v=2', response(JQUERY))
+    assert first is second
+    assert first.urls == ['https://site.test/jquery.js?v=1', 'https://site.test/jquery.js?v=2']
+    assert (first.library, first.minified, first.wire_bytes) == ('jQuery', True, len(JQUERY) // 3)
+    
+    soup = BeautifulSoup('<script src="/jquery.js?v=1"></script><script src="/jquery.js?v=2"></script>'
+                         '<script>let a = 1;</script>', 'html.parser')
+    page = store.get_page_scripts(soup, 'https://site.test/')
+    assert page.duplicate_bundles() == [(first, ['https://site.test/jquery.js?v=1', 'https://site.test/jquery.js?v=2'])]
+    assert len(page.indexes) == 2 and 'let' in page.features
+
+def test_failed_fetches_are_remembered():
+    store = ScriptStore()
+    assert store.get_script('https://site.test/missing.js', response(b'not found', 404)) is None
+    assert store.fetch_errors == {'https://site.test/missing.js': 'HTTP 404'}
+    # Not requested again
+    assert store.get_script('https://site.test/missing.js') is None
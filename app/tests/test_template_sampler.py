@@ -0,0 +1,40 @@
+# tests/test_template_sampler.py - URL templates, representative samples and extrapolation
+import pytest
+from modules.template_sampler import TemplateSampler
+from modules.url_processor import URLProcessor
+
+@pytest.mark.parametrize('url, template', [
+    ('https://Shop.com/product/123?size=2&color=red', 'shop.com/product/<id>?color&size'),
+    ('https://shop.com/blog/my-first-post', 'shop.com/blog/<slug>'),
+    ('https://shop.com/a/3f2a9b1c7d', 'shop.com/a/<hash>'),
+    ('https://shop.com/about', 'shop.com/about'),
+])
+def test_url_templates_collapse_variable_segments(url, template):
+    assert URLProcessor.get_url_template(url) == template
+
+def test_representatives_are_sampled_per_template_and_reproducible():
+    urls = [f'https://shop.com/product/{index}' for index in range(20)] + ['https://shop.com/about']
+    sampler = TemplateSampler(samples_per_template=3, seed=1)
+    selected = sampler.select_representatives(urls)
+    assert len(selected) == 4 and 'https://shop.com/about' in selected
+    assert TemplateSampler(samples_per_template=3, seed=1).select_representatives(urls) == selected
+
+def test_issue_counts_are_extrapolated_to_the_template():
+    urls = [f'https://shop.com/product/{index}' for index in range(20)]
+    sampler = TemplateSampler(samples_per_template=4)
+    sample = sampler.select_representatives(urls)
+    failing = {'Test Type': 'Accessibility', 'Module': 'Alt Text', 'Status': 'Fail'}
+    sampler.record_results(sample[0], [failing, {'Test Type': 'SEO', 'Module': 'Title', 'Status': 'Pass'}])
+    sampler.record_results('https://shop.com/not-sampled', [failing])
+    
+    summary = sampler.get_sampling_summary()
+    template = summary['templates'][0]
+    assert (summary['total_urls'], summary['sampled_urls'], summary['estimated_issue_pages']) == (20, 4, 5)
+    assert template['issues'] == [{'test_type': 'Accessibility', 'module': 'Alt Text',
+                                   'sampled_pages_affected': 1, 'estimated_pages_affected': 5}]
+    assert template['coverage'].startswith('4/20 pages analyzed; issues affecting at least 53% of pages')
+
+def test_detection_threshold():
+    assert TemplateSampler.detection_threshold(5, 5) == 0.0
+    assert TemplateSampler.detection_threshold(0, 5) == 1.0
+    assert TemplateSampler.detection_threshold(30, 1000) == pytest.approx(0.0950, abs=1e-4)